@@ -1,14 +1,9 @@
-from typing import Generator
+"""Dependencies shared by the API routes.
 
-from sqlalchemy.orm import Session
+The database session is request-scoped: it is attached to the request by
+``DBSessionMiddleware`` and only opened when a route uses it.
+"""
 
-from levelup.database.core import SessionLocal
+from levelup.database.core import DbSession, get_db
 
-
-def get_db() -> Generator[Session, None, None]:
-    """Get database session."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+__all__ = ["DbSession", "get_db"]
@@ -2,4 +2,10 @@
 
 from fastapi import APIRouter
 
+from levelup.api.routes import analyze, jobs, ranking, search
+
 api_router = APIRouter()
+api_router.include_router(analyze.router)
+api_router.include_router(jobs.router)
+api_router.include_router(ranking.router)
+api_router.include_router(search.router)
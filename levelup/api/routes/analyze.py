@@ -0,0 +1,164 @@
+from typing import Annotated, Any, Iterator, Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+
+from levelup import config
+from levelup.incremental import find_previous, plan, reanalyze
+from levelup.pdf import extract_text
+from levelup.prompts import LANGUAGES, get_resume_analysis_prompt
+from levelup.quota import Quota, charge, get_quota, refund
+from levelup.sections import SECTION_GROUPS, analyze
+from levelup.singleflight import analysis_flight, analysis_key
+from levelup.skills import present_skills
+from levelup.store import get_store
+from levelup.streaming import Event, analyze_stream, ndjson, sse
+from levelup.tokens import estimate_tokens, fit_to_budget
+
+router = APIRouter(prefix="/analyze", tags=["analyze"])
+
+
+def estimate_cost(text: str, language: str, role: str | None) -> float:
+    """Estimated prompt tokens of an analysis, the quota cost of the request."""
+    text = fit_to_budget(text, language, role).text
+    prompt = get_resume_analysis_prompt(text, language, role, present_skills(text))
+    return estimate_tokens(prompt)
+
+
+def read_resume_upload(
+    file: UploadFile, language: str, role: str | None
+) -> tuple[str, str | None]:
+    """Validates an analysis upload and returns the resume text and target role."""
+    filename = (file.filename or "").lower()
+    if not filename.endswith(".pdf") and file.content_type != "application/pdf":
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file format. Only PDF files are supported.",
+        )
+    if language not in LANGUAGES:
+        raise HTTPException(
+            status_code=422,
+            detail=[
+                {
+                    "loc": ["body", "language"],
+                    "msg": "unsupported language",
+                    "type": "value_error",
+                }
+            ],
+        )
+
+    try:
+        text = extract_text(file.file)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Could not read the PDF file.")
+    if not text:
+        raise HTTPException(
+            status_code=400, detail="Could not extract text from the PDF file."
+        )
+    return text, role.strip() or None if role else None
+
+
+@router.post("")
+def analyze_cv(
+    request: Request,
+    response: Response,
+    quota: Annotated[Quota | None, Depends(get_quota)],
+    file: UploadFile = File(..., description="PDF file to analyze."),
+    language: str = Form("English", description="Report language."),
+    role: str | None = Form(None, description="Target role for the analysis."),
+) -> dict[str, Any]:
+    """Analyze a CV/Resume PDF.
+
+    The request is charged its estimated prompt tokens against the client's
+    quota; a stored analysis of a near-identical resume is returned for the
+    cost of a normal request. A new version of a stored resume only has the
+    parts affected by its changed sections analyzed again (and charged), which
+    are listed in the ``X-Analysis-Refreshed`` header. The charge is refunded
+    when the model call fails.
+    """
+    text, role = read_resume_upload(file, language, role)
+
+    store = get_store() if config.ANALYSIS_STORE_ENABLED else None
+    previous = find_previous(store, text, language, role) if store else None
+    if store and not previous and (match := store.find_similar(text, language, role)):
+        charge(request, response, config.QUOTA_REQUEST_COST, quota)
+        cached: dict[str, Any] = match[0]["result"]
+        return cached
+
+    cost = estimate_cost(text, language, role)
+    text = fit_to_budget(text, language, role).text
+    if previous:
+        refresh = plan(text, previous)[1]
+        cost = max(cost * len(refresh) / len(SECTION_GROUPS), config.QUOTA_REQUEST_COST)
+    charged = charge(request, response, cost, quota)
+    update = None
+    try:
+        if previous:
+            update = reanalyze(text, language, role, previous)
+            result = update.result
+            response.headers["X-Analysis-Refreshed"] = ",".join(update.refreshed)
+        else:
+            # Identical analyses running concurrently (e.g. client retries) share one call.
+            mode = "concurrent" if config.ANALYSIS_CONCURRENT_SECTIONS else "single"
+            result = analysis_flight.do(
+                analysis_key(text, language, role, mode),
+                lambda: analyze(text, language, role),
+            )
+    except ValueError:
+        refund(request, charged, quota)
+        raise HTTPException(
+            status_code=502, detail="Could not parse the analysis response."
+        )
+    except Exception as e:
+        refund(request, charged, quota)
+        raise HTTPException(status_code=502, detail=f"Error calling LLM: {e}")
+
+    if store and (update is None or update.changed):
+        store.save(result, text, language, role, update.record() if update else None)
+    return result
+
+
+@router.post("/stream")
+def analyze_cv_stream(
+    request: Request,
+    response: Response,
+    quota: Annotated[Quota | None, Depends(get_quota)],
+    file: UploadFile = File(..., description="PDF file to analyze."),
+    language: str = Form("English", description="Report language."),
+    role: str | None = Form(None, description="Target role for the analysis."),
+    format: Literal["sse", "ndjson"] = Query("sse", description="Event format."),
+) -> StreamingResponse:
+    """Analyze a CV/Resume PDF, streaming progress and sections as they complete.
+
+    Events are sent as server-sent events or, with ``format=ndjson``, as one
+    JSON object per line. The request is charged like ``POST /analyze`` and
+    refunded when the stream ends with an error event.
+    """
+    text, role = read_resume_upload(file, language, role)
+    charged = charge(request, response, estimate_cost(text, language, role), quota)
+    store = get_store() if config.ANALYSIS_STORE_ENABLED else None
+
+    def events() -> Iterator[str]:
+        write = sse if format == "sse" else ndjson
+        yield write(Event("extracted", {"characters": len(text)}))
+        for event in analyze_stream(text, language, role):
+            if event.event == "result" and store:
+                store.save(event.data, text, language, role)
+            elif event.event == "error":
+                refund(request, charged, quota)
+            yield write(event)
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    headers["Cache-Control"] = "no-cache"
+    return StreamingResponse(events(), media_type=media_type, headers=headers)
@@ -0,0 +1,110 @@
+import functools
+from datetime import datetime
+from typing import Annotated, Any
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+)
+from pydantic import BaseModel
+
+from levelup.api.routes.analyze import estimate_cost, read_resume_upload
+from levelup.database.core import DbSession, engine
+from levelup.database.routing import read_only
+from levelup.jobs import JobQueue
+from levelup.quota import Quota, charge, get_quota, request_cost
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+class JobStatus(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    created_at: datetime
+    finished_at: datetime | None = None
+    error: str | None = None
+    result: dict[str, Any] | None = None
+
+
+@functools.lru_cache(maxsize=1)
+def get_job_queue() -> JobQueue:
+    """Returns the job queue in the application database."""
+    return JobQueue(engine)
+
+
+@router.post("", response_model=JobStatus, status_code=202)
+def submit_analysis(
+    request: Request,
+    response: Response,
+    db: DbSession,
+    queue: Annotated[JobQueue, Depends(get_job_queue)],
+    quota: Annotated[Quota | None, Depends(get_quota)],
+    file: UploadFile = File(..., description="PDF file to analyze."),
+    language: str = Form("English", description="Report language."),
+    role: str | None = Form(None, description="Target role for the analysis."),
+    save: bool = Form(False, description="Keep the result in the analysis store."),
+    organization: str | None = Form(
+        None, description="Organization slug the job's model calls are shared under."
+    ),
+) -> JobStatus:
+    """Queue a CV/Resume PDF for analysis by the workers.
+
+    Returns immediately with the job id; poll ``GET /jobs/{id}`` for the result.
+    Jobs run in the scheduler's bulk lane, sharing it fairly between
+    organizations.
+    """
+    text, role = read_resume_upload(file, language, role)
+    charge(request, response, estimate_cost(text, language, role), quota)
+    payload = {
+        "text": text,
+        "language": language,
+        "role": role,
+        "save": save,
+        "organization": organization,
+    }
+    job_id = queue.enqueue(payload, connection=db)
+    job = queue.get(job_id, connection=db)
+    assert job is not None
+    return _status(job)
+
+
+@router.get(
+    "/{job_id}", response_model=JobStatus, dependencies=[Depends(request_cost())]
+)
+def get_job(
+    job_id: int, db: DbSession, queue: Annotated[JobQueue, Depends(get_job_queue)]
+) -> JobStatus:
+    """Return the status of a job, and its result once it has succeeded.
+
+    Polls are read from a replica; a job the replica does not have yet (just
+    submitted) is looked up again on the primary.
+    """
+    with read_only(db):
+        job = queue.get(job_id, connection=db)
+        db.rollback()
+    if job is None:
+        job = queue.get(job_id, connection=db)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return _status(job)
+
+
+def _status(job: dict[str, Any]) -> JobStatus:
+    return JobStatus(
+        id=job["id"],
+        kind=job["kind"],
+        status=job["status"],
+        attempts=job["attempts"],
+        created_at=job["created_at"],
+        finished_at=job["finished_at"],
+        error=job["last_error"] if job["status"] == "dead" else None,
+        result=job["result"],
+    )
@@ -0,0 +1,42 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from levelup.quota import request_cost
+from levelup.ranking import (
+    RankedCandidate,
+    RankingWeights,
+    get_candidate_pool,
+    parse_weights,
+)
+from levelup.store import AnalysisStore, get_store
+
+router = APIRouter(
+    prefix="/ranking", tags=["ranking"], dependencies=[Depends(request_cost())]
+)
+
+
+@router.get("/", response_model=list[RankedCandidate])
+def rank_candidates(
+    store: Annotated[AnalysisStore, Depends(get_store)],
+    role: str = Query(..., min_length=1, description="Target role to rank for."),
+    k: int = Query(10, ge=1, le=1000, description="Number of candidates to return."),
+    role_weight: float = Query(1.0, description="Weight of the target-role score."),
+    competency: list[str] = Query(
+        default=[], description="Competency weights as 'Category:weight'."
+    ),
+    critical_penalty: float = Query(5.0, ge=0),
+    important_penalty: float = Query(0.0, ge=0),
+) -> list[RankedCandidate]:
+    """Return the top-k stored candidates for a target role."""
+    try:
+        competencies = parse_weights(competency)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    weights = RankingWeights(
+        role=role_weight,
+        competencies=competencies,
+        critical_penalty=critical_penalty,
+        important_penalty=important_penalty,
+    )
+    return get_candidate_pool(store).rank(role, weights, k)
@@ -0,0 +1,43 @@
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+
+from levelup.quota import request_cost
+from levelup.store import AnalysisStore, get_store
+
+router = APIRouter(
+    prefix="/search", tags=["search"], dependencies=[Depends(request_cost())]
+)
+
+
+class SearchHit(BaseModel):
+    id: str
+    score: float
+    role: str | None = None
+    language: str | None = None
+    overall_score: Any = None
+
+
+@router.get("/", response_model=list[SearchHit])
+def search_resumes(
+    store: Annotated[AnalysisStore, Depends(get_store)],
+    q: str = Query(..., min_length=1, description="Words to search for."),
+    k: int = Query(10, ge=1, le=1000, description="Number of results to return."),
+) -> list[SearchHit]:
+    """Return the stored analyses whose resume text best matches the query."""
+    hits = []
+    for record, score in store.search(q, k):
+        summary = record["result"].get("overall_summary")
+        if not isinstance(summary, dict):
+            summary = {}
+        hits.append(
+            SearchHit(
+                id=record["id"],
+                score=score,
+                role=record.get("role"),
+                language=record.get("language"),
+                overall_score=summary.get("overall_score"),
+            )
+        )
+    return hits
@@ -2,13 +2,21 @@ import json
 import re
 from typing import Any, Optional, cast
 
-import google.generativeai as genai
 import pandas as pd  # type: ignore[import-untyped]
-import pdfplumber
 import streamlit as st
 
 from levelup import config
+from levelup.incremental import find_previous, reanalyze
+from levelup.llm import generate_text
+from levelup.pdf import extract_text
+from levelup.profiling import Profile, stage, use_profile
 from levelup.prompts import get_resume_analysis_prompt
+from levelup.sections import analyze_sections
+from levelup.singleflight import analysis_flight, analysis_key
+from levelup.skills import normalize_missing_skills, present_skills
+from levelup.store import get_store
+from levelup.tokens import fit_to_budget
+from levelup.tracing import start_trace
 
 GEMINI_API_KEY = config.GEMINI_API_KEY
 if not GEMINI_API_KEY:
@@ -16,16 +24,11 @@ if not GEMINI_API_KEY:
         "Missing GEMINI_API_KEY. "
         "Set it in your shell or add it to .env / Streamlit secrets."
     )
-genai.configure(api_key=GEMINI_API_KEY)
-Model = genai.GenerativeModel("gemini-2.0-flash-lite")
 
 
 def extract_text_from_pdf(uploaded_file: Any) -> str | None:
     try:
-        with pdfplumber.open(uploaded_file) as pdf:
-            parts = [page.extract_text() or "" for page in pdf.pages]
-        text = "\n".join(parts).strip()
-        return text
+        return extract_text(uploaded_file)
     except Exception as e:
         st.error(f"PDF reading error: {e}")
         return None
@@ -41,29 +44,92 @@ def _extract_json_block(raw_text: str) -> str | None:
     return None
 
 
+class _AnalysisError(Exception):
+    """An analysis failure with a message for the user."""
+
+
+def _analyze(
+    text: str,
+    report_language: str,
+    target_role: Optional[str],
+    concurrent: bool,
+) -> dict[str, Any]:
+    if concurrent:
+        return analyze_sections(
+            text, report_language, target_role, generate=generate_text
+        )
+
+    skills = present_skills(text)
+    prompt = get_resume_analysis_prompt(text, report_language, target_role, skills)
+    raw_text = generate_text(prompt)
+    with stage("json_extraction"):
+        json_str = _extract_json_block(raw_text)
+        data = json.loads(json_str) if json_str else None
+    if not json_str:
+        raise _AnalysisError(
+            "Sorry, the analysis could not be completed. Please try again later or upload a different file."
+        )
+
+    if not isinstance(data, dict):
+        raise _AnalysisError("Invalid JSON object.")
+
+    normalize_missing_skills(data, skills)
+    return cast(dict[str, Any], data)
+
+
 def analyzecv_pdf_withllm(
-    text: str, report_language: str, target_role: Optional[str] = None
+    text: str,
+    report_language: str,
+    target_role: Optional[str] = None,
+    concurrent: bool = False,
 ) -> dict[str, Any] | None:
-    prompt = get_resume_analysis_prompt(text, report_language, target_role)
+    """Analyzes the resume, sharing the LLM call with identical requests in flight."""
     try:
-        response = Model.generate_content(prompt)
-        raw_text = (response.text or "").strip()
-        if not (json_str := _extract_json_block(raw_text)):
-            st.error(
-                "Sorry, the analysis could not be completed. Please try again later or upload a different file."
-            )
-            return None
+        text = fit_to_budget(text, report_language, target_role).text
+        mode = "concurrent" if concurrent else "single"
+        return analysis_flight.do(
+            analysis_key(text, report_language, target_role, mode),
+            lambda: _analyze(text, report_language, target_role, concurrent),
+        )
+    except _AnalysisError as e:
+        st.error(str(e))
+        return None
+    except Exception as e:
+        st.error(
+            f"An error occurred while processing your resume. Please try again or upload a different file. Details: {e}"
+        )
+        return None
 
-        if not isinstance(data := json.loads(json_str), dict):
-            st.error("Invalid JSON object.")
-            return None
 
-        return cast(dict[str, Any], data)
+def reanalyzecv_pdf_withllm(
+    text: str,
+    report_language: str,
+    target_role: Optional[str],
+    previous: dict[str, Any],
+) -> dict[str, Any] | None:
+    """Updates the stored analysis of a previous version of the resume."""
+    try:
+        text = fit_to_budget(text, report_language, target_role).text
+        update = reanalyze(
+            text, report_language, target_role, previous, generate=generate_text
+        )
     except Exception as e:
         st.error(
             f"An error occurred while processing your resume. Please try again or upload a different file. Details: {e}"
         )
         return None
+    if update.refreshed:
+        st.info(
+            "This is a new version of a resume analyzed before: only "
+            f"{', '.join(update.refreshed)} were analyzed again."
+        )
+    else:
+        st.info("No changes affecting the analysis, so the previous one is shown.")
+    if update.changed:
+        get_store().save(
+            update.result, text, report_language, target_role, update.record()
+        )
+    return update.result
 
 
 def _safe_dict(obj: dict[str, Any], key: str) -> dict[str, Any]:
@@ -304,11 +370,27 @@ def display_analysis_tabs(result: dict[str, Any]) -> None:
         display_recommendations_tab(result)
 
 
+def display_debug_panel(profile: Profile) -> None:
+    with st.expander("Debug: stage timings"):
+        if not (rows := profile.rows()):
+            st.write("Nothing was timed in this run.")
+            return
+        st.dataframe(pd.DataFrame(rows), width="stretch")
+        st.write(
+            f"Wall time: {profile.wall:.3f}s. Parallel section calls overlap, "
+            "so the stages can add up to more."
+        )
+
+
 st.title("LevelUp")
 
+# Stage timings of this run, shown in a debug panel when STREAMLIT_DEBUG_PANEL is set.
+profile = Profile() if config.STREAMLIT_DEBUG_PANEL else None
+
 uploaded_file = st.file_uploader("Upload your Resume (PDF)", type="pdf")
 if uploaded_file:
-    text = extract_text_from_pdf(uploaded_file)
+    with use_profile(profile):
+        text = extract_text_from_pdf(uploaded_file)
     if text:
         st.subheader("Select report language")
         language_options = [
@@ -330,10 +412,13 @@ if uploaded_file:
             "Turkish",
             "Ukrainian",
         ]
-        selected_language = st.selectbox(
-            "Choose a language for the report",
-            language_options,
-            index=language_options.index("English"),
+        selected_language: str = (
+            st.selectbox(
+                "Choose a language for the report",
+                language_options,
+                index=language_options.index("English"),
+            )
+            or "English"
         )
 
         role_options = [
@@ -394,8 +479,48 @@ if uploaded_file:
         else:
             selected_role = selected_role_label
 
+        concurrent_mode = st.checkbox(
+            "Fast mode (analyze sections in parallel)",
+            value=config.ANALYSIS_CONCURRENT_SECTIONS,
+        )
+
         if st.button("Analyze Resume"):
-            with st.spinner("Analyzing Resume..."):
-                result = analyzecv_pdf_withllm(text, selected_language, selected_role)
+            with (
+                start_trace("app analyze"),
+                use_profile(profile),
+                st.spinner("Analyzing Resume..."),
+            ):
+                store = get_store() if config.ANALYSIS_STORE_ENABLED else None
+                previous = (
+                    find_previous(store, text, selected_language, selected_role)
+                    if store
+                    else None
+                )
+                match = (
+                    store.find_similar(text, selected_language, selected_role)
+                    if store and not previous
+                    else None
+                )
+                if previous:
+                    result = reanalyzecv_pdf_withllm(
+                        text, selected_language, selected_role, previous
+                    )
+                elif match:
+                    record, similarity = match
+                    st.info(
+                        f"This resume is nearly identical ({similarity:.0%}) to one "
+                        "analyzed before, so the previous analysis is shown."
+                    )
+                    result = record["result"]
+                else:
+                    result = analyzecv_pdf_withllm(
+                        text, selected_language, selected_role, concurrent_mode
+                    )
+                    if result and config.ANALYSIS_STORE_ENABLED:
+                        get_store().save(result, text, selected_language, selected_role)
                 if result:
-                    display_analysis_tabs(result)
+                    with stage("rendering"):
+                        display_analysis_tabs(result)
+
+if profile is not None:
+    display_debug_panel(profile)
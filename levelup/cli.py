@@ -1,58 +1,75 @@
 import json
-import re
+import signal
+import statistics
+import sys
+from contextlib import nullcontext
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
-import google.generativeai as genai
-import pdfplumber
 import typer
 
 from levelup import config
-from levelup.prompts import get_resume_analysis_prompt
+from levelup.pdf import extract_text
+from levelup.profiling import Profile, cprofile, stage, use_profile
+from levelup.prompts import LANGUAGES
+from levelup.ranking import RankingWeights, get_candidate_pool, parse_weights
+from levelup.reports import REPORT_FORMATS, render_batch
+from levelup.sections import analyze as analyze_text
+from levelup.sections import measure_latency
+from levelup.segmenter import (
+    ENTRY_SECTIONS,
+    measure_throughput,
+    split_entries,
+)
+from levelup.segmenter import segment as segment_text
+from levelup.store import get_store
+from levelup.tokens import estimate_tokens, track_usage
+from levelup.tracing import start_trace
 
 app = typer.Typer(name="levelup", help="AI-powered CV analysis from the command line.")
 
-LANGUAGES = [
-    "Czech",
-    "Danish",
-    "Dutch",
-    "English",
-    "Finnish",
-    "French",
-    "German",
-    "Greek",
-    "Italian",
-    "Kurdish (Kurmanji)",
-    "Polish",
-    "Portuguese",
-    "Russian",
-    "Spanish",
-    "Swedish",
-    "Turkish",
-    "Ukrainian",
-]
-
-
-def _extract_text(pdf_path: Path) -> str:
-    with pdfplumber.open(pdf_path) as pdf:
-        parts = [page.extract_text() or "" for page in pdf.pages]
-    return "\n".join(parts).strip()
-
-
-def _extract_json(raw: str) -> dict | None:
-    fence = re.search(r"```(?:json)?\s*({[\s\S]*?})\s*```", raw, re.IGNORECASE)
-    if fence:
-        block = fence.group(1)
-    else:
-        match = re.search(r"\{[\s\S]*\}", raw)
-        block = match.group(0) if match else None
-    if not block:
-        return None
+
+def _validate_inputs(resume: Path, language: str) -> None:
+    if not resume.exists():
+        typer.echo(f"Error: file not found: {resume}", err=True)
+        raise typer.Exit(1)
+
+    if language not in LANGUAGES:
+        typer.echo(
+            f"Error: unsupported language '{language}'.\nAvailable: {', '.join(LANGUAGES)}",
+            err=True,
+        )
+        raise typer.Exit(1)
+
+    if not config.GEMINI_API_KEY:
+        typer.echo("Error: GEMINI_API_KEY is not set.", err=True)
+        raise typer.Exit(1)
+
+
+def _read_resume(resume: Path) -> str:
+    typer.echo("Extracting text from PDF...")
     try:
-        result = json.loads(block)
-        return result if isinstance(result, dict) else None
-    except json.JSONDecodeError:
-        return None
+        text = extract_text(resume)
+    except Exception as e:
+        typer.echo(f"Error reading PDF: {e}", err=True)
+        raise typer.Exit(1)
+
+    if not text:
+        typer.echo("Error: could not extract text from the PDF.", err=True)
+        raise typer.Exit(1)
+    return text
+
+
+def _write_result(result: dict, output: Optional[Path]) -> None:
+    with stage("rendering"):
+        output_json = json.dumps(result, indent=2, ensure_ascii=False)
+
+    if output:
+        output.write_text(output_json, encoding="utf-8")
+        typer.echo(f"Results saved to {output}")
+    else:
+        typer.echo(output_json)
 
 
 @app.command()
@@ -67,57 +84,513 @@ def analyze(
     output: Optional[Path] = typer.Option(
         None, "--output", "-o", help="Save JSON output to a file."
     ),
+    concurrent: bool = typer.Option(
+        config.ANALYSIS_CONCURRENT_SECTIONS,
+        "--concurrent/--single",
+        help="Request the analysis sections in parallel instead of one prompt.",
+    ),
+    save: bool = typer.Option(
+        False, "--save", help="Keep the analysis in the local analysis store."
+    ),
+    reuse: bool = typer.Option(
+        True,
+        "--reuse/--no-reuse",
+        help="Reuse a stored analysis of a near-identical resume.",
+    ),
+    show_usage: bool = typer.Option(
+        False, "--show-usage", help="Print the token usage of the analysis."
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Print the time spent in each stage of the analysis."
+    ),
+    profile_output: Optional[Path] = typer.Option(
+        None,
+        "--profile-output",
+        help="Also run under cProfile and save the pstats data to this file.",
+    ),
+) -> None:
+    """Analyze a PDF resume and print or save the JSON report."""
+    _validate_inputs(resume, language)
+    timings = Profile() if profile or profile_output else None
+    try:
+        with start_trace("cli analyze"), use_profile(timings), cprofile(profile_output):
+            _analyze(
+                resume, language, role, output, concurrent, save, reuse, show_usage
+            )
+    finally:
+        if timings is not None:
+            typer.echo(timings.summary(), err=True)
+        if profile_output:
+            typer.echo(f"cProfile data saved to {profile_output}", err=True)
+
+
+def _analyze(
+    resume: Path,
+    language: str,
+    role: Optional[str],
+    output: Optional[Path],
+    concurrent: bool,
+    save: bool,
+    reuse: bool,
+    show_usage: bool,
 ) -> None:
+    text = _read_resume(resume)
+
+    store = get_store()
+    if reuse and (match := store.find_similar(text, language, role)):
+        record, similarity = match
+        typer.echo(
+            f"Reusing stored analysis {record['id']} (similarity {similarity:.2f}).",
+            err=True,
+        )
+        _write_result(record["result"], output)
+        return
+
+    typer.echo("Analyzing resume...")
+    result: dict | None
+    try:
+        with track_usage() as usage:
+            result = analyze_text(text, language, role, concurrent)
+    except ValueError:
+        result = None
+    except Exception as e:
+        typer.echo(f"Error calling LLM: {e}", err=True)
+        raise typer.Exit(1)
+    if show_usage:
+        typer.echo(usage.summary(), err=True)
+
+    if not result:
+        typer.echo("Error: could not parse the analysis response.", err=True)
+        raise typer.Exit(1)
+
+    if save:
+        analysis_id = store.save(result, text, language, role)
+        typer.echo(f"Analysis stored as {analysis_id}", err=True)
+
+    _write_result(result, output)
+
+
+@app.command()
+def benchmark(
+    resume: Path = typer.Argument(..., help="Path to the PDF resume file."),
+    language: str = typer.Option(
+        "English", "--language", "-l", help="Report language."
+    ),
+    role: Optional[str] = typer.Option(
+        None, "--role", "-r", help="Target role for the analysis."
+    ),
+    runs: int = typer.Option(3, "--runs", "-n", min=1, help="Runs per mode."),
+) -> None:
+    """Compare single-call and concurrent analysis latency on one resume."""
+    _validate_inputs(resume, language)
+    text = _read_resume(resume)
+
+    typer.echo(f"Running {runs} run(s) per mode...")
+    try:
+        timings = measure_latency(text, language, role, runs=runs)
+    except Exception as e:
+        typer.echo(f"Error calling LLM: {e}", err=True)
+        raise typer.Exit(1)
+
+    for mode, values in timings.items():
+        typer.echo(
+            f"{mode:>10}: mean {statistics.mean(values):.2f}s  "
+            f"min {min(values):.2f}s  max {max(values):.2f}s"
+        )
+
+
+@app.command()
+def segment(
+    resume: Path = typer.Argument(..., help="Path to the PDF resume file."),
+    runs: int = typer.Option(
+        0, "--benchmark", "-b", min=0, help="Also time this many segmentation runs."
+    ),
+) -> None:
+    """Show the sections found in a resume, optionally with segmenter throughput."""
     if not resume.exists():
         typer.echo(f"Error: file not found: {resume}", err=True)
         raise typer.Exit(1)
+    text = _read_resume(resume)
 
-    if language not in LANGUAGES:
+    for section in segment_text(text):
+        lines = section.text.count("\n") + 1
+        detail = f"{lines} line(s), ~{estimate_tokens(section.text)} tokens"
+        if section.name in ENTRY_SECTIONS:
+            detail += f", {len(split_entries(section.text))} entries"
+        typer.echo(f"{section.name:>15}: {detail}")
+
+    if runs:
+        result = measure_throughput(text, runs)
         typer.echo(
-            f"Error: unsupported language '{language}'.\nAvailable: {', '.join(LANGUAGES)}",
+            f"Segmented {runs} time(s): {result.resumes_per_second:,.0f} resumes/s, "
+            f"{result.megabytes_per_second:.1f} MB/s"
+        )
+
+
+@app.command()
+def rank(
+    role: str = typer.Option(..., "--role", "-r", help="Target role to rank for."),
+    top: int = typer.Option(10, "--top", "-k", min=1, help="Candidates to show."),
+    weight: list[str] = typer.Option(
+        [],
+        "--weight",
+        "-w",
+        help="Competency weight as 'Category:weight'. Repeatable.",
+    ),
+    role_weight: float = typer.Option(
+        1.0, "--role-weight", help="Weight of the target-role score."
+    ),
+    critical_penalty: float = typer.Option(
+        5.0, "--critical-penalty", help="Points subtracted per Critical gap."
+    ),
+    important_penalty: float = typer.Option(
+        0.0, "--important-penalty", help="Points subtracted per Important gap."
+    ),
+) -> None:
+    """Rank stored candidates for a target role."""
+    try:
+        competencies = parse_weights(weight)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+
+    weights = RankingWeights(
+        role=role_weight,
+        competencies=competencies,
+        critical_penalty=critical_penalty,
+        important_penalty=important_penalty,
+    )
+    ranked = get_candidate_pool(get_store()).rank(role, weights, top)
+    if not ranked:
+        typer.echo("No stored analyses found.")
+        return
+
+    typer.echo(f"{'#':>3}  {'Score':>7}  {'Role':>5}  {'Critical':>8}  Analysis")
+    for position, candidate in enumerate(ranked, start=1):
+        typer.echo(
+            f"{position:>3}  {candidate.score:>7.1f}  {candidate.role_score:>5.0f}  "
+            f"{candidate.critical_missing:>8}  {candidate.id}"
+        )
+
+
+@app.command()
+def search(
+    query: str = typer.Argument(..., help="Words to search the stored resumes for."),
+    top: int = typer.Option(10, "--top", "-k", min=1, help="Results to show."),
+) -> None:
+    """Full-text search over the resumes of stored analyses."""
+    hits = get_store().search(query, top)
+    if not hits:
+        typer.echo("No matching resumes found.")
+        return
+
+    typer.echo(f"{'#':>3}  {'Score':>7}  {'Overall':>7}  Analysis  Role")
+    for position, (record, score) in enumerate(hits, start=1):
+        summary = record["result"].get("overall_summary")
+        overall = summary.get("overall_score") if isinstance(summary, dict) else None
+        overall_text = "-" if overall is None else str(overall)
+        typer.echo(
+            f"{position:>3}  {score:>7.2f}  {overall_text:>7}  {record['id']}  "
+            f"{record.get('role') or '-'}"
+        )
+
+
+@app.command()
+def report(
+    inputs: Optional[list[Path]] = typer.Argument(
+        None, help="Analysis JSON files (analyze -o output or stored records)."
+    ),
+    all_stored: bool = typer.Option(
+        False, "--all", help="Render every analysis in the local store."
+    ),
+    out_dir: Path = typer.Option(
+        Path("reports"), "--out-dir", "-d", help="Directory to write reports to."
+    ),
+    fmt: str = typer.Option("html", "--format", "-f", help="Report format."),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", "-j", min=1, help="Worker processes (default: CPU count)."
+    ),
+) -> None:
+    """Render analyses as standalone HTML or PDF reports."""
+    if fmt not in REPORT_FORMATS:
+        typer.echo(
+            f"Error: unsupported format '{fmt}'. Choose from: "
+            f"{', '.join(REPORT_FORMATS)}",
             err=True,
         )
         raise typer.Exit(1)
 
-    if not config.GEMINI_API_KEY:
-        typer.echo("Error: GEMINI_API_KEY is not set.", err=True)
+    sources = list(inputs or [])
+    if all_stored:
+        sources += sorted(get_store().analyses_dir.glob("*.json"))
+    if not sources:
+        typer.echo("Error: pass analysis JSON files or --all.", err=True)
+        raise typer.Exit(1)
+    missing = [str(s) for s in sources if not s.exists()]
+    if missing:
+        typer.echo(f"Error: file(s) not found: {', '.join(missing)}", err=True)
         raise typer.Exit(1)
 
-    typer.echo("Extracting text from PDF...")
     try:
-        text = _extract_text(resume)
-    except Exception as e:
-        typer.echo(f"Error reading PDF: {e}", err=True)
+        result = render_batch(sources, out_dir, fmt, workers)
+    except RuntimeError as e:
+        typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(1)
 
-    if not text:
-        typer.echo("Error: could not extract text from the PDF.", err=True)
+    for source, error in result.failed.items():
+        typer.echo(f"Skipped {source}: {error}", err=True)
+    typer.echo(f"Wrote {len(result.written)} report(s) to {out_dir}")
+    if result.failed:
         raise typer.Exit(1)
 
-    typer.echo("Analyzing resume...")
-    genai.configure(api_key=config.GEMINI_API_KEY)
-    model = genai.GenerativeModel("gemini-2.0-flash-lite")
-    prompt = get_resume_analysis_prompt(text, language, role)
+
+@app.command("provision-tenants")
+def provision_tenants(
+    slugs: Optional[list[str]] = typer.Argument(
+        None, help="Organization slugs to create or migrate schemas for."
+    ),
+    slug_file: Optional[Path] = typer.Option(
+        None, "--file", "-f", help="File with one organization slug per line."
+    ),
+    connections: int = typer.Option(
+        config.TENANT_PROVISION_CONNECTIONS,
+        "--connections",
+        "-c",
+        min=1,
+        help="Maximum database connections to use at once.",
+    ),
+) -> None:
+    """Create and migrate organization schemas concurrently."""
+    from levelup.database.core import engine
+    from levelup.database.manage import provision_tenants as provision
+
+    requested = list(slugs or [])
+    if slug_file:
+        lines = slug_file.read_text(encoding="utf-8").splitlines()
+        requested += [line.strip() for line in lines if line.strip()]
+    if not requested:
+        typer.echo("Error: pass organization slugs or --file.", err=True)
+        raise typer.Exit(1)
 
     try:
-        response = model.generate_content(prompt)
-        raw = (response.text or "").strip()
-    except Exception as e:
-        typer.echo(f"Error calling LLM: {e}", err=True)
+        results = provision(engine, requested, max_connections=connections)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(1)
 
-    result = _extract_json(raw)
-    if not result:
-        typer.echo("Error: could not parse the analysis response.", err=True)
+    for result in results:
+        line = f"{result.status:<9}{result.seconds:>7.2f}s  {result.schema}"
+        typer.echo(f"{line}  {result.error}" if result.error else line)
+    counts = {status: 0 for status in ("created", "migrated", "skipped", "failed")}
+    for result in results:
+        counts[result.status] += 1
+    typer.echo(", ".join(f"{n} {status}" for status, n in counts.items()))
+    if counts["failed"]:
         raise typer.Exit(1)
 
-    output_json = json.dumps(result, indent=2, ensure_ascii=False)
 
-    if output:
-        output.write_text(output_json, encoding="utf-8")
-        typer.echo(f"Results saved to {output}")
-    else:
-        typer.echo(output_json)
+@app.command("init-db")
+def init_db() -> None:
+    """Create the database, the core schema and its tables (including the job queue)."""
+    from levelup.database.core import engine
+    from levelup.database.manage import init_database
+
+    init_database(engine)
+    typer.echo("Database initialized.")
+
+
+@app.command()
+def export(
+    output: str = typer.Option(
+        "analyses.ndjson.gz",
+        "--output",
+        "-o",
+        help="File to write (gzipped if it ends in .gz), or '-' for stdout.",
+    ),
+    since: Optional[str] = typer.Option(
+        None, "--since", help="Only analyses created on or after this ISO date."
+    ),
+    batch_size: int = typer.Option(
+        1000, "--batch-size", min=1, help="Rows fetched per round trip."
+    ),
+    source: str = typer.Option(
+        "all",
+        "--source",
+        help="Export the database, the local analysis store, or all (both).",
+    ),
+) -> None:
+    """Stream the stored analyses out of the database and analysis store as NDJSON."""
+    from levelup.transfer import export_ndjson, open_text
+
+    if source not in ("all", "database", "store"):
+        typer.echo(
+            f"Error: unknown source '{source}'. Choose from: all, database, store.",
+            err=True,
+        )
+        raise typer.Exit(code=1)
+    session = None
+    if source != "store":
+        from levelup.database.core import SessionLocal
+
+        session = SessionLocal()
+    store = get_store() if source != "database" else None
+
+    start = None
+    if since:
+        try:
+            start = datetime.fromisoformat(since)
+        except ValueError:
+            typer.echo(f"Error: invalid date '{since}'.", err=True)
+            raise typer.Exit(code=1)
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+
+    from levelup.database.routing import read_only
+
+    # The export only reads, so it can run on a replica.
+    with session or nullcontext(), read_only(session) if session else nullcontext():
+        if output == "-":
+            count = export_ndjson(session, sys.stdout, start, batch_size, store)
+        else:
+            with open_text(output, "wt") as out:
+                count = export_ndjson(session, out, start, batch_size, store)
+    typer.echo(f"Exported {count} analyses.", err=True)
+
+
+@app.command("import")
+def import_(
+    paths: list[Path] = typer.Argument(
+        ..., help="NDJSON exports, analysis JSON files or directories of them."
+    ),
+    batch_size: int = typer.Option(
+        5000, "--batch-size", min=1, help="Rows sent per batch."
+    ),
+) -> None:
+    """Bulk-load analyses into the database, skipping those already present."""
+    from levelup.database.core import engine
+    from levelup.transfer import import_records, read_records
+
+    missing = [str(path) for path in paths if not path.exists()]
+    if missing:
+        typer.echo(f"Error: file not found: {', '.join(missing)}", err=True)
+        raise typer.Exit(code=1)
+
+    errors: list[str] = []
+    result = import_records(engine, read_records(paths, errors), batch_size)
+    typer.echo(
+        f"Read {result.read} analyses: {result.inserted} imported, "
+        f"{result.read - result.inserted} already present, {len(errors)} invalid."
+    )
+
+
+@app.command()
+def worker(
+    concurrency: int = typer.Option(
+        config.WORKER_CONCURRENCY,
+        "--concurrency",
+        "-c",
+        min=1,
+        help="Jobs to run at once on this node.",
+    ),
+) -> None:
+    """Run queued analysis jobs until interrupted."""
+    from levelup.database.core import engine
+    from levelup.jobs import JobQueue
+    from levelup.worker import Worker
+
+    runner = Worker(JobQueue(engine), concurrency=concurrency)
+
+    def _stop(signum: int, frame: Any) -> None:
+        typer.echo("Stopping after the running jobs finish...", err=True)
+        runner.stop()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+    typer.echo(f"Worker {runner.worker_id} running {concurrency} job(s) at a time.")
+    runner.run()
+
+
+@app.command()
+def loadtest(
+    duration: float = typer.Option(
+        30.0, "--duration", "-d", min=1, help="Seconds to generate load for."
+    ),
+    concurrency: int = typer.Option(
+        10, "--concurrency", "-c", min=1, help="Concurrent virtual users."
+    ),
+    mix: str = typer.Option(
+        "analyze=6,search=2,rank=2",
+        "--mix",
+        help="Request kind weights: analyze, submit, poll, search, rank.",
+    ),
+    llm_latency: str = typer.Option(
+        "lognormal:2,0.5",
+        "--llm-latency",
+        help="Stub model latency: fixed:S, uniform:MIN,MAX, normal:MEAN,SD "
+        "or lognormal:MEDIAN,SIGMA (seconds).",
+    ),
+    llm_error_rate: float = typer.Option(
+        0.0, "--llm-error-rate", min=0, max=1, help="Share of failing model calls."
+    ),
+    resumes: int = typer.Option(
+        50, "--resumes", min=1, help="Distinct synthetic resumes to upload."
+    ),
+    use_quota: bool = typer.Option(
+        False, "--quota/--no-quota", help="Enforce the request quota during the run."
+    ),
+    output: Optional[Path] = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Save the report as JSON (default: loadtest-results/<time>-<commit>.json).",
+    ),
+    compare_with: Optional[Path] = typer.Option(
+        None, "--compare", help="Earlier report to compare the results with."
+    ),
+) -> None:
+    """Measure the API's capacity under mixed traffic against a stubbed model."""
+    from levelup.loadtest import compare, format_report, run_load_test
+    from levelup.main import app as api
+
+    baseline = None
+    if compare_with:
+        try:
+            baseline = json.loads(compare_with.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            typer.echo(f"Error reading {compare_with}: {e}", err=True)
+            raise typer.Exit(1)
+
+    typer.echo(
+        f"Running {concurrency} users for {duration:.0f}s ({mix}, model {llm_latency})...",
+        err=True,
+    )
+    try:
+        report = run_load_test(
+            api,
+            duration=duration,
+            concurrency=concurrency,
+            mix=mix,
+            latency=llm_latency,
+            error_rate=llm_error_rate,
+            resumes=resumes,
+            use_quota=use_quota,
+        )
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+
+    typer.echo(format_report(report))
+    if baseline is not None:
+        typer.echo(compare(report, baseline))
+
+    if output is None:
+        stamp = report["started_at"][:19].replace(":", "").replace("-", "")
+        output = (
+            Path("loadtest-results") / f"{stamp}-{report['commit'] or 'local'}.json"
+        )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    typer.echo(f"Report saved to {output}", err=True)
 
 
 def main() -> None:
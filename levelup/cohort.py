@@ -0,0 +1,208 @@
+"""Columnar analytics over pools of stored analyses.
+
+Analysis results are flattened once into long-format DataFrames (one row per
+candidate, domain score, competency score, missing skill and role suitability
+entry); every aggregate below is then computed with vectorized pandas
+operations instead of per-record Python loops.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+import pandas as pd  # type: ignore[import-untyped]
+
+NO_ROLE = "No specific target role"
+PRIORITY_ORDER = ["Critical", "Important", "Nice to have"]
+DEFAULT_PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+class CohortFrames(NamedTuple):
+    """Long-format frames built from a pool of analyses, keyed by candidate id."""
+
+    candidates: pd.DataFrame
+    domains: pd.DataFrame
+    competencies: pd.DataFrame
+    missing_skills: pd.DataFrame
+    role_suitability: pd.DataFrame
+
+
+def as_record(data: dict[str, Any], fallback_id: str) -> dict[str, Any]:
+    """Wraps a bare analysis result (``levelup analyze -o`` output) like a store record."""
+    if isinstance(data.get("result"), dict):
+        return data
+    return {"id": fallback_id, "language": None, "role": None, "result": data}
+
+
+def load_records(paths: Iterable[Path | str]) -> list[dict[str, Any]]:
+    """Loads store records or bare analysis results from JSON files."""
+    records = []
+    for path in map(Path, paths):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if isinstance(data, dict):
+            records.append(as_record(data, path.stem))
+    return records
+
+
+def _dict(value: Any) -> dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def _dicts(value: Any) -> list[dict[str, Any]]:
+    """The dict items of a list; anything else in a malformed result is skipped."""
+    if not isinstance(value, list):
+        return []
+    return [item for item in value if isinstance(item, dict)]
+
+
+def build_frames(records: Iterable[dict[str, Any]]) -> CohortFrames:
+    """Flattens analysis records into the columnar cohort frames."""
+    candidates: dict[str, list[Any]] = {
+        "id": [],
+        "role": [],
+        "language": [],
+        "overall_score": [],
+        "talent_potential": [],
+    }
+    domains: dict[str, list[Any]] = {"id": [], "domain": [], "score": []}
+    competencies: dict[str, list[Any]] = {"id": [], "category": [], "score": []}
+    missing: dict[str, list[Any]] = {"id": [], "skill": [], "priority": []}
+    suitability: dict[str, list[Any]] = {"id": [], "position": [], "score": []}
+    suitability_roles: list[Any] = []
+
+    for i, record in enumerate(records):
+        result = _dict(record.get("result"))
+        cid = str(record.get("id") or i)
+        summary = _dict(result.get("overall_summary"))
+        candidates["id"].append(cid)
+        candidates["role"].append(record.get("role") or NO_ROLE)
+        candidates["language"].append(record.get("language") or result.get("language"))
+        candidates["overall_score"].append(summary.get("overall_score"))
+        candidates["talent_potential"].append(summary.get("talent_potential"))
+
+        for d in _dicts(result.get("domain_scores")):
+            domains["id"].append(cid)
+            domains["domain"].append(d.get("domain"))
+            domains["score"].append(d.get("score"))
+        for c in _dicts(result.get("competency_scores")):
+            competencies["id"].append(cid)
+            competencies["category"].append(c.get("category"))
+            competencies["score"].append(c.get("score"))
+        for m in _dicts(result.get("missing_skills")):
+            missing["id"].append(cid)
+            missing["skill"].append(m.get("skill"))
+            missing["priority"].append(m.get("priority"))
+        for position, r in enumerate(_dicts(summary.get("role_suitability"))):
+            suitability["id"].append(cid)
+            suitability["position"].append(position)
+            suitability["score"].append(r.get("score"))
+            suitability_roles.append(r.get("role"))
+    suitability["suitable_role"] = suitability_roles
+
+    candidates_df = pd.DataFrame(candidates)
+    candidates_df["overall_score"] = pd.to_numeric(
+        candidates_df["overall_score"], errors="coerce"
+    )
+    candidates_df["role"] = candidates_df["role"].astype("category")
+
+    role_by_id = candidates_df.set_index("id")["role"]
+
+    def _finish(frame: pd.DataFrame, label: str) -> pd.DataFrame:
+        frame = frame.copy()
+        frame[label] = frame[label].astype("string").str.strip()
+        if "score" in frame:
+            frame["score"] = pd.to_numeric(frame["score"], errors="coerce")
+        frame.insert(1, "role", frame["id"].map(role_by_id))
+        frame[label] = frame[label].astype("category")
+        return frame
+
+    missing_df = _finish(pd.DataFrame(missing), "skill")
+    priority = missing_df["priority"].astype("string").str.strip().str.lower()
+    missing_df["priority"] = pd.Categorical(
+        priority.map({p.lower(): p for p in PRIORITY_ORDER}),
+        categories=PRIORITY_ORDER,
+        ordered=True,
+    )
+
+    return CohortFrames(
+        candidates=candidates_df,
+        domains=_finish(pd.DataFrame(domains), "domain"),
+        competencies=_finish(pd.DataFrame(competencies), "category"),
+        missing_skills=missing_df,
+        role_suitability=_finish(pd.DataFrame(suitability), "suitable_role"),
+    )
+
+
+def skill_gap_frequency(frames: CohortFrames, top: int | None = None) -> pd.DataFrame:
+    """Counts how many candidates of each role miss each skill.
+
+    Returns one row per (role, skill) with the number of candidates, the share
+    of the role's candidates and how many rated the gap Critical.
+    """
+    missing = frames.missing_skills.drop_duplicates(["id", "skill"])
+    missing = missing.assign(critical=missing["priority"] == "Critical")
+    out = (
+        missing.groupby(["role", "skill"], observed=True)
+        .agg(candidates=("id", "size"), critical=("critical", "sum"))
+        .reset_index()
+    )
+    pool_sizes = frames.candidates.groupby("role", observed=True)["id"].count()
+    out["share"] = out["candidates"] / out["role"].map(pool_sizes).astype(float)
+    out = out.sort_values(
+        ["role", "candidates", "critical"], ascending=[True, False, False]
+    )
+    if top is not None:
+        out = out.groupby("role", observed=True).head(top)
+    return out.reset_index(drop=True)
+
+
+def score_distribution(
+    frames: CohortFrames, percentiles: Iterable[float] = DEFAULT_PERCENTILES
+) -> pd.DataFrame:
+    """Summarizes overall scores per role: count, mean, std and percentiles."""
+    qs = list(percentiles)
+    scores = frames.candidates.groupby("role", observed=True)["overall_score"]
+    summary = scores.agg(["count", "mean", "std", "min", "max"])
+    quantiles = scores.quantile(qs).unstack()
+    quantiles.columns = [f"p{round(q * 100)}" for q in qs]
+    return summary.join(quantiles)
+
+
+def score_histogram(frames: CohortFrames, bin_width: int = 10) -> pd.DataFrame:
+    """Counts candidates per overall-score bucket (rows) and role (columns).
+
+    Buckets are labelled by their lower bound; a score of 100 falls into the
+    last bucket.
+    """
+    scores = frames.candidates["overall_score"]
+    buckets = (scores // bin_width * bin_width).clip(upper=100 - bin_width)
+    return pd.crosstab(buckets.rename("score_bucket"), frames.candidates["role"])
+
+
+def competency_heatmap(frames: CohortFrames) -> pd.DataFrame:
+    """Mean competency score with roles as rows and categories as columns."""
+    return frames.competencies.pivot_table(
+        index="role", columns="category", values="score", aggfunc="mean", observed=True
+    )
+
+
+def domain_fit(frames: CohortFrames) -> pd.DataFrame:
+    """Mean score and candidate count per role and career domain."""
+    return (
+        frames.domains.groupby(["role", "domain"], observed=True)["score"]
+        .agg(["mean", "count"])
+        .sort_values("mean", ascending=False)
+        .reset_index()
+    )
+
+
+def export_parquet(frames: CohortFrames, directory: Path | str) -> list[Path]:
+    """Writes every cohort frame to ``<directory>/<name>.parquet``."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name, frame in frames._asdict().items():
+        path = directory / f"{name}.parquet"
+        frame.to_parquet(path, index=False)
+        written.append(path)
+    return written
@@ -91,15 +91,169 @@ DATABASE_ENGINE_POOL_SIZE = config("DATABASE_ENGINE_POOL_SIZE", cast=int, defaul
 DATABASE_ENGINE_POOL_TIMEOUT = config(
     "DATABASE_ENGINE_POOL_TIMEOUT", cast=int, default=30
 )
+# Adaptive pool sizing from observed concurrency: off, recommend or adjust
+DATABASE_ENGINE_POOL_ADAPTIVE = config("DATABASE_ENGINE_POOL_ADAPTIVE", default="off")
+# Upper bound of pool_size + max_overflow when the pool is adjusted
+DATABASE_ENGINE_POOL_MAX_TOTAL = config(
+    "DATABASE_ENGINE_POOL_MAX_TOTAL", cast=int, default=50
+)
+# Lower bound of the recommended pool_size, so quiet periods do not shrink it to 1
+DATABASE_ENGINE_POOL_MIN_SIZE = config(
+    "DATABASE_ENGINE_POOL_MIN_SIZE", cast=int, default=5
+)
+# Seconds of checkouts considered, and how often the sizing is re-evaluated
+DATABASE_ENGINE_POOL_ADAPTIVE_WINDOW = config(
+    "DATABASE_ENGINE_POOL_ADAPTIVE_WINDOW", cast=float, default=300.0
+)
+DATABASE_ENGINE_POOL_ADAPTIVE_INTERVAL = config(
+    "DATABASE_ENGINE_POOL_ADAPTIVE_INTERVAL", cast=float, default=60.0
+)
 SQLALCHEMY_DATABASE_URI = f"postgresql+psycopg2://{_DATABASE_CREDENTIAL_USER}:{_QUOTED_DATABASE_PASSWORD}@{DATABASE_HOSTNAME}:{DATABASE_PORT}/{DATABASE_NAME}"
 
+# read replicas
+# Comma-separated "host[:port]" list of read replicas using the primary's credentials
+DATABASE_REPLICA_HOSTNAMES = config(
+    "DATABASE_REPLICA_HOSTNAMES", cast=CommaSeparatedStrings, default=""
+)
+SQLALCHEMY_REPLICA_URIS = [
+    f"postgresql+psycopg2://{_DATABASE_CREDENTIAL_USER}:{_QUOTED_DATABASE_PASSWORD}@{host if ':' in host else f'{host}:{DATABASE_PORT}'}/{DATABASE_NAME}"
+    for host in map(str, DATABASE_REPLICA_HOSTNAMES)
+]
+# Seconds a replica is skipped after a connection error
+DATABASE_REPLICA_RETRY_SECONDS = config(
+    "DATABASE_REPLICA_RETRY_SECONDS", cast=float, default=30.0
+)
+
 ALEMBIC_CORE_REVISION_PATH = config(
     "ALEMBIC_CORE_REVISION_PATH",
     default=f"{os.path.dirname(os.path.realpath(__file__))}/database/alembic",
 )
+ALEMBIC_TENANT_REVISION_PATH = config(
+    "ALEMBIC_TENANT_REVISION_PATH",
+    default=f"{os.path.dirname(os.path.realpath(__file__))}/database/alembic/tenant",
+)
 ALEMBIC_INI_PATH = config(
     "ALEMBIC_INI_PATH",
     default=f"{os.path.dirname(os.path.realpath(__file__))}/alembic.ini",
 )
 
 GEMINI_API_KEY = config("GEMINI_API_KEY", default="", cast=str)
+
+# analysis
+# Run the analysis as concurrent per-section calls instead of one large prompt
+ANALYSIS_CONCURRENT_SECTIONS = config(
+    "ANALYSIS_CONCURRENT_SECTIONS", cast=bool, default=False
+)
+ANALYSIS_SECTION_WORKERS = config("ANALYSIS_SECTION_WORKERS", cast=int, default=5)
+
+# analysis store
+ANALYSIS_STORE_PATH = config(
+    "ANALYSIS_STORE_PATH", default=os.path.expanduser("~/.levelup")
+)
+# Save analyses from the web interface and reuse them for near-duplicate resumes
+ANALYSIS_STORE_ENABLED = config("ANALYSIS_STORE_ENABLED", cast=bool, default=False)
+# Minimum estimated Jaccard similarity for reusing a previous analysis
+ANALYSIS_REUSE_THRESHOLD = config("ANALYSIS_REUSE_THRESHOLD", cast=float, default=0.8)
+
+# pdf extraction
+# Extraction stops after this many pages or roughly this many tokens (0 disables)
+PDF_MAX_PAGES = config("PDF_MAX_PAGES", cast=int, default=20)
+PDF_MAX_TOKENS = config("PDF_MAX_TOKENS", cast=int, default=24000)
+
+# skill taxonomy
+# Scan resumes for known skills, hint them to the model and normalize skill names
+SKILL_PRESCREEN_ENABLED = config("SKILL_PRESCREEN_ENABLED", cast=bool, default=True)
+# Optional JSON file of {"Canonical Skill": ["alias", ...]} extending the built-in taxonomy
+SKILL_TAXONOMY_PATH = config("SKILL_TAXONOMY_PATH", default="")
+
+# tenant provisioning
+# Maximum number of database connections used to provision tenant schemas
+TENANT_PROVISION_CONNECTIONS = config(
+    "TENANT_PROVISION_CONNECTIONS", cast=int, default=4
+)
+
+# health checks
+# Seconds a readiness report is served from cache before it is refreshed
+HEALTH_CHECK_TTL = config("HEALTH_CHECK_TTL", cast=float, default=10.0)
+# Seconds after which a single check counts as down
+HEALTH_CHECK_TIMEOUT = config("HEALTH_CHECK_TIMEOUT", cast=float, default=3.0)
+# Probe the LLM backend (model metadata only, no generation) in readiness checks
+HEALTH_CHECK_LLM = config("HEALTH_CHECK_LLM", cast=bool, default=True)
+
+# api quotas
+# Charge API requests against a per-client budget of cost units
+QUOTA_ENABLED = config("QUOTA_ENABLED", cast=bool, default=True)
+# Budget of cost units per client, refilled continuously over the window
+QUOTA_BUDGET = config("QUOTA_BUDGET", cast=float, default=200000.0)
+QUOTA_WINDOW_SECONDS = config("QUOTA_WINDOW_SECONDS", cast=float, default=3600.0)
+# Units charged by cheap endpoints; analyses are charged their estimated prompt tokens
+QUOTA_REQUEST_COST = config("QUOTA_REQUEST_COST", cast=float, default=1.0)
+# Known API keys (X-API-Key), as "key" or "key=budget"; other clients are keyed by address
+QUOTA_API_KEYS = config("QUOTA_API_KEYS", cast=CommaSeparatedStrings, default="")
+# Reverse proxies (addresses or CIDR networks) whose X-Forwarded-For is trusted
+QUOTA_TRUSTED_PROXIES = config(
+    "QUOTA_TRUSTED_PROXIES", cast=CommaSeparatedStrings, default=""
+)
+# SQLite file shared by all workers (default: quota.sqlite3 in ANALYSIS_STORE_PATH)
+QUOTA_STORE_PATH = config("QUOTA_STORE_PATH", default="")
+
+# prompt budget
+# Maximum input tokens of an analysis prompt; the resume is trimmed to fit (0 disables)
+PROMPT_MAX_INPUT_TOKENS = config("PROMPT_MAX_INPUT_TOKENS", cast=int, default=16000)
+# Count prompt tokens with the model backend instead of the local estimate
+TOKEN_COUNT_EXACT = config("TOKEN_COUNT_EXACT", cast=bool, default=False)
+
+# job queue
+# Seconds a claimed job is leased to its worker; workers renew it every third
+JOB_LEASE_SECONDS = config("JOB_LEASE_SECONDS", cast=float, default=60.0)
+# Attempts before a failing job is moved to the dead letter (status "dead")
+JOB_MAX_ATTEMPTS = config("JOB_MAX_ATTEMPTS", cast=int, default=5)
+# Retry backoff: doubles from the base delay up to the maximum
+JOB_RETRY_BASE_SECONDS = config("JOB_RETRY_BASE_SECONDS", cast=float, default=10.0)
+JOB_RETRY_MAX_SECONDS = config("JOB_RETRY_MAX_SECONDS", cast=float, default=600.0)
+# Jobs run at once by one `levelup worker` process
+WORKER_CONCURRENCY = config("WORKER_CONCURRENCY", cast=int, default=4)
+# Seconds an idle worker waits before looking for new jobs
+WORKER_POLL_SECONDS = config("WORKER_POLL_SECONDS", cast=float, default=1.0)
+# Queued jobs at which the readiness check reports the service as degraded (0 disables)
+HEALTH_QUEUE_DEPTH_WARN = config("HEALTH_QUEUE_DEPTH_WARN", cast=int, default=1000)
+
+# llm scheduling
+# Model calls running at once in this process (0 disables scheduling)
+LLM_MAX_CONCURRENCY = config("LLM_MAX_CONCURRENCY", cast=int, default=8)
+# Slots only interactive calls may use, so bulk jobs never take them all
+LLM_INTERACTIVE_RESERVED = config("LLM_INTERACTIVE_RESERVED", cast=int, default=2)
+# Seconds of waiting after which a lane gains one priority level (0 disables aging)
+LLM_SCHEDULER_AGING_SECONDS = config(
+    "LLM_SCHEDULER_AGING_SECONDS", cast=float, default=30.0
+)
+# Fair-share weights of organizations, as "slug=weight" (default weight 1)
+LLM_TENANT_WEIGHTS = config(
+    "LLM_TENANT_WEIGHTS", cast=CommaSeparatedStrings, default=""
+)
+
+# incremental re-analysis
+# Re-run only the analysis parts affected by the sections changed since a stored version
+ANALYSIS_INCREMENTAL_ENABLED = config(
+    "ANALYSIS_INCREMENTAL_ENABLED", cast=bool, default=True
+)
+# Minimum estimated Jaccard similarity for treating a resume as a new version of another
+ANALYSIS_INCREMENTAL_THRESHOLD = config(
+    "ANALYSIS_INCREMENTAL_THRESHOLD", cast=float, default=0.6
+)
+
+# profiling
+# Show a collapsible panel with the stage timings of each run in the web interface
+STREAMLIT_DEBUG_PANEL = config("STREAMLIT_DEBUG_PANEL", cast=bool, default=False)
+
+# tracing
+# Record spans of requests, jobs and CLI analyses (PDF, prompts, LLM calls, parsing, queries)
+TRACING_ENABLED = config("TRACING_ENABLED", cast=bool, default=False)
+# Fraction of traces kept whatever happens (head sampling); also Sentry's trace rate
+TRACE_SAMPLE_RATE = config("TRACE_SAMPLE_RATE", cast=float, default=0.01)
+# Also keep traces slower than this many milliseconds (tail sampling, 0 disables)
+TRACE_SLOW_MS = config("TRACE_SLOW_MS", cast=float, default=5000.0)
+# Also keep traces of failed requests and jobs (tail sampling)
+TRACE_KEEP_ERRORS = config("TRACE_KEEP_ERRORS", cast=bool, default=True)
+# NDJSON file the kept traces are appended to (default: traces.ndjson in ANALYSIS_STORE_PATH)
+TRACE_FILE = config("TRACE_FILE", default="")
@@ -0,0 +1,112 @@
+"""Alembic environment of the organization (tenant) schemas.
+
+Every organization schema has the same tables: the models without a schema.
+Tenant migrations are written without a schema too and run once per tenant
+schema, with the schema translated and an ``alembic_version`` table of its own.
+
+``levelup provision-tenants`` runs them through ``levelup.database.manage``,
+which passes its connection and the schema in ``config.attributes``. From the
+command line, ``-x schema=<name>`` migrates one schema and no option migrates
+every ``dispatch_organization_*`` schema of the database.
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import Connection, create_engine, inspect, pool
+
+import levelup.config as settings
+import levelup.models  # noqa: F401  (registers the models on Base.metadata)
+from levelup.database.core import ORGANIZATION_SCHEMA_PREFIX, Base
+
+config = context.config
+
+if "connection" not in config.attributes and config.config_file_name:
+    # Only when run from the alembic command line; the application has its own.
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Leaves the shared ``dispatch_core`` tables out of tenant migrations."""
+    if type_ == "table":
+        return obj.schema is None
+    return True
+
+
+def get_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or str(
+        settings.SQLALCHEMY_DATABASE_URI
+    )
+
+
+def requested_schema() -> str | None:
+    return config.attributes.get("schema") or context.get_x_argument(
+        as_dictionary=True
+    ).get("schema")
+
+
+def tenant_schemas(connection: Connection) -> list[str]:
+    prefix = f"{ORGANIZATION_SCHEMA_PREFIX}_"
+    return [
+        name
+        for name in inspect(connection).get_schema_names()
+        if name.startswith(prefix)
+    ]
+
+
+def run_migrations_offline():
+    """Emits the SQL migrating one schema, given with ``-x schema=<name>``."""
+    schema = requested_schema()
+    if not schema:
+        raise ValueError("Offline tenant migrations need -x schema=<name>")
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        version_table_schema=schema,
+        literal_binds=True,
+        compare_type=True,
+    )
+
+    with context.begin_transaction():
+        context.execute(f'SET search_path TO "{schema}"')
+        context.run_migrations()
+
+
+def migrate_schema(connection: Connection, schema: str):
+    connection = connection.execution_options(schema_translate_map={None: schema})
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        version_table_schema=schema,
+        compare_type=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Migrates the given schema, or every tenant schema, on a connection."""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        schema = requested_schema()
+        for name in [schema] if schema else tenant_schemas(connection):
+            migrate_schema(connection, name)
+        return
+
+    connectable = create_engine(get_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        schema = requested_schema()
+        for name in [schema] if schema else tenant_schemas(connection):
+            migrate_schema(connection, name)
+            connection.commit()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -13,9 +13,15 @@ from sqlalchemy.orm import DeclarativeBase, Session, declared_attr, sessionmaker
 from starlette.requests import Request
 
 import levelup.config as cfg
+from levelup.database.pool import InstrumentedQueuePool, PoolAdvisor, instrument_pool
+from levelup.database.routing import ReplicaSet, RoutingSession
+from levelup.tracing import trace_queries
 
 logger = logging.getLogger(__name__)
 
+# Tenant tables live in one schema per organization: <prefix>_<organization slug>.
+ORGANIZATION_SCHEMA_PREFIX = "dispatch_organization"
+
 
 class SessionTracker:
     """Stub implementation for session tracking."""
@@ -71,11 +77,16 @@ class SessionTracker:
         ]
 
 
-def create_db_engine(connection_string: str) -> Any:
+def create_db_engine(connection_string: str, pool_name: str = "default") -> Any:
     """Create a database engine with proper timeout settings.
 
+    The engine's pool is instrumented (see ``levelup.database.pool``) and its
+    metrics are labelled with ``pool_name``. Its queries are recorded in the
+    current trace, if any (see ``levelup.tracing``).
+
     Args:
         connection_string: Database connection string
+        pool_name: Name of the pool in the exported metrics
     """
     url = make_url(connection_string)
 
@@ -92,7 +103,22 @@ def create_db_engine(connection_string: str) -> Any:
         # Connection pre-ping to verify connection is still alive
         "pool_pre_ping": cfg.DATABASE_ENGINE_POOL_PING,
     }
-    return create_engine(url, **timeout_kwargs)
+    db_engine = create_engine(url, poolclass=InstrumentedQueuePool, **timeout_kwargs)
+    trace_queries(db_engine)
+    if isinstance(db_engine.pool, InstrumentedQueuePool):
+        instrument_pool(
+            db_engine.pool,
+            name=pool_name,
+            mode=cfg.DATABASE_ENGINE_POOL_ADAPTIVE,
+            advisor=PoolAdvisor(
+                window=cfg.DATABASE_ENGINE_POOL_ADAPTIVE_WINDOW,
+                interval=cfg.DATABASE_ENGINE_POOL_ADAPTIVE_INTERVAL,
+                max_total=cfg.DATABASE_ENGINE_POOL_MAX_TOTAL,
+                min_size=cfg.DATABASE_ENGINE_POOL_MIN_SIZE,
+            ),
+            engine=db_engine,
+        )
+    return db_engine
 
 
 # Create the default engine with standard timeout
@@ -120,7 +146,16 @@ engine = create_db_engine(
 #         logger.warning("Slow Query (%.2fs): %s", total, statement)
 
 
-SessionLocal = sessionmaker(bind=engine)
+# Read replicas from DATABASE_REPLICA_HOSTNAMES; empty when none are configured
+replicas = ReplicaSet(
+    [
+        create_db_engine(uri, pool_name=f"replica-{index}")
+        for index, uri in enumerate(cfg.SQLALCHEMY_REPLICA_URIS)
+    ],
+    retry_seconds=cfg.DATABASE_REPLICA_RETRY_SECONDS,
+)
+
+SessionLocal = sessionmaker(bind=engine, class_=RoutingSession, replicas=replicas)
 
 
 def resolve_table_name(name: str) -> str:
@@ -252,12 +287,15 @@ def get_table_name_by_class_instance(class_instance: Base) -> str:
 
 def refetch_db_session(organization_slug: str) -> Session:
     """Create a new database session for a specific organization."""
-    schema_engine = engine.execution_options(
-        schema_translate_map={
-            None: f"dispatch_organization_{organization_slug}",
-        }
+    schema_translate_map = {
+        None: f"{ORGANIZATION_SCHEMA_PREFIX}_{organization_slug}",
+    }
+    schema_engine = engine.execution_options(schema_translate_map=schema_translate_map)
+    session = RoutingSession(
+        bind=schema_engine,
+        replicas=replicas,
+        replica_execution_options={"schema_translate_map": schema_translate_map},
     )
-    session = sessionmaker(bind=schema_engine)()
     session._dispatch_session_id = SessionTracker.track_session(  # type: ignore
         session, context=f"organization_{organization_slug}"
     )
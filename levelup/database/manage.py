@@ -1,14 +1,22 @@
+import functools
 import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, NamedTuple
 
 from alembic import command as alembic_command
 from alembic.config import Config as AlembicConfig
-from sqlalchemy import Engine
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import Connection, Engine, inspect, text
 from sqlalchemy.schema import CreateSchema, Table
 from sqlalchemy_utils import create_database, database_exists
 
 import levelup.config as config
+import levelup.models  # noqa: F401  (registers the models on Base.metadata)
 
-from .core import Base
+from .core import ORGANIZATION_SCHEMA_PREFIX, Base
 
 log = logging.getLogger(__file__)
 
@@ -61,3 +69,173 @@ def init_database(engine: Engine) -> None:
     # TODO: Add any database initialization functions here
 
     log.info("Database initialized successfully")
+
+
+class TenantResult(NamedTuple):
+    """Outcome of provisioning one organization schema."""
+
+    slug: str
+    schema: str
+    status: str  # "created", "migrated", "skipped" or "failed"
+    revision: str | None
+    seconds: float
+    error: str | None = None
+
+
+_SLUG_RE = re.compile(r"[a-z0-9][a-z0-9_]*")
+# PostgreSQL truncates identifiers longer than this.
+_MAX_IDENTIFIER_LENGTH = 63
+
+
+def tenant_schema_name(slug: str) -> str:
+    """Returns the schema name of an organization, validating its slug."""
+    schema = f"{ORGANIZATION_SCHEMA_PREFIX}_{slug}"
+    if not _SLUG_RE.fullmatch(slug) or len(schema) > _MAX_IDENTIFIER_LENGTH:
+        raise ValueError(f"Invalid organization slug: {slug!r}")
+    return schema
+
+
+@functools.lru_cache(maxsize=None)
+def get_head_revision(script_location: str) -> str | None:
+    """Returns the head revision of a migration directory, read once per process."""
+    return ScriptDirectory(script_location).get_current_head()
+
+
+def get_tenant_revisions(
+    connection: Connection, schemas: Iterable[str]
+) -> dict[str, str | None]:
+    """Returns the recorded revision of each given schema that is versioned.
+
+    Schemas without an ``alembic_version`` table are left out. All schemas are
+    read with two queries, however many tenants there are.
+    """
+    versioned = [
+        row[0]
+        for row in connection.execute(
+            text(
+                "SELECT table_schema FROM information_schema.tables "
+                "WHERE table_name = 'alembic_version' "
+                "AND table_schema = ANY(:schemas)"
+            ),
+            {"schemas": list(schemas)},
+        )
+    ]
+    if not versioned:
+        return {}
+    quote = connection.dialect.identifier_preparer.quote_schema
+    query = " UNION ALL ".join(
+        f"SELECT :schema_{i}, (SELECT version_num FROM {quote(schema)}.alembic_version LIMIT 1)"
+        for i, schema in enumerate(versioned)
+    )
+    params = {f"schema_{i}": schema for i, schema in enumerate(versioned)}
+    return {row[0]: row[1] for row in connection.execute(text(query), params)}
+
+
+def _upgrade_schema(
+    connection: Connection, schema: str, script_location: str, head: str | None
+) -> None:
+    """Runs the tenant migrations up to ``head`` on an open connection.
+
+    The migrations run through the tenant ``env.py``, which uses this
+    connection and translates the tables to ``schema``.
+    """
+    alembic_cfg = AlembicConfig(config.ALEMBIC_INI_PATH)
+    alembic_cfg.set_main_option("script_location", script_location)
+    alembic_cfg.attributes.update(connection=connection, schema=schema)
+    alembic_command.upgrade(alembic_cfg, head or "heads")
+
+
+def init_schema(
+    engine: Engine, slug: str, script_location: str | None = None
+) -> TenantResult:
+    """Creates or migrates the schema of one organization.
+
+    New schemas get the tenant tables and are stamped with the head revision;
+    existing ones are upgraded. Each tenant is provisioned in a single
+    transaction under an advisory lock, so concurrent provisioners of the same
+    tenant wait for each other and a failure leaves no partial schema behind.
+    """
+    started = time.perf_counter()
+    schema = tenant_schema_name(slug)
+    script = ScriptDirectory(script_location or config.ALEMBIC_TENANT_REVISION_PATH)
+    head = get_head_revision(script.dir)
+
+    with engine.begin() as connection:
+        connection.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:schema))"), {"schema": schema}
+        )
+        connection.execute(CreateSchema(schema, if_not_exists=True))
+        connection = connection.execution_options(schema_translate_map={None: schema})
+        context = MigrationContext.configure(
+            connection, opts={"version_table_schema": schema}
+        )
+        if not inspect(connection).has_table("alembic_version", schema=schema):
+            Base.metadata.create_all(connection, tables=get_tenant_tables())
+            context.stamp(script, "heads")
+            status = "created"
+        elif context.get_current_revision() != head:
+            _upgrade_schema(connection, schema, script.dir, head)
+            status = "migrated"
+        else:
+            status = "skipped"
+
+    seconds = time.perf_counter() - started
+    log.info(f"Tenant schema {schema} {status} in {seconds:.2f}s")
+    return TenantResult(slug, schema, status, head, seconds)
+
+
+def provision_tenants(
+    engine: Engine,
+    slugs: Iterable[str],
+    max_connections: int | None = None,
+    script_location: str | None = None,
+) -> list[TenantResult]:
+    """Creates and migrates many organization schemas concurrently.
+
+    At most ``max_connections`` (default ``TENANT_PROVISION_CONNECTIONS``)
+    connections are used at any time. The recorded revisions of all tenants
+    are read up front and tenants already at the head revision are skipped
+    without taking a worker. Results are returned in the order of ``slugs``;
+    a failing tenant is reported instead of stopping the others.
+    """
+    schemas = {slug: tenant_schema_name(slug) for slug in dict.fromkeys(slugs)}
+    if not schemas:
+        return []
+    script_location = script_location or config.ALEMBIC_TENANT_REVISION_PATH
+    head = get_head_revision(script_location)
+    budget = max(1, max_connections or config.TENANT_PROVISION_CONNECTIONS)
+
+    with engine.connect() as connection:
+        revisions = get_tenant_revisions(connection, schemas.values())
+
+    results: dict[str, TenantResult] = {}
+    pending = []
+    for slug, schema in schemas.items():
+        if schema in revisions and revisions[schema] == head:
+            results[slug] = TenantResult(slug, schema, "skipped", head, 0.0)
+        else:
+            pending.append(slug)
+
+    def _run(slug: str) -> TenantResult:
+        started = time.perf_counter()
+        try:
+            return init_schema(engine, slug, script_location)
+        except Exception as e:
+            log.warning(f"Could not provision tenant {slug}: {e}")
+            return TenantResult(
+                slug,
+                schemas[slug],
+                "failed",
+                revisions.get(schemas[slug]),
+                time.perf_counter() - started,
+                str(e),
+            )
+
+    # One connection per worker keeps provisioning within the budget.
+    with ThreadPoolExecutor(
+        max_workers=min(budget, len(pending) or 1), thread_name_prefix="levelup-tenant"
+    ) as pool:
+        for result in pool.map(_run, pending):
+            results[result.slug] = result
+
+    return [results[slug] for slug in schemas]
@@ -0,0 +1,137 @@
+"""Request-scoped database sessions.
+
+:class:`DBSessionMiddleware` puts a :class:`LazySession` on
+``request.state.db`` for every HTTP request. The proxy only creates (and
+registers with :class:`~levelup.database.core.SessionTracker`) a real session
+the first time it is used, so requests that never touch the database, such
+as ``/health`` and ``/metrics``, cost no session and no pool checkout.
+
+A session that was used is committed just before the response headers are
+sent when the status is below 400 (so a failing commit still turns into an
+error response), rolled back otherwise, and closed, returning its
+connection to the pool, once the response has been sent.
+"""
+
+import logging
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from levelup import metrics
+from levelup.database.core import SessionLocal, SessionTracker
+
+log = logging.getLogger(__name__)
+
+REQUEST_SESSIONS = metrics.counter(
+    "levelup_db_request_sessions_total",
+    "Requests handled by the session middleware, by what happened to the session.",
+    ("outcome",),
+)
+
+
+class LazySession:
+    """Proxy that opens its session on first attribute access.
+
+    ``_dispatch_session_id`` is set when the session is opened, which also
+    tells :func:`~levelup.database.core.get_db` that the proxy is tracked.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Session] = SessionLocal,
+        context: str = "fastapi_request",
+    ):
+        self._factory = factory
+        self._context = context
+        self._session: Session | None = None
+        self._dispatch_session_id: str | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def get(self) -> Session:
+        """Returns the underlying session, opening it if needed."""
+        if self._session is None:
+            self._session = self._factory()
+            self._dispatch_session_id = SessionTracker.track_session(
+                self._session, context=self._context
+            )
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
+    def commit(self) -> None:
+        if self._session is not None:
+            self._session.commit()
+
+    def finish(self, commit: bool) -> str:
+        """Commits or rolls back and closes the session, if it was opened.
+
+        Returns the outcome recorded in the metrics.
+        """
+        session = self._session
+        if session is None:
+            return "unused"
+        try:
+            if commit:
+                session.commit()
+            else:
+                session.rollback()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+            if self._dispatch_session_id is not None:
+                SessionTracker.untrack_session(self._dispatch_session_id)
+            self._session = None
+            self._dispatch_session_id = None
+        return "commit" if commit else "rollback"
+
+
+class DBSessionMiddleware:
+    """ASGI middleware attaching a lazy, request-scoped session to ``request.state.db``."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.app = app
+        self.session_factory = session_factory
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        session = LazySession(self.session_factory)
+        scope.setdefault("state", {})["db"] = session
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if session.started and status < 400:
+                    await run_in_threadpool(session.commit)
+            await send(message)
+
+        outcome = "rollback"
+        try:
+            await self.app(scope, receive, send_wrapper)
+            outcome = "commit" if status < 400 else "rollback"
+        finally:
+            if session.started:
+                try:
+                    await run_in_threadpool(session.finish, outcome == "commit")
+                except Exception:
+                    outcome = "error"
+                    raise
+            else:
+                outcome = "unused"
+            REQUEST_SESSIONS.inc(outcome=outcome)
@@ -0,0 +1,350 @@
+"""Connection pool telemetry and adaptive pool sizing.
+
+:class:`InstrumentedQueuePool` records how long each checkout waited for a
+connection and how many timed out. Pool events count new connections and
+invalidations, and the checked-out, overflow and size gauges are read from
+the pool when metrics are collected.
+
+With ``DATABASE_ENGINE_POOL_ADAPTIVE`` set to ``recommend`` the observed
+concurrency is turned into a recommended ``pool_size``/``max_overflow``
+(exported as gauges and logged when it changes). With ``adjust`` the engine's
+pool is also replaced by a new one of the recommended size, the way
+``Engine.dispose`` replaces it, within ``DATABASE_ENGINE_POOL_MIN_SIZE`` and
+``DATABASE_ENGINE_POOL_MAX_TOTAL`` connections. The recommendation is made
+when a connection is checked in, and the pool is replaced at the next
+checkout, once that connection is back in the pool.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, NamedTuple
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import PoolProxiedConnection, QueuePool
+
+from levelup import metrics
+
+log = logging.getLogger(__name__)
+
+ADAPTIVE_MODES = ("off", "recommend", "adjust")
+# Headroom kept above the observed concurrency when sizing the pool.
+HEADROOM = 1.25
+# Observations needed in the window before a recommendation is made.
+MIN_SAMPLES = 50
+
+CHECKOUT_WAIT = metrics.histogram(
+    "levelup_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+    ("pool",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+TIMEOUTS = metrics.counter(
+    "levelup_db_pool_timeouts_total",
+    "Checkouts that gave up waiting for a connection.",
+    ("pool",),
+)
+CONNECTIONS = metrics.counter(
+    "levelup_db_pool_connections_total",
+    "New database connections opened by the pool.",
+    ("pool",),
+)
+INVALIDATIONS = metrics.counter(
+    "levelup_db_pool_invalidations_total",
+    "Pooled connections invalidated (hard or soft).",
+    ("pool", "kind"),
+)
+CHECKED_OUT = metrics.gauge(
+    "levelup_db_pool_checked_out", "Connections currently checked out.", ("pool",)
+)
+OVERFLOW = metrics.gauge(
+    "levelup_db_pool_overflow",
+    "Overflow connections currently open beyond pool_size.",
+    ("pool",),
+)
+SIZE = metrics.gauge("levelup_db_pool_size", "Configured pool_size.", ("pool",))
+MAX_OVERFLOW = metrics.gauge(
+    "levelup_db_pool_max_overflow", "Configured max_overflow.", ("pool",)
+)
+RECOMMENDED_SIZE = metrics.gauge(
+    "levelup_db_pool_recommended_size",
+    "pool_size recommended from observed concurrency.",
+    ("pool",),
+)
+RECOMMENDED_OVERFLOW = metrics.gauge(
+    "levelup_db_pool_recommended_max_overflow",
+    "max_overflow recommended from observed concurrency.",
+    ("pool",),
+)
+
+
+class PoolRecommendation(NamedTuple):
+    pool_size: int
+    max_overflow: int
+    steady: int  # 95th percentile of concurrent checkouts in the window
+    peak: int
+    timeouts: int
+
+
+class PoolAdvisor:
+    """Recommends pool sizing from the concurrency observed at each checkout."""
+
+    def __init__(
+        self,
+        window: float = 300.0,
+        interval: float = 60.0,
+        max_total: int = 50,
+        min_size: int = 5,
+    ):
+        self.window = window
+        self.interval = interval
+        self.max_total = max(max_total, min_size)
+        self.min_size = min_size
+        self._samples: deque[tuple[float, int]] = deque()
+        self._timeouts: deque[float] = deque()
+        self._lock = threading.Lock()
+        self._last_evaluation = time.monotonic()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        while self._timeouts and self._timeouts[0] < cutoff:
+            self._timeouts.popleft()
+
+    def observe(self, checked_out: int, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._samples.append((now, checked_out))
+            self._expire(now)
+
+    def observe_timeout(self, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._timeouts.append(now)
+
+    def due(self, now: float | None = None) -> bool:
+        """Returns True at most once per ``interval``."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if now - self._last_evaluation < self.interval:
+                return False
+            self._last_evaluation = now
+            return True
+
+    def recommend(
+        self, current_total: int, now: float | None = None
+    ) -> PoolRecommendation | None:
+        """Returns the sizing for the current window, or None without enough data.
+
+        ``pool_size`` covers the 95th percentile of concurrent checkouts and
+        ``max_overflow`` the peak, both with some headroom. Timeouts in the
+        window grow the total by half of ``current_total``.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._expire(now)
+            if len(self._samples) < MIN_SAMPLES and not self._timeouts:
+                return None
+            values = sorted(count for _, count in self._samples) or [current_total]
+            timeouts = len(self._timeouts)
+        steady = values[min(len(values) - 1, math.ceil(0.95 * len(values)) - 1)]
+        peak = values[-1]
+
+        burst = math.ceil(peak * HEADROOM)
+        if timeouts:
+            burst = max(burst, math.ceil(current_total * 1.5))
+        pool_size = min(
+            max(math.ceil(steady * HEADROOM), self.min_size), self.max_total
+        )
+        max_overflow = min(max(burst - pool_size, 0), self.max_total - pool_size)
+        return PoolRecommendation(pool_size, max_overflow, steady, peak, timeouts)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that measures checkouts and can be recreated with other limits."""
+
+    telemetry: "PoolTelemetry | None" = None
+
+    def __init__(
+        self, creator: Any, pool_size: int = 5, max_overflow: int = 10, **kw: Any
+    ):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self._limits = (pool_size, max_overflow)
+        self._arguments = (creator, kw)
+
+    def connect(self) -> PoolProxiedConnection:
+        if self.telemetry is not None and self.telemetry.pending is not None:
+            pool = self.telemetry.apply_pending()
+            if pool is not self:
+                return pool.connect()
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            if self.telemetry is not None:
+                self.telemetry.on_timeout()
+            raise
+        finally:
+            if self.telemetry is not None:
+                self.telemetry.on_wait(time.perf_counter() - started)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        assert isinstance(pool, InstrumentedQueuePool)
+        pool.telemetry = self.telemetry
+        if self.telemetry is not None:
+            self.telemetry.pool = pool
+        return pool
+
+    def resized(self, pool_size: int, max_overflow: int) -> "InstrumentedQueuePool":
+        """Returns a new, empty pool like this one with other limits.
+
+        Like ``recreate``, the new pool keeps this pool's event listeners.
+        """
+        creator, kw = self._arguments
+        pool = self.__class__(
+            creator,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            **{**kw, "_dispatch": self.dispatch},
+        )
+        pool.telemetry = self.telemetry
+        return pool
+
+    def max_overflow(self) -> int:
+        return self._limits[1]
+
+
+class PoolTelemetry:
+    """Publishes the metrics of one pool and applies the adaptive sizing mode."""
+
+    def __init__(
+        self,
+        pool: InstrumentedQueuePool,
+        name: str = "default",
+        mode: str = "off",
+        advisor: PoolAdvisor | None = None,
+        engine: Engine | None = None,
+    ):
+        if mode not in ADAPTIVE_MODES:
+            raise ValueError(f"Unknown adaptive pool mode {mode!r}")
+        if mode == "adjust" and engine is None:
+            raise ValueError("Adjusting a pool needs the engine using it")
+        self.pool = pool
+        self.name = name
+        self.mode = mode
+        self.engine = engine
+        self.advisor = advisor or PoolAdvisor()
+        self.recommendation: PoolRecommendation | None = None
+        # Limits of the replacement pool, applied by the next checkout
+        self.pending: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+
+        CHECKED_OUT.set_function(lambda: self.pool.checkedout(), pool=name)
+        OVERFLOW.set_function(lambda: max(self.pool.overflow(), 0), pool=name)
+        SIZE.set_function(lambda: self.pool.size(), pool=name)
+        MAX_OVERFLOW.set_function(lambda: self.pool.max_overflow(), pool=name)
+
+    def on_wait(self, seconds: float) -> None:
+        CHECKOUT_WAIT.observe(seconds, pool=self.name)
+
+    def on_timeout(self) -> None:
+        TIMEOUTS.inc(pool=self.name)
+        self.advisor.observe_timeout()
+
+    def on_connect(self, *args: Any) -> None:
+        CONNECTIONS.inc(pool=self.name)
+
+    def on_invalidate(self, *args: Any) -> None:
+        INVALIDATIONS.inc(pool=self.name, kind="hard")
+
+    def on_soft_invalidate(self, *args: Any) -> None:
+        INVALIDATIONS.inc(pool=self.name, kind="soft")
+
+    def on_checkout(self, *args: Any) -> None:
+        if self.mode != "off":
+            self.advisor.observe(self.pool.checkedout())
+
+    def on_checkin(self, *args: Any) -> None:
+        if self.mode != "off" and self.advisor.due():
+            self.evaluate()
+
+    def evaluate(self) -> PoolRecommendation | None:
+        """Updates the recommendation and, in ``adjust`` mode, schedules a new pool.
+
+        The pool is not replaced here: ``evaluate`` runs in the ``checkin``
+        event, and the connection being checked in would go back into the
+        disposed pool. The next checkout applies it with :meth:`apply_pending`.
+        """
+        current = (self.pool.size(), self.pool.max_overflow())
+        if current[0] <= 0 or current[1] < 0:
+            # Unbounded pools have nothing to size.
+            return None
+        recommendation = self.advisor.recommend(sum(current))
+        if recommendation is None:
+            return None
+        RECOMMENDED_SIZE.set(recommendation.pool_size, pool=self.name)
+        RECOMMENDED_OVERFLOW.set(recommendation.max_overflow, pool=self.name)
+
+        target = (recommendation.pool_size, recommendation.max_overflow)
+        changed = self.recommendation is None or target != self.recommendation[:2]
+        self.recommendation = recommendation
+        if target != current:
+            if changed:
+                log.info(
+                    f"Pool {self.name}: recommending pool_size={target[0]} "
+                    f"max_overflow={target[1]} instead of {current[0]}/{current[1]} "
+                    f"(p95 {recommendation.steady}, peak {recommendation.peak}, "
+                    f"{recommendation.timeouts} timeouts)"
+                )
+        if self.mode == "adjust":
+            self.pending = target if target != current else None
+        return recommendation
+
+    def apply_pending(self) -> InstrumentedQueuePool:
+        """Replaces the pool if :meth:`evaluate` scheduled it; returns the pool."""
+        with self._lock:
+            if self.pending is not None:
+                self.replace(*self.pending)
+                self.pending = None
+            return self.pool
+
+    def replace(self, pool_size: int, max_overflow: int) -> None:
+        """Gives the engine a new pool with these limits and disposes the old one.
+
+        As with ``Engine.dispose``, the old pool's idle connections are closed
+        and checked-out ones are closed once released and garbage collected.
+        """
+        assert self.engine is not None
+        old = self.pool
+        self.pool = self.engine.pool = old.resized(pool_size, max_overflow)
+        old.dispose()
+        log.info(
+            f"Pool {self.name}: replaced with pool_size={pool_size} "
+            f"max_overflow={max_overflow}"
+        )
+
+
+def instrument_pool(
+    pool: InstrumentedQueuePool,
+    name: str = "default",
+    mode: str = "off",
+    advisor: PoolAdvisor | None = None,
+    engine: Engine | None = None,
+) -> PoolTelemetry:
+    """Attaches telemetry to a pool and registers its event listeners.
+
+    ``adjust`` mode needs the ``engine`` whose pool is replaced.
+    """
+    telemetry = PoolTelemetry(pool, name, mode, advisor, engine)
+    pool.telemetry = telemetry
+    event.listen(pool, "connect", telemetry.on_connect)
+    event.listen(pool, "checkout", telemetry.on_checkout)
+    event.listen(pool, "checkin", telemetry.on_checkin)
+    event.listen(pool, "invalidate", telemetry.on_invalidate)
+    event.listen(pool, "soft_invalidate", telemetry.on_soft_invalidate)
+    return telemetry
@@ -0,0 +1,202 @@
+"""Read-replica routing for database sessions.
+
+:class:`RoutingSession` picks the database once per transaction, not per
+statement: a transaction goes to the primary unless it was explicitly marked
+read-only with :func:`read_only`, so a transaction that reads and then
+writes never bases its write on a lagging replica. A read-only transaction
+uses one replica for all of its statements; its writes (and
+``SELECT ... FOR UPDATE``) still go to the primary. Once a session has
+written, it stays on the primary for the rest of its life, read-only blocks
+included, so a request always reads its own writes.
+
+Replicas are picked round-robin from a :class:`ReplicaSet`. A replica that
+fails with a connection error is skipped for ``DATABASE_REPLICA_RETRY_SECONDS``
+and the transaction connects to the next replica, or to the primary when no
+replica is available.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Sequence
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, SessionTransaction
+
+from levelup import metrics
+
+log = logging.getLogger(__name__)
+
+# Session.info key holding the bind chosen for the current transaction.
+BIND_KEY = "levelup_transaction_bind"
+# Session.info key that lets the session's transactions read from replicas.
+READ_ONLY_KEY = "levelup_read_only"
+# Session.info key set by the first write: the session then sticks to the primary.
+WROTE_KEY = "levelup_wrote"
+
+ROUTED = metrics.counter(
+    "levelup_db_routed_statements_total",
+    "Statements routed by the session, by target.",
+    ("target",),
+)
+REPLICA_FAILURES = metrics.counter(
+    "levelup_db_replica_failures_total",
+    "Connection errors that took a replica out of rotation.",
+    ("replica",),
+)
+
+
+class ReplicaSet:
+    """Round-robin selection over the healthy engines of a set of replicas."""
+
+    def __init__(
+        self,
+        engines: Sequence[Engine],
+        retry_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.engines = list(engines)
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._next = 0
+        self._unhealthy_until: dict[int, float] = {}
+        self._lock = threading.Lock()
+        for index, engine in enumerate(self.engines):
+            event.listen(engine, "handle_error", self._error_handler(index))
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def _error_handler(self, index: int) -> Callable[[ExceptionContext], None]:
+        def handle_error(context: ExceptionContext) -> None:
+            error = context.original_exception
+            if context.is_disconnect or (
+                isinstance(context.sqlalchemy_exception, DBAPIError)
+                and context.connection is None
+            ):
+                self.mark_unhealthy(index, error)
+
+        return handle_error
+
+    def mark_unhealthy(self, index: int, error: BaseException | None = None) -> None:
+        """Takes a replica out of rotation for ``retry_seconds``."""
+        with self._lock:
+            self._unhealthy_until[index] = self._clock() + self.retry_seconds
+        REPLICA_FAILURES.inc(replica=str(index))
+        log.warning(
+            f"Replica {index} out of rotation for {self.retry_seconds:.0f}s: {error}"
+        )
+
+    def healthy(self) -> list[int]:
+        now = self._clock()
+        with self._lock:
+            return [
+                index
+                for index in range(len(self.engines))
+                if self._unhealthy_until.get(index, 0.0) <= now
+            ]
+
+    def choose(self) -> tuple[int, Engine] | None:
+        """Returns the next healthy replica, or None if none is available."""
+        if not self.engines:
+            return None
+        now = self._clock()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                index = self._next
+                self._next = (self._next + 1) % len(self.engines)
+                if self._unhealthy_until.get(index, 0.0) <= now:
+                    return index, self.engines[index]
+        return None
+
+
+class RoutingSession(Session):
+    """Session that runs read-only transactions on replicas, the rest on the primary.
+
+    ``replica_execution_options`` are applied to the replica engines, for
+    example the same ``schema_translate_map`` as the primary engine.
+    """
+
+    def __init__(
+        self,
+        bind: Any = None,
+        replicas: ReplicaSet | None = None,
+        replica_execution_options: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(bind=bind, **kwargs)
+        self.replicas = replicas
+        self._replica_options = replica_execution_options or {}
+        self._replica_binds: dict[int, Engine] = {}
+
+    def _replica_bind(self, index: int, engine: Engine) -> Engine:
+        if not self._replica_options:
+            return engine
+        if index not in self._replica_binds:
+            self._replica_binds[index] = engine.execution_options(
+                **self._replica_options
+            )
+        return self._replica_binds[index]
+
+    def _connect_replica(self) -> Engine | None:
+        """Connects the transaction to a healthy replica, trying each in turn."""
+        assert self.replicas is not None
+        for _ in range(len(self.replicas)):
+            choice = self.replicas.choose()
+            if choice is None:
+                break
+            bind = self._replica_bind(*choice)
+            try:
+                self.connection(bind_arguments={"bind": bind})
+            except DBAPIError as e:
+                # handle_error has taken the replica out of rotation
+                log.warning(f"Replica {choice[0]} unavailable, retrying: {e}")
+                continue
+            return bind
+        return None
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Any:
+        primary = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if not self.replicas:
+            return primary
+        writes = self._flushing or (
+            clause is not None and not getattr(clause, "is_select", False)
+        )
+        if writes:
+            self.info[WROTE_KEY] = True
+        if BIND_KEY not in self.info:
+            # First statement of the transaction: it decides for all the others
+            read_only = self.info.get(READ_ONLY_KEY) and not self.info.get(WROTE_KEY)
+            self.info[BIND_KEY] = self._connect_replica() if read_only else None
+        replica = self.info[BIND_KEY]
+        locks = getattr(clause, "_for_update_arg", None) is not None
+        if replica is None or writes or locks:
+            ROUTED.inc(target="primary")
+            return primary
+        ROUTED.inc(target="replica")
+        return replica
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _forget_bind(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(BIND_KEY, None)
+
+
+@contextmanager
+def read_only(session: Session) -> Iterator[Session]:
+    """Lets the transactions begun inside the block run on a read replica.
+
+    Only use it around code that does not write, or whose reads may lag
+    behind the primary by the replication delay. A session that has already
+    written keeps using the primary.
+    """
+    previous = session.info.get(READ_ONLY_KEY)
+    session.info[READ_ONLY_KEY] = True
+    try:
+        yield session
+    finally:
+        session.info[READ_ONLY_KEY] = previous
@@ -0,0 +1,269 @@
+"""MinHash/LSH index for spotting near-duplicate resumes.
+
+Resubmitted CVs often differ only in contact details or a single bullet, so an
+exact hash of the text misses them. Each resume is reduced to a fixed-size
+MinHash signature over word shingles of its normalized text; the signatures are
+kept in dense numpy arrays so the index stays compact and can be saved to and
+loaded from a single ``.npz`` file.
+"""
+
+import io
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+_EMAIL_RE = re.compile(r"\S+@\S+")
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"[+()\d][\d\s().+-]{5,}\d|\d+")
+_WORD_RE = re.compile(r"\w+")
+
+# Smallest prime above 2**32, used for the universal hash family.
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases the text and drops volatile details such as contact data and numbers."""
+    text = _EMAIL_RE.sub(" ", text)
+    text = _URL_RE.sub(" ", text)
+    text = _DIGITS_RE.sub(" ", text)
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """Returns the unique 32-bit hashes of the word ``size``-grams of normalized text."""
+    words = normalize_text(text).split()
+    if len(words) < size:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i : i + size]) for i in range(len(words) - size + 1)]
+    hashes = np.fromiter(
+        (zlib.crc32(g.encode("utf-8")) for g in grams),
+        dtype=np.uint64,
+        count=len(grams),
+    )
+    return np.unique(hashes)
+
+
+class MinHasher:
+    """Computes MinHash signatures with a seeded family of universal hash functions."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 2**32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        """Returns the ``num_perm`` minimum hash values of a shingle hash set."""
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        # (a * x + b) stays below 2**64 because a, b and x are all 32-bit values.
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        signature: np.ndarray = (permuted.min(axis=0) & _MAX_HASH).astype(np.uint32)
+        return signature
+
+
+class DuplicateIndex:
+    """Near-duplicate index over MinHash signatures with LSH banding.
+
+    Candidates must share at least one band of the signature and the same
+    language and role; their Jaccard similarity is then estimated from the full
+    signatures. Rows live in preallocated arrays that grow geometrically, and
+    removals are tombstoned until the index is saved.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.seed = seed
+        self._hasher = MinHasher(num_perm, seed)
+        self._band_mix = np.random.default_rng(seed + 1).integers(
+            1, 2**63, size=num_perm // bands, dtype=np.uint64
+        )
+        self._size = 0
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._band_hashes = np.empty((0, bands), dtype=np.uint64)
+        self._languages = np.empty(0, dtype=np.int32)
+        self._roles = np.empty(0, dtype=np.int32)
+        self._alive = np.empty(0, dtype=bool)
+        self._keys: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._vocabulary: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._positions
+
+    def _code(self, value: str | None, create: bool) -> int | None:
+        label = (value or "").strip().lower()
+        if label not in self._vocabulary:
+            if not create:
+                return None
+            self._vocabulary[label] = len(self._vocabulary)
+        return self._vocabulary[label]
+
+    def _bands_of(self, signatures: np.ndarray) -> np.ndarray:
+        """Hashes each band of one signature or of a stack of signatures."""
+        rows = signatures.astype(np.uint64).reshape(
+            *signatures.shape[:-1], self.bands, self.num_perm // self.bands
+        )
+        # Wrapping uint64 arithmetic is fine here: the value is only a bucket key.
+        return (rows * self._band_mix).sum(axis=-1, dtype=np.uint64)
+
+    def _reserve(self, rows: int) -> None:
+        capacity = self._alive.shape[0]
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2, 1024)
+
+        def grow(array: np.ndarray) -> np.ndarray:
+            grown = np.zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+            grown[: self._size] = array[: self._size]
+            return grown
+
+        self._signatures = grow(self._signatures)
+        self._band_hashes = grow(self._band_hashes)
+        self._languages = grow(self._languages)
+        self._roles = grow(self._roles)
+        self._alive = grow(self._alive)
+
+    def add(self, key: str, text: str, language: str, role: str | None = None) -> None:
+        """Indexes a resume under ``key``, replacing any previous entry for it."""
+        signature = self._hasher.signature(shingle_hashes(text))
+        self._append(key, signature, language, role)
+
+    def _append(
+        self, key: str, signature: np.ndarray, language: str, role: str | None
+    ) -> None:
+        self.remove(key)
+        self._reserve(self._size + 1)
+        row = self._size
+        self._signatures[row] = signature
+        self._band_hashes[row] = self._bands_of(signature)
+        self._languages[row] = self._code(language, create=True)
+        self._roles[row] = self._code(role, create=True)
+        self._alive[row] = True
+        self._keys.append(key)
+        self._positions[key] = row
+        self._size += 1
+
+    def merge(self, other: "DuplicateIndex", removed: Iterable[str] = ()) -> None:
+        """Removes the ``removed`` keys, then adds the entries of ``other``.
+
+        Raises:
+            ValueError: if ``other`` uses different MinHash parameters.
+        """
+        if (other.num_perm, other.seed) != (self.num_perm, self.seed):
+            raise ValueError("Cannot merge indexes with different MinHash parameters")
+        for key in removed:
+            self.remove(key)
+        labels = {code: label for label, code in other._vocabulary.items()}
+        for key, row in other._positions.items():
+            self._append(
+                key,
+                other._signatures[row],
+                labels[int(other._languages[row])],
+                labels[int(other._roles[row])],
+            )
+
+    def remove(self, key: str) -> bool:
+        """Removes ``key`` from the index. Returns False if it was not indexed."""
+        row = self._positions.pop(key, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        return True
+
+    def query(
+        self, text: str, language: str, role: str | None = None, threshold: float = 0.8
+    ) -> tuple[str, float] | None:
+        """Returns the most similar indexed key and its estimated Jaccard similarity.
+
+        Only entries with the same language and role whose similarity reaches
+        ``threshold`` are considered.
+        """
+        language_code = self._code(language, create=False)
+        role_code = self._code(role, create=False)
+        if language_code is None or role_code is None or not self._size:
+            return None
+
+        hashes = shingle_hashes(text)
+        if hashes.size == 0:
+            return None
+        signature = self._hasher.signature(hashes)
+
+        n = self._size
+        mask = (
+            self._alive[:n]
+            & (self._languages[:n] == language_code)
+            & (self._roles[:n] == role_code)
+            & (self._band_hashes[:n] == self._bands_of(signature)).any(axis=1)
+        )
+        candidates = np.flatnonzero(mask)
+        if not candidates.size:
+            return None
+
+        similarity = (self._signatures[candidates] == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < threshold:
+            return None
+        return self._keys[candidates[best]], float(similarity[best])
+
+    def compact(self) -> None:
+        """Drops tombstoned rows so they no longer take memory or disk space."""
+        live = np.flatnonzero(self._alive[: self._size])
+        self._signatures = self._signatures[live]
+        self._band_hashes = self._band_hashes[live]
+        self._languages = self._languages[live]
+        self._roles = self._roles[live]
+        self._alive = self._alive[live]
+        self._keys = [self._keys[i] for i in live]
+        self._positions = {key: i for i, key in enumerate(self._keys)}
+        self._size = len(self._keys)
+
+    def save(self, path: Path | str) -> None:
+        """Atomically writes the index to ``path`` as an ``.npz`` file."""
+        self.compact()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        buffer = io.BytesIO()
+        vocabulary = sorted(self._vocabulary, key=self._vocabulary.__getitem__)
+        np.savez(
+            buffer,
+            params=np.array([self.num_perm, self.bands, self.seed], dtype=np.int64),
+            signatures=self._signatures,
+            languages=self._languages,
+            roles=self._roles,
+            keys=np.array(self._keys, dtype=str),
+            vocabulary=np.array(vocabulary, dtype=str),
+        )
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "DuplicateIndex":
+        """Loads an index written by :meth:`save`."""
+        with np.load(path, allow_pickle=False) as data:
+            num_perm, bands, seed = (int(x) for x in data["params"])
+            index = cls(num_perm=num_perm, bands=bands, seed=seed)
+            signatures: Any = data["signatures"]
+            index._signatures = signatures
+            index._band_hashes = index._bands_of(signatures)
+            index._languages = data["languages"]
+            index._roles = data["roles"]
+            index._keys = [str(k) for k in data["keys"]]
+            index._vocabulary = {str(v): i for i, v in enumerate(data["vocabulary"])}
+        index._alive = np.ones(len(index._keys), dtype=bool)
+        index._positions = {key: i for i, key in enumerate(index._keys)}
+        index._size = len(index._keys)
+        return index
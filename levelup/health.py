@@ -0,0 +1,227 @@
+"""Cached deep health checks for the readiness endpoint.
+
+A :class:`HealthChecker` runs a set of named checks (database, LLM backend,
+queue depth, ...) in parallel, each bounded by a timeout, and caches the
+report for ``ttl`` seconds. Probes are served from the cache; once it is
+older than the TTL, the stale report is still returned and a single refresh
+is started in the background, so however often load balancers probe, the
+dependencies see at most one round of checks per TTL.
+
+A failing *critical* check makes the service unhealthy (HTTP 503); other
+failing checks only mark it as degraded.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, NamedTuple
+
+from sqlalchemy import text
+
+from levelup import metrics
+
+log = logging.getLogger(__name__)
+
+# A check returns a short detail string, raises to fail, or raises
+# DegradedError to report a problem that does not make the service unusable.
+Check = Callable[[], str | None]
+
+CHECK_UP = metrics.gauge(
+    "levelup_health_check_up",
+    "1 if the last run of a health check passed, 0 otherwise.",
+    ("check",),
+)
+CHECK_SECONDS = metrics.histogram(
+    "levelup_health_check_duration_seconds",
+    "Duration of health checks.",
+    ("check",),
+)
+
+
+class DegradedError(Exception):
+    """Raised by a check that works, but not well (for example a long queue)."""
+
+
+class CheckResult(NamedTuple):
+    name: str
+    status: str  # "ok", "degraded" or "down"
+    critical: bool
+    seconds: float
+    detail: str | None = None
+
+
+class HealthReport(NamedTuple):
+    status: str  # "healthy", "degraded" or "unhealthy"
+    checks: list[CheckResult]
+    checked_at: float  # time.time() of the run
+
+    def as_dict(self, now: float | None = None) -> dict[str, Any]:
+        now = time.time() if now is None else now
+        return {
+            "status": self.status,
+            "age_seconds": round(max(now - self.checked_at, 0.0), 3),
+            "checks": {
+                c.name: {
+                    "status": c.status,
+                    "critical": c.critical,
+                    "latency_ms": round(c.seconds * 1000, 1),
+                    "detail": c.detail,
+                }
+                for c in self.checks
+            },
+        }
+
+
+def overall_status(checks: list[CheckResult]) -> str:
+    if any(c.critical and c.status == "down" for c in checks):
+        return "unhealthy"
+    if any(c.status != "ok" for c in checks):
+        return "degraded"
+    return "healthy"
+
+
+class HealthChecker:
+    """Runs registered checks and caches the report with stale-while-refresh."""
+
+    def __init__(
+        self,
+        ttl: float = 10.0,
+        timeout: float = 3.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.timeout = timeout
+        self._clock = clock
+        self._checks: dict[str, tuple[Check, bool]] = {}
+        self._report: HealthReport | None = None
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+    def register(self, name: str, check: Check, critical: bool = False) -> None:
+        """Adds (or replaces) a named check."""
+        with self._lock:
+            self._checks[name] = (check, critical)
+            self._report = None
+
+    def run_checks(self) -> HealthReport:
+        """Runs every check now, in parallel, and caches the report."""
+        with self._lock:
+            checks = dict(self._checks)
+        results: list[CheckResult] = []
+        if checks:
+            # Not a context manager: a hung check must not block the report.
+            executor = ThreadPoolExecutor(
+                max_workers=len(checks), thread_name_prefix="health"
+            )
+            started = time.perf_counter()
+            futures = {
+                name: executor.submit(_timed, check)
+                for name, (check, _) in checks.items()
+            }
+            for name, future in futures.items():
+                critical = checks[name][1]
+                remaining = max(self.timeout - (time.perf_counter() - started), 0.0)
+                try:
+                    status, seconds, detail = future.result(timeout=remaining)
+                except FutureTimeoutError:
+                    status, seconds = "down", self.timeout
+                    detail = f"timed out after {self.timeout:g}s"
+                results.append(CheckResult(name, status, critical, seconds, detail))
+                CHECK_UP.set(1 if status == "ok" else 0, check=name)
+                CHECK_SECONDS.observe(seconds, check=name)
+            executor.shutdown(wait=False)
+
+        report = HealthReport(overall_status(results), results, time.time())
+        with self._lock:
+            self._report = report
+            self._refreshed_at = self._clock()
+        if report.status != "healthy":
+            failing = ", ".join(
+                f"{c.name}={c.status}" for c in results if c.status != "ok"
+            )
+            log.warning(f"Health checks {report.status}: {failing}")
+        return report
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh() -> None:
+            try:
+                self.run_checks()
+            except Exception:
+                log.exception("Health check refresh failed")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=refresh, name="health-refresh", daemon=True).start()
+
+    def report(self) -> HealthReport:
+        """Returns the cached report, refreshing it if needed.
+
+        Only the very first call (or the first after a check was registered)
+        waits for the checks; concurrent callers share that single run.
+        """
+        with self._lock:
+            report, age = self._report, self._clock() - self._refreshed_at
+        if report is None:
+            with self._refresh_lock:
+                with self._lock:
+                    report = self._report
+                if report is None:
+                    report = self.run_checks()
+            return report
+        if age >= self.ttl:
+            self._refresh_in_background()
+        return report
+
+
+def _timed(check: Check) -> tuple[str, float, str | None]:
+    started = time.perf_counter()
+    try:
+        detail = check()
+        status = "ok"
+    except DegradedError as e:
+        status, detail = "degraded", str(e)
+    except Exception as e:
+        status, detail = "down", f"{type(e).__name__}: {e}"
+    return status, time.perf_counter() - started, detail
+
+
+def database_check(engine: Any) -> Check:
+    """Checks out a connection from the engine's pool and runs ``SELECT 1``."""
+
+    def check() -> str:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        pool = engine.pool
+        status = getattr(pool, "status", None)
+        return status() if callable(status) else "connected"
+
+    return check
+
+
+def llm_check() -> str | None:
+    """Probes the LLM backend without generating text (see ``llm.probe``)."""
+    from levelup import llm
+
+    return llm.probe()
+
+
+def queue_depth_check(depth: Callable[[], int], warn: int) -> Check:
+    """Reports ``depth()``; a depth of ``warn`` or more marks the service degraded."""
+
+    def check() -> str:
+        value = depth()
+        if warn > 0 and value >= warn:
+            raise DegradedError(f"{value} queued (warning at {warn})")
+        return f"{value} queued"
+
+    return check
@@ -0,0 +1,157 @@
+"""Incremental re-analysis of updated resumes.
+
+When a resume is a new version of one analyzed before (a near-duplicate in
+the analysis store above ``ANALYSIS_INCREMENTAL_THRESHOLD``), its sections
+are diffed against the stored version by content digest. Only the analysis
+groups (see ``sections.SECTION_GROUPS``) that depend on a changed section are
+requested again, with the section prompts; the rest of the stored result is
+kept. The overall summary is refreshed whenever anything else is, so its
+scores stay consistent with the refreshed parts.
+"""
+
+import copy
+import logging
+from typing import Any, NamedTuple
+
+from levelup import config, metrics
+from levelup.llm import Generate, generate_text
+from levelup.sections import (
+    SECTION_GROUPS,
+    enforce_consistency,
+    merge_section_results,
+    run_section_groups,
+)
+from levelup.segmenter import SEGMENTER_VERSION, section_digests
+from levelup.skills import normalize_missing_skills, present_skills
+from levelup.store import AnalysisStore
+
+log = logging.getLogger(__name__)
+
+ALL_GROUPS = tuple(SECTION_GROUPS)
+
+# Analysis groups that depend on each resume section; unknown sections affect all.
+RESUME_SECTION_GROUPS: dict[str, tuple[str, ...]] = {
+    "header": (),
+    "contact": (),
+    "summary": ("domains", "insights"),
+    "experience": ALL_GROUPS,
+    "skills": ("competencies", "gaps"),
+    "education": ("domains", "competencies", "gaps"),
+    "projects": ("competencies", "gaps", "insights"),
+    "certifications": ("competencies", "gaps"),
+    "languages": ("competencies",),
+    "awards": ("insights",),
+    "publications": ("insights",),
+    "volunteering": ("insights",),
+    "interests": (),
+    "references": (),
+}
+
+GROUPS = metrics.counter(
+    "levelup_incremental_groups_total",
+    "Analysis groups of incremental re-analyses, by whether they were refreshed or reused.",
+    ("outcome",),
+)
+
+
+class Update(NamedTuple):
+    result: dict[str, Any]
+    previous_id: str
+    changed: list[str]  # resume sections added, removed or edited
+    refreshed: list[str]  # analysis groups requested again
+
+    def record(self) -> dict[str, Any]:
+        """The provenance stored with the updated analysis."""
+        return {
+            "previous_id": self.previous_id,
+            "changed_sections": self.changed,
+            "refreshed_groups": self.refreshed,
+        }
+
+
+def changed_sections(previous: dict[str, str], current: dict[str, str]) -> list[str]:
+    """Names of the sections whose digests differ between two versions."""
+    names = list(current) + [name for name in previous if name not in current]
+    return [name for name in names if previous.get(name) != current.get(name)]
+
+
+def affected_groups(changed: list[str]) -> list[str]:
+    """Analysis groups to refresh for the changed sections, in canonical order."""
+    groups: set[str] = set()
+    for name in changed:
+        groups.update(RESUME_SECTION_GROUPS.get(name, ALL_GROUPS))
+    if groups:
+        groups.add("summary")
+    return [group for group in ALL_GROUPS if group in groups]
+
+
+def plan(text: str, previous: dict[str, Any]) -> tuple[list[str], list[str]]:
+    """Returns the changed sections and the groups to refresh against a stored record."""
+    changed = changed_sections(previous.get("sections", {}), section_digests(text))
+    return changed, affected_groups(changed)
+
+
+def find_previous(
+    store: AnalysisStore,
+    text: str,
+    language: str,
+    role: str | None = None,
+    threshold: float | None = None,
+) -> dict[str, Any] | None:
+    """Returns the stored record of a previous version of this resume, if any.
+
+    Records saved before section digests were stored, or whose digests were
+    computed by another version of the segmenter, cannot be diffed and are
+    not returned.
+    """
+    if not config.ANALYSIS_INCREMENTAL_ENABLED:
+        return None
+    if threshold is None:
+        threshold = config.ANALYSIS_INCREMENTAL_THRESHOLD
+    match = store.find_similar(text, language, role, threshold)
+    if match is None or "sections" not in match[0]:
+        return None
+    # Records of the first segmenter have no version.
+    if match[0].get("segmenter_version", 1) != SEGMENTER_VERSION:
+        return None
+    return match[0]
+
+
+def reanalyze(
+    text: str,
+    report_language: str,
+    target_role: str | None,
+    previous: dict[str, Any],
+    generate: Generate = generate_text,
+) -> Update:
+    """Analyzes a new version of a resume, refreshing only the affected groups.
+
+    Raises:
+        ValueError: if a refreshed section response does not contain a JSON object.
+    """
+    changed, refresh = plan(text, previous)
+    result = copy.deepcopy(previous["result"])
+    if refresh:
+        skills = present_skills(text)
+        answers = run_section_groups(
+            text, report_language, refresh, target_role, generate, skills=skills
+        )
+        # Groups that were not refreshed keep their stored keys.
+        parts = {
+            group: {k: result[k] for k in keys if k in result}
+            for group, keys in SECTION_GROUPS.items()
+        }
+        parts.update(answers)
+        result = merge_section_results(parts)
+        fixes = enforce_consistency(result, target_role)
+        fixes += normalize_missing_skills(result, skills)
+        for fix in fixes:
+            log.info("Consistency fix: %s", fix)
+
+    GROUPS.inc(len(refresh), outcome="refreshed")
+    GROUPS.inc(len(ALL_GROUPS) - len(refresh), outcome="reused")
+    log.info(
+        f"Re-analyzed {previous['id']}: changed sections {changed or 'none'}, "
+        f"refreshed {refresh or 'nothing'}"
+    )
+    return Update(result, previous["id"], changed, refresh)
@@ -0,0 +1,288 @@
+"""Durable job queue in the application database.
+
+Jobs are rows of :class:`~levelup.models.AnalysisJob`. Any number of workers,
+on any number of machines, claim them with ``SELECT ... FOR UPDATE SKIP
+LOCKED``, so concurrent claims never block on or return the same row. A
+claimed job is leased to its worker until ``locked_until``; the worker
+extends the lease with heartbeats while the job runs, and a job whose lease
+expires (its worker died) is put back in the queue by :meth:`JobQueue.reap`.
+
+A failed job is retried with exponential backoff until ``max_attempts`` is
+reached, after which it stays in the queue table with status ``dead`` (the
+dead letter) until it is requeued by hand.
+
+All timestamps come from the workers' clocks, so nodes should keep their
+clocks synchronized (NTP); leases are long compared to any reasonable skew.
+"""
+
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import Engine, Table, case, func, select, update
+
+from levelup import config, metrics
+from levelup.models import AnalysisJob
+
+log = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, DEAD = "queued", "running", "succeeded", "dead"
+
+JOBS = metrics.counter(
+    "levelup_jobs_total",
+    "Job state transitions, by kind and outcome.",
+    ("kind", "outcome"),
+)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def retry_delay(
+    attempts: int,
+    base: float | None = None,
+    maximum: float | None = None,
+    jitter: float = 0.2,
+) -> float:
+    """Seconds to wait before retry number ``attempts`` (1-based).
+
+    Doubles from ``JOB_RETRY_BASE_SECONDS`` up to ``JOB_RETRY_MAX_SECONDS``,
+    with up to ``jitter`` of random spread so failed jobs do not come back
+    in lockstep.
+    """
+    base = config.JOB_RETRY_BASE_SECONDS if base is None else base
+    maximum = config.JOB_RETRY_MAX_SECONDS if maximum is None else maximum
+    delay = min(base * 2 ** max(attempts - 1, 0), maximum)
+    return float(delay * (1 + random.uniform(-jitter, jitter)))
+
+
+class JobQueue:
+    """Enqueue, claim and settle jobs in the ``analysis_job`` table."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        lease_seconds: float | None = None,
+        clock: Callable[[], datetime] = utcnow,
+    ):
+        self.engine = engine
+        self.lease = timedelta(
+            seconds=config.JOB_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        )
+        self._clock = clock
+        self.table: Table = AnalysisJob.__table__  # type: ignore[assignment]
+
+    def enqueue(
+        self,
+        payload: dict[str, Any],
+        kind: str = "analysis",
+        priority: int = 0,
+        max_attempts: int | None = None,
+        delay: float = 0.0,
+        connection: Any = None,
+    ) -> int:
+        """Adds a job and returns its id.
+
+        Pass ``connection`` (a Connection or Session) to enqueue inside the
+        caller's transaction; the job then only becomes visible on commit.
+        """
+        now = self._clock()
+        statement = (
+            self.table.insert()
+            .values(
+                kind=kind,
+                payload=payload,
+                status=QUEUED,
+                priority=priority,
+                attempts=0,
+                max_attempts=max_attempts or config.JOB_MAX_ATTEMPTS,
+                run_at=now + timedelta(seconds=delay),
+                created_at=now,
+            )
+            .returning(self.table.c.id)
+        )
+        if connection is not None:
+            job_id = connection.execute(statement).scalar_one()
+        else:
+            with self.engine.begin() as conn:
+                job_id = conn.execute(statement).scalar_one()
+        JOBS.inc(kind=kind, outcome="enqueued")
+        return int(job_id)
+
+    def claim(
+        self, worker_id: str, limit: int = 1, kinds: Iterable[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """Leases up to ``limit`` due jobs to ``worker_id`` and returns them.
+
+        Rows locked by another claim in progress are skipped, not waited for.
+        """
+        if limit <= 0:
+            return []
+        t = self.table
+        now = self._clock()
+        candidates = (
+            select(t.c.id)
+            .where(t.c.status == QUEUED, t.c.run_at <= now)
+            .order_by(t.c.priority.desc(), t.c.run_at, t.c.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if kinds is not None:
+            candidates = candidates.where(t.c.kind.in_(list(kinds)))
+        statement = (
+            update(t)
+            .where(t.c.id.in_(candidates.scalar_subquery()))
+            .values(
+                status=RUNNING,
+                locked_by=worker_id,
+                locked_until=now + self.lease,
+                heartbeat_at=now,
+                started_at=now,
+                attempts=t.c.attempts + 1,
+            )
+            .returning(*t.c)
+        )
+        with self.engine.begin() as conn:
+            jobs = [dict(row._mapping) for row in conn.execute(statement)]
+        for job in jobs:
+            JOBS.inc(kind=job["kind"], outcome="claimed")
+        return sorted(jobs, key=lambda j: (-j["priority"], j["run_at"], j["id"]))
+
+    def heartbeat(self, worker_id: str, job_ids: Iterable[int]) -> set[int]:
+        """Extends the leases of ``job_ids``; returns the ids still held.
+
+        A job missing from the result was reaped or settled elsewhere, and its
+        worker should not report a result for it.
+        """
+        ids = list(job_ids)
+        if not ids:
+            return set()
+        t = self.table
+        now = self._clock()
+        statement = (
+            update(t)
+            .where(t.c.id.in_(ids), t.c.locked_by == worker_id, t.c.status == RUNNING)
+            .values(locked_until=now + self.lease, heartbeat_at=now)
+            .returning(t.c.id)
+        )
+        with self.engine.begin() as conn:
+            return {row[0] for row in conn.execute(statement)}
+
+    def complete(
+        self, job_id: int, worker_id: str, result: dict[str, Any] | None = None
+    ) -> bool:
+        """Marks a job as succeeded; False if the worker no longer held it."""
+        t = self.table
+        statement = (
+            update(t)
+            .where(t.c.id == job_id, t.c.locked_by == worker_id, t.c.status == RUNNING)
+            .values(
+                status=SUCCEEDED,
+                result=result,
+                finished_at=self._clock(),
+                locked_by=None,
+                locked_until=None,
+                last_error=None,
+            )
+            .returning(t.c.kind)
+        )
+        with self.engine.begin() as conn:
+            kind = conn.execute(statement).scalar_one_or_none()
+        if kind is None:
+            return False
+        JOBS.inc(kind=kind, outcome="succeeded")
+        return True
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> str | None:
+        """Schedules a retry or dead-letters the job.
+
+        Returns the new status, or None if the worker no longer held the job.
+        """
+        t = self.table
+        with self.engine.begin() as conn:
+            row = conn.execute(
+                select(t.c.kind, t.c.attempts, t.c.max_attempts)
+                .where(
+                    t.c.id == job_id, t.c.locked_by == worker_id, t.c.status == RUNNING
+                )
+                .with_for_update()
+            ).one_or_none()
+            if row is None:
+                return None
+            now = self._clock()
+            status = DEAD if row.attempts >= row.max_attempts else QUEUED
+            conn.execute(
+                update(t)
+                .where(t.c.id == job_id)
+                .values(
+                    status=status,
+                    run_at=now + timedelta(seconds=retry_delay(row.attempts)),
+                    finished_at=now if status == DEAD else None,
+                    locked_by=None,
+                    locked_until=None,
+                    last_error=error[:10000],
+                )
+            )
+        JOBS.inc(kind=row.kind, outcome="dead" if status == DEAD else "retried")
+        if status == DEAD:
+            log.error(f"Job {job_id} dead after {row.attempts} attempts: {error}")
+        return status
+
+    def reap(self) -> int:
+        """Requeues (or dead-letters) running jobs whose lease has expired."""
+        t = self.table
+        now = self._clock()
+        exhausted = t.c.attempts >= t.c.max_attempts
+        statement = (
+            update(t)
+            .where(t.c.status == RUNNING, t.c.locked_until < now)
+            .values(
+                status=case((exhausted, DEAD), else_=QUEUED),
+                run_at=now,
+                finished_at=case((exhausted, now), else_=None),
+                locked_by=None,
+                locked_until=None,
+                last_error="lease expired",
+            )
+            .returning(t.c.id, t.c.kind, t.c.status)
+        )
+        with self.engine.begin() as conn:
+            rows = conn.execute(statement).all()
+        for row in rows:
+            JOBS.inc(kind=row.kind, outcome="dead" if row.status == DEAD else "reaped")
+        if rows:
+            log.warning(f"Requeued {len(rows)} job(s) with expired leases")
+        return len(rows)
+
+    def requeue(self, job_ids: Iterable[int]) -> int:
+        """Moves dead jobs back to the queue with a fresh set of attempts."""
+        t = self.table
+        statement = (
+            update(t)
+            .where(t.c.id.in_(list(job_ids)), t.c.status == DEAD)
+            .values(status=QUEUED, attempts=0, run_at=self._clock(), finished_at=None)
+        )
+        with self.engine.begin() as conn:
+            return int(conn.execute(statement).rowcount)
+
+    def depth(self) -> int:
+        """Number of jobs that are due and waiting for a worker."""
+        t = self.table
+        statement = (
+            select(func.count())
+            .select_from(t)
+            .where(t.c.status == QUEUED, t.c.run_at <= self._clock())
+        )
+        with self.engine.connect() as conn:
+            return int(conn.execute(statement).scalar_one())
+
+    def get(self, job_id: int, connection: Any = None) -> dict[str, Any] | None:
+        statement = select(self.table).where(self.table.c.id == job_id)
+        if connection is not None:
+            row = connection.execute(statement).one_or_none()
+        else:
+            with self.engine.connect() as conn:
+                row = conn.execute(statement).one_or_none()
+        return dict(row._mapping) if row is not None else None
@@ -0,0 +1,117 @@
+import functools
+import json
+import re
+import time
+from typing import Any, Callable, Iterator
+
+import google.generativeai as genai
+
+from levelup import config, tokens
+from levelup.profiling import record_stage, stage
+from levelup.scheduler import llm_slot
+from levelup.tracing import set_attributes
+
+MODEL_NAME = "gemini-2.0-flash-lite"
+
+# A callable that sends a prompt to the model and returns the raw response text.
+Generate = Callable[[str], str]
+# A callable that sends a prompt to the model and yields the response text in chunks.
+Stream = Callable[[str], Iterator[str]]
+
+
+@functools.lru_cache(maxsize=1)
+def get_model() -> Any:
+    """Returns the shared Gemini model, configuring the client on first use."""
+    genai.configure(api_key=config.GEMINI_API_KEY)
+    return genai.GenerativeModel(MODEL_NAME)
+
+
+def generate_text(prompt: str) -> str:
+    """Sends a prompt to the shared model and returns the stripped response text.
+
+    The call waits for a slot of the LLM scheduler in the lane of the current
+    context (see ``levelup.scheduler``), charged its estimated prompt tokens.
+    The token usage reported by the backend (or estimated, if it reports
+    none) is recorded with ``tokens.record_usage``.
+    """
+    with llm_slot(tokens.estimate_tokens(prompt)), stage("llm_generate"):
+        set_attributes(**{"llm.model": MODEL_NAME})
+        response = get_model().generate_content(prompt)
+        text = (response.text or "").strip()
+        usage = getattr(response, "usage_metadata", None)
+        record_response_usage(prompt, text, usage)
+    return text
+
+
+def stream_text(prompt: str) -> Iterator[str]:
+    """Sends a prompt to the shared model and yields the response text as it arrives.
+
+    The scheduler slot is held until the response is complete (or the
+    iterator is closed); usage is recorded once the stream has finished.
+    """
+    with llm_slot(tokens.estimate_tokens(prompt)), stage("llm_generate"):
+        set_attributes(**{"llm.model": MODEL_NAME, "llm.stream": True})
+        started = time.perf_counter()
+        response = get_model().generate_content(prompt, stream=True)
+        chunks: list[str] = []
+        for chunk in response:
+            if text := chunk.text:
+                if not chunks:
+                    record_stage("llm_first_token", time.perf_counter() - started)
+                chunks.append(text)
+                yield text
+        usage = getattr(response, "usage_metadata", None)
+        record_response_usage(prompt, "".join(chunks).strip(), usage)
+
+
+def record_response_usage(prompt: str, text: str, usage: Any) -> None:
+    """Records the usage metadata of a response, estimating missing counts."""
+    input_tokens = getattr(usage, "prompt_token_count", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    if isinstance(input_tokens, int) and input_tokens > 0:
+        if isinstance(output_tokens, int):
+            tokens.record_usage(input_tokens, output_tokens)
+            return
+    tokens.record_usage(
+        tokens.estimate_tokens(prompt), tokens.estimate_tokens(text), estimated=True
+    )
+
+
+def count_tokens(text: str) -> int:
+    """Counts the tokens of ``text`` with the backend's tokenizer (no generation)."""
+    return int(get_model().count_tokens(text).total_tokens)
+
+
+def probe() -> str:
+    """Checks that the model is reachable without spending generation quota.
+
+    Fetches the model metadata, which needs a valid API key and a working
+    connection but runs no inference. Returns the model's display name.
+    """
+    if not config.GEMINI_API_KEY:
+        raise RuntimeError("GEMINI_API_KEY is not set")
+    get_model()  # configures the client
+    model = genai.get_model(f"models/{MODEL_NAME}", request_options={"timeout": 5})
+    return str(getattr(model, "display_name", None) or MODEL_NAME)
+
+
+def extract_json(raw: str) -> dict[str, Any] | None:
+    """Extracts the first JSON object from a model response, fenced or bare."""
+    with stage("json_extraction"):
+        return _extract_json(raw)
+
+
+def _extract_json(raw: str) -> dict[str, Any] | None:
+    fence = re.search(r"```(?:json)?\s*({[\s\S]*?})\s*```", raw, re.IGNORECASE)
+    if fence:
+        block = fence.group(1)
+    else:
+        match = re.search(r"\{[\s\S]*\}", raw)
+        block = match.group(0) if match else None
+    if not block:
+        return None
+    try:
+        result = json.loads(block)
+        return result if isinstance(result, dict) else None
+    except json.JSONDecodeError:
+        return None
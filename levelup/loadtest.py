@@ -0,0 +1,640 @@
+"""Load testing of the API against a stubbed model, for capacity planning.
+
+:func:`run_load_test` drives the FastAPI app in process, through its ASGI
+interface, with a closed-loop mix of realistic requests from ``concurrency``
+virtual users for ``duration`` seconds:
+
+* ``analyze``: a synthetic PDF resume uploaded to ``POST /analyze``;
+* ``submit``: the same, queued with ``POST /jobs`` (needs the database);
+* ``poll``: ``GET /jobs/{id}`` for a job submitted earlier in the run;
+* ``search`` and ``rank``: the listings of stored analyses.
+
+The model is replaced by :class:`StubModel`, which answers every prompt with
+a valid analysis after a delay drawn from a configurable distribution (see
+:func:`parse_latency`) and fails a configurable share of calls, so the run
+measures the node (PDF extraction, prompts, scheduling, storage, the
+threadpool) and not the model provider. The run uses a temporary analysis
+store and, unless asked otherwise, no request quota.
+
+The report has throughput, latency percentiles, error rates and status codes
+per request kind, the process's CPU time, peak memory and threads, and the
+commit it was run on. :func:`compare` sets it against a saved earlier report.
+"""
+
+import asyncio
+import json
+import math
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Iterator, NamedTuple
+
+from levelup import config, llm, quota, store
+from levelup.tokens import estimate_tokens
+
+KINDS = ("analyze", "submit", "poll", "search", "rank")
+DEFAULT_MIX = "analyze=6,search=2,rank=2"
+PERCENTILES = (50, 90, 95, 99)
+
+ROLES = ("Backend Engineer", "Data Scientist", "DevOps Engineer", "QA Engineer")
+SKILLS = (
+    "Python",
+    "Java",
+    "Go",
+    "SQL",
+    "PostgreSQL",
+    "Docker",
+    "Kubernetes",
+    "Terraform",
+    "AWS",
+    "React",
+    "Pandas",
+    "Spark",
+    "Linux",
+    "Git",
+)
+COMPANIES = ("Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries")
+TITLES = ("Software Engineer", "Data Engineer", "Platform Engineer", "Analyst")
+WORDS = (
+    "built designed migrated scaled automated improved led reduced delivered "
+    "services pipelines dashboards latency costs reliability deployments tests "
+    "customers teams platform data models releases monitoring"
+).split()
+
+
+class Latency(NamedTuple):
+    """A model latency distribution, in seconds."""
+
+    kind: str  # fixed, uniform, normal or lognormal
+    a: float
+    b: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            value = self.a
+        elif self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = rng.gauss(self.a, self.b)
+        else:  # lognormal with median a and shape b
+            value = rng.lognormvariate(math.log(self.a), self.b)
+        return max(value, 0.0)
+
+
+def parse_latency(spec: str) -> Latency:
+    """Parses ``fixed:S``, ``uniform:MIN,MAX``, ``normal:MEAN,SD`` or ``lognormal:MEDIAN,SIGMA``.
+
+    Raises:
+        ValueError: if the specification is not one of these.
+    """
+    kind, _, args = spec.partition(":")
+    arity = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}.get(kind)
+    try:
+        values = [float(v) for v in args.split(",")] if args else []
+    except ValueError:
+        values = []
+    if arity is None or len(values) != arity or min(values) < 0:
+        raise ValueError(f"Invalid latency distribution: {spec!r}")
+    if kind == "lognormal" and values[0] == 0:
+        raise ValueError("A lognormal latency needs a positive median")
+    return Latency(kind, *values)
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Parses ``kind=weight`` entries into request kind weights.
+
+    Raises:
+        ValueError: for unknown kinds, negative weights or an empty mix.
+    """
+    mix: dict[str, float] = {}
+    for entry in spec.split(","):
+        kind, _, weight = entry.strip().partition("=")
+        if kind not in KINDS:
+            raise ValueError(f"Unknown request kind: {kind!r}")
+        mix[kind] = float(weight or 1)
+        if mix[kind] < 0:
+            raise ValueError(f"Negative weight for {kind}")
+    if not any(mix.values()):
+        raise ValueError("The request mix is empty")
+    return mix
+
+
+class StubModel:
+    """Stands in for the Gemini model: every prompt gets a valid analysis after a delay."""
+
+    def __init__(
+        self,
+        latency: Latency,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _answer(self) -> str:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency.sample(self._rng)
+            failed = self._rng.random() < self.error_rate
+            score = self._rng.randint(40, 95)
+            roles = self._rng.sample(ROLES, 2)
+            missing = self._rng.sample(SKILLS, 2)
+        time.sleep(delay)
+        if failed:
+            raise RuntimeError("stub model error")
+        return json.dumps(
+            {
+                "language": "English",
+                "domain_scores": [
+                    {"domain": "IT", "score": score, "justification": "Stub"}
+                ],
+                "competency_scores": [
+                    {
+                        "category": "Technical Skills",
+                        "score": score,
+                        "strength": "Stub",
+                        "observation": "Stub",
+                    }
+                ],
+                "strategic_insights": "Stub insight.",
+                "development_recommendations": [f"Learn {missing[0]}"],
+                "missing_skills": [
+                    {"skill": missing[0], "priority": "Critical"},
+                    {"skill": missing[1], "priority": "Important"},
+                ],
+                "mismatched_experience": [],
+                "comparative_benchmarking": "Stub benchmark.",
+                "overall_summary": {
+                    "overall_score": score,
+                    "key_strengths": ["Stub"],
+                    "areas_to_improve": ["Stub"],
+                    "talent_potential": "High",
+                    "role_suitability": [
+                        {"role": roles[0], "score": score},
+                        {"role": roles[1], "score": max(score - 10, 0)},
+                    ],
+                },
+            }
+        )
+
+    def generate_content(self, prompt: str, stream: bool = False) -> Any:
+        text = self._answer()
+        usage = SimpleNamespace(
+            prompt_token_count=estimate_tokens(prompt),
+            candidates_token_count=estimate_tokens(text),
+        )
+        if stream:
+            chunks = [
+                SimpleNamespace(text=text[i : i + 200])
+                for i in range(0, len(text), 200)
+            ]
+            return _StubStream(chunks, usage)
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+    def count_tokens(self, text: str) -> Any:
+        return SimpleNamespace(total_tokens=estimate_tokens(text))
+
+
+class _StubStream(list[Any]):
+    def __init__(self, chunks: list[Any], usage: Any):
+        super().__init__(chunks)
+        self.usage_metadata = usage
+
+
+def make_pdf(lines: list[str], lines_per_page: int = 60) -> bytes:
+    """Writes the lines as a minimal text PDF (ASCII, Helvetica 10pt)."""
+    pages = [
+        lines[i : i + lines_per_page] for i in range(0, len(lines), lines_per_page)
+    ]
+    pages = pages or [[]]
+    font = 3 + 2 * len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(b"%d 0 R" % (3 + 2 * i) for i in range(len(pages)))
+        + b"] /Count %d >>" % len(pages),
+    ]
+    for i, page in enumerate(pages):
+        text = "".join(
+            "("
+            + line.encode("ascii", "replace")
+            .decode()
+            .replace("\\", "\\\\")
+            .replace("(", "\\(")
+            .replace(")", "\\)")
+            + ") Tj T* "
+            for line in page
+        )
+        stream = f"BT /F1 10 Tf 12 TL 50 790 Td {text}ET".encode()
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (font, 4 + 2 * i)
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+def synthetic_resume(rng: random.Random) -> list[str]:
+    """The lines of a plausible, randomly varied resume."""
+
+    def sentence() -> str:
+        return " ".join(
+            rng.choice(WORDS) for _ in range(rng.randint(6, 12))
+        ).capitalize()
+
+    name = f"Candidate {rng.randint(1000, 9999)}"
+    lines = [name, f"{name.lower().replace(' ', '.')}@example.com", "", "Summary"]
+    lines += [sentence() + "." for _ in range(2)]
+    lines += ["", "Experience"]
+    year = 2024
+    for _ in range(rng.randint(2, 4)):
+        start = year - rng.randint(1, 4)
+        lines.append(
+            f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)}  {start} - {year}"
+        )
+        lines += [f"- {sentence()}." for _ in range(rng.randint(2, 4))]
+        year = start
+    lines += ["", "Skills", ", ".join(rng.sample(SKILLS, rng.randint(4, 8)))]
+    lines += ["", "Education", f"BSc Computer Science, University  {year - 4} - {year}"]
+    return lines
+
+
+class Sample(NamedTuple):
+    kind: str
+    status: int  # 0 when the app raised instead of responding
+    seconds: float
+
+
+async def _asgi_request(
+    app: Any,
+    method: str,
+    path: str,
+    query: str = "",
+    body: bytes = b"",
+    headers: list[tuple[bytes, bytes]] | None = None,
+    client: tuple[str, int] = ("127.0.0.1", 50000),
+) -> tuple[int, bytes]:
+    """Sends one HTTP request to an ASGI app and returns its status and body."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"loadtest"), *(headers or [])],
+        "client": client,
+        "server": ("loadtest", 80),
+    }
+    done = asyncio.Event()
+    sent = False
+    status = 0
+    chunks: list[bytes] = []
+
+    async def receive() -> dict[str, Any]:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                done.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        done.set()
+    return status, b"".join(chunks)
+
+
+def _multipart(fields: dict[str, str], pdf: bytes) -> tuple[bytes, bytes]:
+    boundary = "levelup-loadtest-boundary"
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+        f"{value}\r\n".encode()
+        for name, value in fields.items()
+    ]
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; '
+        'filename="resume.pdf"\r\nContent-Type: application/pdf\r\n\r\n'.encode()
+        + pdf
+        + b"\r\n"
+    )
+    body = b"".join(parts) + f"--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}".encode()
+
+
+class _Traffic:
+    """Issues the requests of the mix and records their outcome."""
+
+    def __init__(
+        self, app: Any, mix: dict[str, float], resumes: list[bytes], seed: int
+    ):
+        self.app = app
+        self.kinds = [kind for kind, weight in mix.items() if weight > 0]
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.resumes = resumes
+        self.rng = random.Random(seed)
+        self.jobs: list[int] = []
+        self.samples: list[Sample] = []
+        self.prefix = config.API_V1_STR
+
+    async def _upload(self, path: str, client: tuple[str, int]) -> tuple[int, bytes]:
+        fields = {"language": "English", "role": self.rng.choice(ROLES)}
+        body, content_type = _multipart(fields, self.rng.choice(self.resumes))
+        return await _asgi_request(
+            self.app,
+            "POST",
+            path,
+            body=body,
+            headers=[(b"content-type", content_type)],
+            client=client,
+        )
+
+    async def request(self, client: tuple[str, int]) -> None:
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        if kind == "poll" and not self.jobs:
+            kind = "submit"
+        started = time.perf_counter()
+        try:
+            if kind == "analyze":
+                status, _ = await self._upload(f"{self.prefix}/analyze", client)
+            elif kind == "submit":
+                status, body = await self._upload(f"{self.prefix}/jobs", client)
+                if status == 202:
+                    self.jobs.append(json.loads(body)["id"])
+            elif kind == "poll":
+                job_id = self.rng.choice(self.jobs)
+                status, _ = await _asgi_request(
+                    self.app, "GET", f"{self.prefix}/jobs/{job_id}", client=client
+                )
+            elif kind == "search":
+                query = f"q={self.rng.choice(SKILLS)}+{self.rng.choice(SKILLS)}"
+                status, _ = await _asgi_request(
+                    self.app, "GET", f"{self.prefix}/search/", query, client=client
+                )
+            else:
+                query = f"role={self.rng.choice(ROLES).replace(' ', '+')}"
+                status, _ = await _asgi_request(
+                    self.app, "GET", f"{self.prefix}/ranking/", query, client=client
+                )
+        except Exception:
+            status = 0
+        self.samples.append(Sample(kind, status, time.perf_counter() - started))
+
+
+def _rss_mb() -> float:
+    """Resident memory of this process, from /proc where available."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+
+async def _run(
+    app: Any, traffic: _Traffic, duration: float, concurrency: int
+) -> dict[str, Any]:
+    deadline = time.perf_counter() + duration
+    peaks = {"rss_mb": _rss_mb(), "threads": threading.active_count()}
+
+    async def user(number: int) -> None:
+        client = ("10.0.%d.%d" % divmod(number, 250), 40000 + number)
+        while time.perf_counter() < deadline:
+            await traffic.request(client)
+
+    async def monitor() -> None:
+        while True:
+            peaks["rss_mb"] = max(peaks["rss_mb"], _rss_mb())
+            peaks["threads"] = max(peaks["threads"], threading.active_count())
+            await asyncio.sleep(0.25)
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    watcher = asyncio.create_task(monitor())
+    await asyncio.gather(*(user(n) for n in range(concurrency)))
+    watcher.cancel()
+    elapsed = time.perf_counter() - started
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = (after.ru_utime - usage.ru_utime) + (after.ru_stime - usage.ru_stime)
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_percent": round(100 * cpu / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": round(peaks["rss_mb"], 1),
+        "peak_threads": peaks["threads"],
+    }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict[str, Any]:
+    """Throughput, latency percentiles (ms) and errors of a set of samples."""
+    latencies = sorted(s.seconds * 1000 for s in samples)
+    errors = sum(1 for s in samples if not 200 <= s.status < 400)
+    statuses: dict[str, int] = {}
+    for s in samples:
+        statuses[str(s.status)] = statuses.get(str(s.status), 0) + 1
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency_ms": {
+            **{f"p{q}": round(_percentile(latencies, q), 1) for q in PERCENTILES},
+            "mean": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+            "max": round(latencies[-1], 1) if latencies else 0.0,
+        },
+    }
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+@contextmanager
+def _override(target: Any, **values: Any) -> Iterator[None]:
+    previous = {name: getattr(target, name) for name in values}
+    for name, value in values.items():
+        setattr(target, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(target, name, value)
+
+
+@contextmanager
+def isolated(model: StubModel, use_quota: bool = False) -> Iterator[None]:
+    """Points the app at the stub model and a temporary analysis store."""
+    with ExitStack() as stack:
+        path = stack.enter_context(tempfile.TemporaryDirectory(prefix="levelup-load-"))
+        stack.enter_context(_override(llm, get_model=lambda: model))
+        stack.enter_context(
+            _override(config, ANALYSIS_STORE_PATH=path, QUOTA_ENABLED=use_quota)
+        )
+        stack.enter_context(_override(quota, _quota=None))
+        store.get_store.cache_clear()
+        stack.callback(store.get_store.cache_clear)
+        yield
+
+
+def run_load_test(
+    app: Any,
+    duration: float = 30.0,
+    concurrency: int = 10,
+    mix: str = DEFAULT_MIX,
+    latency: str = "lognormal:2,0.5",
+    error_rate: float = 0.0,
+    resumes: int = 50,
+    seed: int = 0,
+    use_quota: bool = False,
+) -> dict[str, Any]:
+    """Runs the traffic mix against ``app`` and returns the report.
+
+    Raises:
+        ValueError: if the mix or the latency distribution is invalid.
+    """
+    weights = parse_mix(mix)
+    model = StubModel(parse_latency(latency), error_rate, seed)
+    rng = random.Random(seed)
+    corpus = [make_pdf(synthetic_resume(rng)) for _ in range(max(resumes, 1))]
+    traffic = _Traffic(app, weights, corpus, seed)
+    started_at = datetime.now(timezone.utc)
+
+    with isolated(model, use_quota):
+        resources = asyncio.run(_run(app, traffic, duration, concurrency))
+
+    elapsed = resources.pop("elapsed_s")
+    by_kind = {
+        kind: summarize([s for s in traffic.samples if s.kind == kind], elapsed)
+        for kind in KINDS
+        if any(s.kind == kind for s in traffic.samples)
+    }
+    return {
+        "commit": current_commit(),
+        "started_at": started_at.isoformat(),
+        "python": sys.version.split()[0],
+        "settings": {
+            "duration_s": duration,
+            "concurrency": concurrency,
+            "mix": weights,
+            "llm_latency": latency,
+            "llm_error_rate": error_rate,
+            "resumes": resumes,
+            "quota": use_quota,
+            "concurrent_sections": config.ANALYSIS_CONCURRENT_SECTIONS,
+            "llm_max_concurrency": config.LLM_MAX_CONCURRENCY,
+        },
+        "elapsed_s": elapsed,
+        "total": summarize(traffic.samples, elapsed),
+        "kinds": by_kind,
+        "llm_calls": model.calls,
+        "resources": resources,
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [
+        f"{'Kind':<8} {'Reqs':>6} {'Req/s':>8} {'Errors':>7} "
+        + " ".join(f"{f'p{q} ms':>9}" for q in PERCENTILES)
+        + f" {'max ms':>9}"
+    ]
+    rows = {**report["kinds"], "total": report["total"]}
+    for kind, stats in rows.items():
+        latency = stats["latency_ms"]
+        lines.append(
+            f"{kind:<8} {stats['requests']:>6} {stats['throughput_rps']:>8.2f} "
+            f"{stats['error_rate']:>7.1%} "
+            + " ".join(f"{latency[f'p{q}']:>9.1f}" for q in PERCENTILES)
+            + f" {latency['max']:>9.1f}"
+        )
+    res = report["resources"]
+    lines.append(
+        f"{report['elapsed_s']:.1f}s, {report['llm_calls']} model calls; "
+        f"CPU {res['cpu_seconds']:.1f}s ({res['cpu_percent']:.0f}% of a core), "
+        f"peak RSS {res['peak_rss_mb']:.0f} MB, {res['peak_threads']} threads"
+    )
+    return "\n".join(lines)
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any]) -> str:
+    """Compares throughput, p50/p99 latency and error rate with an earlier report."""
+
+    def change(new: float, old: float) -> str:
+        if not old:
+            return "     n/a"
+        return f"{(new - old) / old:>+8.1%}"
+
+    lines = [
+        f"Compared with {baseline.get('commit') or 'baseline'} "
+        f"({baseline.get('started_at', '?')[:19]}):",
+        f"{'Kind':<8} {'Req/s':>8} {'p50':>8} {'p99':>8} {'Errors':>15}",
+    ]
+    rows = {**report["kinds"], "total": report["total"]}
+    old_rows = {**baseline.get("kinds", {}), "total": baseline.get("total", {})}
+    for kind, stats in rows.items():
+        old = old_rows.get(kind)
+        if not old:
+            continue
+        lines.append(
+            f"{kind:<8} {change(stats['throughput_rps'], old['throughput_rps'])} "
+            f"{change(stats['latency_ms']['p50'], old['latency_ms']['p50'])} "
+            f"{change(stats['latency_ms']['p99'], old['latency_ms']['p99'])} "
+            f"{old['error_rate']:>6.1%} -> {stats['error_rate']:>5.1%}"
+        )
+    return "\n".join(lines)
@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
@@ -12,7 +13,18 @@ except ImportError:
     SENTRY_AVAILABLE = False
     sentry_sdk = None  # type: ignore
 
+from levelup import metrics
 from levelup.api.main import api_router
+from levelup.api.routes.jobs import get_job_queue
+from levelup.database.core import engine
+from levelup.database.middleware import DBSessionMiddleware
+from levelup.health import (
+    HealthChecker,
+    database_check,
+    llm_check,
+    queue_depth_check,
+)
+from levelup.tracing import TraceMiddleware
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -28,7 +40,9 @@ app = FastAPI(
 
 # Initialize Sentry if available and configured
 if SENTRY_AVAILABLE and sentry_sdk and settings.SENTRY_DSN and settings.ENV != "local":
-    sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
+    sentry_sdk.init(
+        dsn=str(settings.SENTRY_DSN), traces_sample_rate=settings.TRACE_SAMPLE_RATE
+    )
 
 # Set all CORS enabled origins
 if settings.all_cors_origins:
@@ -40,6 +54,12 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+# Request-scoped database session, opened on first use (request.state.db)
+app.add_middleware(DBSessionMiddleware)
+
+# Traces of requests, with head and tail sampling (when TRACING_ENABLED)
+app.add_middleware(TraceMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -54,3 +74,33 @@ def root() -> dict[str, str]:
 def health() -> dict[str, str]:
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+# Deep readiness checks, cached for HEALTH_CHECK_TTL seconds
+health_checker = HealthChecker(
+    ttl=settings.HEALTH_CHECK_TTL, timeout=settings.HEALTH_CHECK_TIMEOUT
+)
+health_checker.register("database", database_check(engine), critical=True)
+if settings.HEALTH_CHECK_LLM:
+    health_checker.register("llm", llm_check)
+health_checker.register(
+    "queue",
+    queue_depth_check(get_job_queue().depth, warn=settings.HEALTH_QUEUE_DEPTH_WARN),
+)
+
+
+@app.get("/health/ready")
+def readiness() -> JSONResponse:
+    """Readiness endpoint with the cached status of each dependency.
+
+    Returns 503 when a critical dependency (the database) is down.
+    """
+    report = health_checker.report()
+    status_code = 503 if report.status == "unhealthy" else 200
+    return JSONResponse(report.as_dict(), status_code=status_code)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    """Prometheus metrics endpoint."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
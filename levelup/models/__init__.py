@@ -0,0 +1,6 @@
+"""Database models. Importing this package registers them on ``Base.metadata``."""
+
+from levelup.models.analysis import Analysis
+from levelup.models.job import AnalysisJob
+
+__all__ = ["Analysis", "AnalysisJob"]
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from levelup.database.core import Base
+from levelup.models.job import JSONType
+
+
+class Analysis(Base):
+    """An analysis result, as exported and imported by ``levelup.transfer``.
+
+    The id is the analysis store's id for records coming from the store, or a
+    digest of the content for bare analysis outputs, so importing the same
+    data twice does not duplicate it.
+    """
+
+    __table_args__ = (
+        Index("ix_analysis_created_at_id", "created_at", "id"),
+        {"schema": "dispatch_core"},
+    )
+    __repr_attrs__ = ["language", "role"]
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    language: Mapped[str | None] = mapped_column(String(50))
+    role: Mapped[str | None] = mapped_column(String(200))
+    text_sha256: Mapped[str | None] = mapped_column(String(64), index=True)
+    result: Mapped[dict[str, Any]] = mapped_column(JSONType)
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, BigInteger, DateTime, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from levelup.database.core import Base
+
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+
+class AnalysisJob(Base):
+    """A unit of work in the durable job queue (see ``levelup.jobs``).
+
+    ``status`` moves from ``queued`` to ``running`` when a worker claims the
+    job and holds its lease (``locked_by``/``locked_until``), then to
+    ``succeeded``, back to ``queued`` for a retry at ``run_at``, or to
+    ``dead`` once ``max_attempts`` are used up.
+    """
+
+    __table_args__ = (
+        Index(
+            "ix_analysis_job_claimable",
+            "priority",
+            "run_at",
+            postgresql_where=text("status = 'queued'"),
+        ),
+        Index("ix_analysis_job_status_locked_until", "status", "locked_until"),
+        {"schema": "dispatch_core"},
+    )
+    __repr_attrs__ = ["kind", "status"]
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer(), "sqlite"), primary_key=True
+    )
+    kind: Mapped[str] = mapped_column(String(50), default="analysis")
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONType)
+    status: Mapped[str] = mapped_column(String(20), default="queued")
+    priority: Mapped[int] = mapped_column(Integer, default=0)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=5)
+    run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    locked_by: Mapped[str | None] = mapped_column(String(200))
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[str | None] = mapped_column(Text)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSONType)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,91 @@
+import io
+import json
+from typing import Any
+
+import pandas as pd  # type: ignore[import-untyped]
+import streamlit as st
+
+from levelup import config
+from levelup.cohort import (
+    CohortFrames,
+    as_record,
+    build_frames,
+    competency_heatmap,
+    domain_fit,
+    score_distribution,
+    score_histogram,
+    skill_gap_frequency,
+)
+from levelup.store import AnalysisStore
+
+
+# ``version`` is part of the cache key, so saving or deleting an analysis
+# rebuilds the frames; the ttl catches changes within one mtime tick.
+@st.cache_data(show_spinner=False, ttl=60)
+def load_store_frames(path: str, version: int) -> CohortFrames:
+    return build_frames(AnalysisStore(path))
+
+
+def load_uploaded_frames(files: list[Any]) -> CohortFrames:
+    return build_frames(
+        as_record(json.loads(f.getvalue()), f.name.rsplit(".", 1)[0]) for f in files
+    )
+
+
+def parquet_bytes(frame: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+st.title("Cohort Analytics")
+
+source = st.radio("Analyses source", ["Analysis store", "Upload JSON files"])
+if source == "Analysis store":
+    store_path = st.text_input("Store path", value=config.ANALYSIS_STORE_PATH)
+    frames = load_store_frames(store_path, AnalysisStore(store_path).version)
+else:
+    uploads = st.file_uploader(
+        "Analysis JSON files", type="json", accept_multiple_files=True
+    )
+    frames = load_uploaded_frames(uploads or [])
+
+candidates = frames.candidates
+if candidates.empty:
+    st.info("No analyses found.")
+    st.stop()
+
+roles = sorted(candidates["role"].cat.categories)
+selected_roles = st.multiselect("Roles", roles, default=roles)
+if selected_roles:
+    keep = set(candidates.loc[candidates["role"].isin(selected_roles), "id"])
+    frames = CohortFrames(*(frame[frame["id"].isin(keep)] for frame in frames))
+
+c1, c2, c3 = st.columns(3)
+c1.metric("Candidates", len(frames.candidates))
+c2.metric("Median overall score", f"{frames.candidates['overall_score'].median():.0f}")
+c3.metric("Roles", frames.candidates["role"].nunique())
+
+st.subheader("Overall Score Distribution")
+st.dataframe(score_distribution(frames), width="stretch")
+st.bar_chart(score_histogram(frames))
+
+st.subheader("Most Frequent Skill Gaps")
+top = st.slider("Skills per role", min_value=3, max_value=30, value=10)
+st.dataframe(skill_gap_frequency(frames, top=top), width="stretch")
+
+st.subheader("Competency Heatmap")
+st.dataframe(competency_heatmap(frames).round(1), width="stretch")
+
+st.subheader("Career Domain Fit")
+st.dataframe(domain_fit(frames), width="stretch")
+
+st.subheader("Export")
+cols = st.columns(len(frames))
+for col, (name, frame) in zip(cols, frames._asdict().items()):
+    col.download_button(
+        name.replace("_", " ").title(),
+        data=parquet_bytes(frame),
+        file_name=f"{name}.parquet",
+        mime="application/vnd.apache.parquet",
+    )
@@ -0,0 +1,83 @@
+"""Bounded-memory text extraction from PDF resumes.
+
+Uploads are spooled to a temporary file instead of being parsed from an
+in-memory buffer, pages are extracted one at a time and their parsed object
+caches are released as soon as the text has been read, and extraction stops
+once a page count or token budget has been reached.
+"""
+
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+import pdfplumber
+
+from levelup import config
+from levelup.profiling import stage
+
+# Rough characters-per-token ratio used to stop extraction early.
+CHARS_PER_TOKEN = 4
+_SPOOL_CHUNK_SIZE = 1024 * 1024
+
+
+@contextmanager
+def spool_upload(source: Any) -> Iterator[Any]:
+    """Yields something ``pdfplumber.open`` can read without buffering it in RAM.
+
+    Paths are passed through unchanged. File-like uploads are copied in chunks
+    into an anonymous temporary file that is removed on exit.
+    """
+    if isinstance(source, (str, Path)):
+        yield source
+        return
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+    with tempfile.TemporaryFile(prefix="levelup-", suffix=".pdf") as spooled:
+        shutil.copyfileobj(source, spooled, _SPOOL_CHUNK_SIZE)
+        spooled.seek(0)
+        yield spooled
+
+
+def iter_page_texts(
+    source: str | Path | IO[bytes], max_pages: int | None = None
+) -> Iterator[str]:
+    """Yields the text of each page, releasing the page's caches after use."""
+    with spool_upload(source) as readable:
+        pages = list(range(1, max_pages + 1)) if max_pages else None
+        with pdfplumber.open(readable, pages=pages) as pdf:
+            for page in pdf.pages:
+                try:
+                    yield page.extract_text() or ""
+                finally:
+                    page.close()
+
+
+def extract_text(
+    source: str | Path | IO[bytes],
+    max_pages: int | None = None,
+    max_tokens: int | None = None,
+) -> str:
+    """Extracts resume text, stopping at ``max_pages`` or about ``max_tokens``.
+
+    Limits default to ``PDF_MAX_PAGES`` and ``PDF_MAX_TOKENS``; pass 0 to
+    disable one.
+    """
+    if max_pages is None:
+        max_pages = config.PDF_MAX_PAGES
+    if max_tokens is None:
+        max_tokens = config.PDF_MAX_TOKENS
+    char_budget = max_tokens * CHARS_PER_TOKEN if max_tokens else None
+
+    parts: list[str] = []
+    used = 0
+    with stage("pdf_extraction"):
+        for text in iter_page_texts(source, max_pages or None):
+            if char_budget is not None and used + len(text) >= char_budget:
+                parts.append(text[: max(char_budget - used, 0)])
+                break
+            parts.append(text)
+            used += len(text) + 1
+    return "\n".join(parts).strip()
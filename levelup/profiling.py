@@ -0,0 +1,162 @@
+"""Per-stage analysis timing for ``levelup analyze --profile`` and the web app.
+
+The stages of the analysis pipeline are timed with :func:`stage` blocks:
+
+* ``pdf_extraction``: reading the resume text out of the PDF;
+* ``prompt_build``: building prompts, including the budget check's empty one;
+* ``llm_queue``: waiting for a slot of the LLM scheduler;
+* ``llm_generate``: the model call, until the whole response has arrived;
+* ``llm_first_token``: time to the first chunk of a streamed response;
+* ``json_extraction``: parsing the JSON out of model responses;
+* ``rendering``: formatting or displaying the result.
+
+Timings are only collected inside a :func:`use_profile` block. Each stage is
+also a span of the current trace, if any (see ``levelup.tracing``); with
+neither, :func:`stage` costs two context variable lookups. Like
+``tokens.track_usage``, worker threads only report into the block if they run
+in a copy of the caller's context, so the concurrent section calls are
+included. Their stages overlap, which is why stage totals can add up to more
+than the wall time.
+"""
+
+import contextvars
+import cProfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, ContextManager, Iterator
+
+from levelup import tracing
+
+STAGES = (
+    "pdf_extraction",
+    "prompt_build",
+    "llm_queue",
+    "llm_generate",
+    "llm_first_token",
+    "json_extraction",
+    "rendering",
+)
+
+
+class Profile:
+    """Stage timings collected inside :func:`use_profile` blocks."""
+
+    def __init__(self) -> None:
+        self.wall = 0.0  # seconds spent inside use_profile blocks
+        self._lock = threading.Lock()
+        self._stages: dict[str, list[float]] = {}  # name -> [calls, seconds]
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def rows(self) -> list[dict[str, Any]]:
+        """The timed stages in pipeline order, as calls/seconds/share rows."""
+        names = [s for s in STAGES if s in self._stages]
+        names += sorted(s for s in self._stages if s not in STAGES)
+        return [
+            {
+                "stage": name,
+                "calls": int(self._stages[name][0]),
+                "seconds": round(self._stages[name][1], 4),
+                "share": round(self._stages[name][1] / self.wall, 3)
+                if self.wall
+                else 0.0,
+            }
+            for name in names
+        ]
+
+    def summary(self) -> str:
+        lines = [f"{'Stage':<16} {'Calls':>5} {'Seconds':>9} {'Share':>7}"]
+        for row in self.rows():
+            lines.append(
+                f"{row['stage']:<16} {row['calls']:>5} {row['seconds']:>9.3f} "
+                f"{row['share']:>7.1%}"
+            )
+        lines.append(f"{'wall time':<16} {'':>5} {self.wall:>9.3f}")
+        return "\n".join(lines)
+
+
+class _Timer:
+    __slots__ = ("profile", "name", "span", "started")
+
+    def __init__(self, profile: Profile, name: str, span: ContextManager[Any]):
+        self.profile = profile
+        self.name = name
+        self.span = span
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        self.span.__enter__()
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.profile.add(self.name, time.perf_counter() - self.started)
+        self.span.__exit__(*exc)
+
+
+_profile: contextvars.ContextVar[Profile | None] = contextvars.ContextVar(
+    "levelup_profile", default=None
+)
+
+
+@contextmanager
+def use_profile(profile: Profile | None) -> Iterator[Profile | None]:
+    """Collects the stage timings of this context into ``profile``.
+
+    ``None`` leaves profiling off, so callers can pass an optional profile
+    straight through; a profile can be used by several blocks in turn.
+    """
+    if profile is None:
+        yield None
+        return
+    token = _profile.set(profile)
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.wall += time.perf_counter() - started
+        _profile.reset(token)
+
+
+def current_profile() -> Profile | None:
+    return _profile.get()
+
+
+def stage(name: str) -> ContextManager[Any]:
+    """Times the block as one call of the ``name`` stage, if profiling or tracing."""
+    span = tracing.span(name)
+    profile = _profile.get()
+    if profile is None:
+        return span
+    return _Timer(profile, name, span)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Records a duration measured by the caller, if profiling or tracing."""
+    tracing.record_span(name, seconds)
+    if (profile := _profile.get()) is not None:
+        profile.add(name, seconds)
+
+
+@contextmanager
+def cprofile(path: Path | str | None) -> Iterator[None]:
+    """Runs the block under cProfile and dumps pstats data to ``path`` (if given).
+
+    cProfile only sees the calling thread, so the concurrent section calls
+    show up as waits; use the single-call mode to profile a whole analysis.
+    """
+    if path is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(path))
@@ -1,7 +1,43 @@
-def get_resume_analysis_prompt(
-    text: str, report_language: str, target_role: str | None = None
-) -> str:
-    """Builds the full LLM prompt for resume analysis, with optional strong target-role conditioning."""
+from typing import Sequence
+
+from levelup.profiling import stage
+
+ANALYSIS_KEYS: tuple[str, ...] = (
+    "language",
+    "domain_scores",
+    "competency_scores",
+    "strategic_insights",
+    "development_recommendations",
+    "missing_skills",
+    "mismatched_experience",
+    "comparative_benchmarking",
+    "overall_summary",
+)
+
+# Report languages offered by the CLI and the API.
+LANGUAGES = [
+    "Czech",
+    "Danish",
+    "Dutch",
+    "English",
+    "Finnish",
+    "French",
+    "German",
+    "Greek",
+    "Italian",
+    "Kurdish (Kurmanji)",
+    "Polish",
+    "Portuguese",
+    "Russian",
+    "Spanish",
+    "Swedish",
+    "Turkish",
+    "Ukrainian",
+]
+
+
+def _role_conditioning(target_role: str | None) -> tuple[str, dict[str, str]]:
+    """Builds the target-role block and the per-section notes for the prompt."""
 
     notes = {
         "domain": "",
@@ -74,14 +110,11 @@ def get_resume_analysis_prompt(
 - Avoid overly narrow, niche strengths that are locked into a single, highly specific role unless that role is clearly dominant in the CV.
 """
 
-    primary_role_for_json = (
-        target_role if target_role is not None else "Primary Likely Role"
-    )
+    return target_role_block, notes
 
-    return f"""
-You are a globally experienced HR and career evaluation expert with deep cross-industry insight. You will perform an extremely detailed, holistic analysis of the CV provided below. Go beyond numeric scoring — offer professional interpretation, inferences, and personalized guidance based on the profile.
 
-GENERAL INSTRUCTIONS:
+def _general_instructions(report_language: str) -> str:
+    return f"""GENERAL INSTRUCTIONS:
 - Detect and report the actual language of the CV content.
 - Regardless of the detected language, generate the entire report in the selected report language below.
 - Respond in {report_language}.
@@ -97,97 +130,120 @@ GENERAL INSTRUCTIONS:
 - Use atomic, role-specific skill names. Avoid umbrella terms and avoid “e.g.” or “etc.” inside the skill field.
 - Report each skill as a single concrete item: a tool, platform, framework, standard, certification, or method (pick one per item).
 - Pick one specific platform/standard per item instead of categories.
-- Exclude anything already present in the CV. Deduplicate closely related items.
-
-{target_role_block}
+- Exclude anything already present in the CV. Deduplicate closely related items."""
 
-* 1. LANGUAGE DETECTION
-Identify the dominant language of the CV.
 
-* 2. CAREER DOMAIN MATCHING
+def _section_blocks(notes: dict[str, str]) -> list[tuple[tuple[str, ...], str]]:
+    """Returns the numbered evaluation sections with the result keys they produce."""
+    return [
+        (
+            ("language",),
+            """LANGUAGE DETECTION
+Identify the dominant language of the CV.""",
+        ),
+        (
+            ("domain_scores",),
+            f"""CAREER DOMAIN MATCHING
 Identify the top 3 most suitable career domains for this candidate.
 For each domain:
 - Give a score out of 100.
 - Justify why the candidate fits that domain (based on experience, skills, education, and impact).
 - Optionally mention related roles the candidate could consider.
-{notes["domain"]}
-
-* 3. COMPETENCY EVALUATION
+{notes["domain"]}""",
+        ),
+        (
+            ("competency_scores",),
+            f"""COMPETENCY EVALUATION
 Evaluate the candidate across 10 dimensions (for example: Core Technical Skills, Tools & Technologies, Problem Solving, Business Impact, Communication, Leadership, Collaboration, Learning Agility, Domain Knowledge, Delivery & Reliability). For each dimension:
 - Assign a score out of 100.
 - Describe concrete strengths and examples from the CV.
 - Note any observations or red flags (e.g., lack of scale, missing ownership, shallow impact).
-{notes["competency"]}
-
-* 4. STRATEGIC INSIGHTS & INTERPRETATION
+{notes["competency"]}""",
+        ),
+        (
+            ("strategic_insights",),
+            f"""STRATEGIC INSIGHTS & INTERPRETATION
 Based on the full CV:
 - Which types of roles is this candidate most suited for now?
 - Which future roles could be realistic with incremental improvements?
 - Are there signs of underutilized potential (e.g., skills that are not fully leveraged)?
 - Does the profile suggest a specialist or generalist tendency?
 - Are there any inconsistencies, gaps, or missing data that should be clarified or improved?
-{notes["insights"]}
-
-* 5. DEVELOPMENT RECOMMENDATIONS
+{notes["insights"]}""",
+        ),
+        (
+            ("development_recommendations",),
+            f"""DEVELOPMENT RECOMMENDATIONS
 Provide clear, practical, and personalized suggestions on how the candidate can strengthen their profile:
 - Skills, tools, and methods to learn or deepen.
 - Certifications or degrees that would be valuable.
 - Portfolio, project, or publication ideas.
 - Improvements in communication, stakeholder management, and professional networking.
-{notes["recommendations"]}
-
-* 6. MISSING SKILLS & EXPERIENCE MISMATCH
+{notes["recommendations"]}""",
+        ),
+        (
+            ("missing_skills", "mismatched_experience"),
+            f"""MISSING SKILLS & EXPERIENCE MISMATCH
 Explicitly identify:
 - Up to 5 missing or weakly represented skills that are relevant to the candidate’s likely or explicit target roles.
 - Any mismatched experience (e.g., long periods in unrelated domains, activities that do not support their stated or implied career direction) and how this affects perceived fit.
-{notes["missing_skills"]}
-
-* 7. COMPARATIVE BENCHMARKING
+{notes["missing_skills"]}""",
+        ),
+        (
+            ("comparative_benchmarking",),
+            f"""COMPARATIVE BENCHMARKING
 Compare the candidate’s profile against general industry and global professional standards at a similar career level. Consider:
 - Depth and breadth of skills.
 - Scope and impact of experience.
 - Ownership, autonomy, and complexity of work.
 Indicate whether the candidate appears above, at, or below typical benchmarks.
-{notes["benchmarking"]}
-
-* 8. KEY STRENGTHS INSIGHTS (key_strengths)
+{notes["benchmarking"]}""",
+        ),
+        (
+            ("overall_summary",),
+            f"""KEY STRENGTHS INSIGHTS (key_strengths)
 Provide 3–5 high-level strategic insights about the candidate’s profile, career trajectory, and market positioning.
 - Focus on strengths that are most relevant to the candidate’s current and near-future roles.
-{notes["strengths"]}
-
-* 9. OVERALL SUMMARY
+{notes["strengths"]}""",
+        ),
+        (
+            ("overall_summary",),
+            f"""OVERALL SUMMARY
 Provide a concise synthesis of the entire evaluation. Include:
 - A single overall score (0–100) summarizing the profile.
 - Key strengths.
 - Priority areas for improvement.
 - An overall view of talent potential (High / Moderate / Needs Development).
 - A short assessment of the candidate’s role suitability across 2–3 key roles.
-{notes["summary"]}
+{notes["summary"]}""",
+        ),
+    ]
 
-Absolutely follow the JSON format shown below. Do not add any text, comments, or explanations outside the JSON structure.
 
-{{
-  "language": "The actual dominant language of the CV (not the report language)",
-  "domain_scores": [
-    {{"domain": "Domain Name", "score": 88, "justification": "Why this domain fits"}}
-  ],
-  "competency_scores": [
-    {{"category": "Core Skills & Tools", "score": 85, "strength": "X", "observation": "Y"}}
-  ],
-  "strategic_insights": "Full paragraph insight",
-  "development_recommendations": [
+def _json_fields(primary_role_for_json: str) -> dict[str, str]:
+    """Returns the JSON skeleton line(s) shown to the model for each result key."""
+    return {
+        "language": '  "language": "The actual dominant language of the CV (not the report language)"',
+        "domain_scores": """  "domain_scores": [
+    {"domain": "Domain Name", "score": 88, "justification": "Why this domain fits"}
+  ]""",
+        "competency_scores": """  "competency_scores": [
+    {"category": "Core Skills & Tools", "score": 85, "strength": "X", "observation": "Y"}
+  ]""",
+        "strategic_insights": '  "strategic_insights": "Full paragraph insight"',
+        "development_recommendations": """  "development_recommendations": [
     "Recommendation 1",
     "Recommendation 2"
-  ],
-  "missing_skills": [
-    {{"skill": "ExampleSkill1", "priority": "Critical"}},
-    {{"skill": "ExampleSkill2", "priority": "Important"}}
-  ],
-  "mismatched_experience": [
+  ]""",
+        "missing_skills": """  "missing_skills": [
+    {"skill": "ExampleSkill1", "priority": "Critical"},
+    {"skill": "ExampleSkill2", "priority": "Important"}
+  ]""",
+        "mismatched_experience": """  "mismatched_experience": [
     "Example of experience that does not fully align with the candidate’s direction"
-  ],
-  "comparative_benchmarking": "Paragraph comparing this candidate against general industry standards. If not applicable, leave empty.",
-  "overall_summary": {{
+  ]""",
+        "comparative_benchmarking": '  "comparative_benchmarking": "Paragraph comparing this candidate against general industry standards. If not applicable, leave empty."',
+        "overall_summary": f"""  "overall_summary": {{
     "overall_score": 87,
     "key_strengths": ["Strength 1", "Strength 2"],
     "areas_to_improve": ["Weakness 1", "Weakness 2"],
@@ -196,9 +252,100 @@ Absolutely follow the JSON format shown below. Do not add any text, comments, or
       {{"role": "{primary_role_for_json}", "score": 82}},
       {{"role": "Secondary Likely or Related Role", "score": 78}}
     ]
-  }}
-}}
+  }}""",
+    }
+
+
+def _build_prompt(
+    text: str,
+    report_language: str,
+    target_role: str | None,
+    keys: tuple[str, ...],
+    scope_note: str = "",
+    present_skills: Sequence[str] = (),
+) -> str:
+    target_role_block, notes = _role_conditioning(target_role)
+    if present_skills:
+        notes["missing_skills"] += (
+            "- Skills already detected in the CV (never list these as missing): "
+            + ", ".join(present_skills)
+            + ".\n"
+        )
+    primary_role_for_json = (
+        target_role if target_role is not None else "Primary Likely Role"
+    )
+
+    wanted = set(keys)
+    sections = [
+        body
+        for section_keys, body in _section_blocks(notes)
+        if wanted & set(section_keys)
+    ]
+    numbered = "\n\n".join(f"* {i}. {body}" for i, body in enumerate(sections, start=1))
+    fields = _json_fields(primary_role_for_json)
+    json_skeleton = "{\n" + ",\n".join(fields[k] for k in keys) + "\n}"
+
+    return f"""
+You are a globally experienced HR and career evaluation expert with deep cross-industry insight. You will perform an extremely detailed, holistic analysis of the CV provided below. Go beyond numeric scoring — offer professional interpretation, inferences, and personalized guidance based on the profile.
+{scope_note}
+{_general_instructions(report_language)}
+
+{target_role_block}
+
+{numbered}
+
+Absolutely follow the JSON format shown below. Do not add any text, comments, or explanations outside the JSON structure.
+
+{json_skeleton}
 
 CV Content:
 {text}
 """
+
+
+def get_resume_analysis_prompt(
+    text: str,
+    report_language: str,
+    target_role: str | None = None,
+    present_skills: Sequence[str] = (),
+) -> str:
+    """Builds the full LLM prompt for resume analysis, with optional strong target-role conditioning.
+
+    ``present_skills`` are skills already found in the CV by the local
+    taxonomy scan; they are listed so the model does not report them as missing.
+    """
+    with stage("prompt_build"):
+        return _build_prompt(
+            text,
+            report_language,
+            target_role,
+            ANALYSIS_KEYS,
+            present_skills=present_skills,
+        )
+
+
+def get_section_analysis_prompt(
+    text: str,
+    report_language: str,
+    keys: tuple[str, ...],
+    target_role: str | None = None,
+    present_skills: Sequence[str] = (),
+) -> str:
+    """Builds a prompt that asks only for the given top-level result keys.
+
+    Used by the concurrent analysis mode: each group of sections is requested
+    in its own call and the answers are merged afterwards.
+    """
+    unknown = set(keys) - set(ANALYSIS_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown analysis section(s): {', '.join(sorted(unknown))}")
+    ordered = tuple(k for k in ANALYSIS_KEYS if k in keys)
+    scope_note = (
+        "In this request, produce ONLY the following part(s) of the evaluation: "
+        + ", ".join(f'"{k}"' for k in ordered)
+        + ". The remaining parts are produced separately.\n"
+    )
+    with stage("prompt_build"):
+        return _build_prompt(
+            text, report_language, target_role, ordered, scope_note, present_skills
+        )
@@ -0,0 +1,294 @@
+"""Cost-weighted API quotas per client.
+
+Every client has a token bucket of ``QUOTA_BUDGET`` cost units that refills
+continuously over ``QUOTA_WINDOW_SECONDS``. Requests consume units according
+to what they cost to serve: an analysis is charged its estimated prompt
+tokens, a cheap lookup ``QUOTA_REQUEST_COST``. A request whose cost exceeds
+the remaining budget is rejected with 429 and nothing is consumed.
+
+Clients are identified by a known API key (``X-API-Key``, listed in
+``QUOTA_API_KEYS``) and otherwise by their address: the peer address, or the
+``X-Forwarded-For`` address set by one of ``QUOTA_TRUSTED_PROXIES``. Buckets
+live in a SQLite file, so all worker processes on a host share them; each
+charge is a single ``BEGIN IMMEDIATE`` transaction. Requests whose work fails
+(an analysis the model could not produce) are refunded.
+"""
+
+import hashlib
+import ipaddress
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from levelup import config, metrics
+
+log = logging.getLogger(__name__)
+
+API_KEY_HEADER = "X-API-Key"
+
+CHARGED = metrics.counter(
+    "levelup_quota_charged_units_total",
+    "Quota cost units consumed by accepted requests.",
+)
+REFUNDED = metrics.counter(
+    "levelup_quota_refunded_units_total",
+    "Quota cost units returned to clients whose request failed.",
+)
+REJECTED = metrics.counter(
+    "levelup_quota_rejected_total", "Requests rejected for exceeding their quota."
+)
+
+
+class QuotaState(NamedTuple):
+    allowed: bool
+    limit: float
+    remaining: float
+    reset_seconds: float  # until the bucket is full again
+    retry_after: float  # until the rejected cost would fit (0 when allowed)
+    charged: float = 0.0  # units taken from the bucket
+
+
+class QuotaStore:
+    """SQLite-backed token buckets shared by every process using the same file."""
+
+    def __init__(self, path: str | Path, clock: Callable[[], float] = time.time):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._clock = clock
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS quota_bucket ("
+                "client TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def consume(
+        self, client: str, cost: float, capacity: float, refill_per_second: float
+    ) -> QuotaState:
+        """Takes ``cost`` units from the client's bucket if they are available.
+
+        A negative cost refunds units, up to the bucket's capacity.
+        """
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            now = self._clock()
+            row = connection.execute(
+                "SELECT tokens, updated FROM quota_bucket WHERE client = ?", (client,)
+            ).fetchone()
+            tokens = capacity
+            if row is not None:
+                elapsed = max(now - row[1], 0.0)
+                tokens = min(capacity, row[0] + elapsed * refill_per_second)
+            allowed = cost <= tokens
+            if allowed:
+                tokens = min(capacity, tokens - cost)
+            connection.execute(
+                "INSERT INTO quota_bucket (client, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(client) DO UPDATE SET tokens = excluded.tokens, "
+                "updated = excluded.updated",
+                (client, tokens, now),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        def seconds(units: float) -> float:
+            return units / refill_per_second if refill_per_second > 0 else math.inf
+
+        return QuotaState(
+            allowed=allowed,
+            limit=capacity,
+            remaining=tokens,
+            reset_seconds=seconds(capacity - tokens),
+            retry_after=0.0 if allowed else seconds(cost - tokens),
+            charged=cost if allowed else 0.0,
+        )
+
+
+def parse_networks(
+    entries: list[str],
+) -> list[ipaddress.IPv4Network | ipaddress.IPv6Network]:
+    """Parses addresses or CIDR networks, e.g. ``10.0.0.1`` or ``10.0.0.0/8``."""
+    return [
+        ipaddress.ip_network(entry.strip(), strict=False)
+        for entry in entries
+        if entry.strip()
+    ]
+
+
+def parse_api_keys(entries: list[str]) -> dict[str, float | None]:
+    """Parses ``key`` or ``key=budget`` entries into a key -> budget override map."""
+    keys: dict[str, float | None] = {}
+    for entry in entries:
+        key, sep, budget = entry.strip().partition("=")
+        if key:
+            keys[key] = float(budget) if sep else None
+    return keys
+
+
+class Quota:
+    """Applies per-client budgets to a :class:`QuotaStore`."""
+
+    def __init__(
+        self,
+        store: QuotaStore,
+        budget: float,
+        window_seconds: float,
+        api_keys: dict[str, float | None] | None = None,
+        trusted_proxies: list[ipaddress.IPv4Network | ipaddress.IPv6Network]
+        | None = None,
+    ):
+        self.store = store
+        self.budget = budget
+        self.window_seconds = window_seconds
+        self.api_keys = api_keys or {}
+        self.trusted_proxies = trusted_proxies or []
+
+    def _trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address.strip())
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def address(self, request: Request) -> str:
+        """Returns the client's address.
+
+        ``X-Forwarded-For`` is only believed when the peer is a trusted proxy:
+        the client is the last address in it that is not a trusted proxy too,
+        since everything left of that could have been sent by the client.
+        """
+        host = request.client.host if request.client else "unknown"
+        forwarded = request.headers.get("x-forwarded-for")
+        if not forwarded or not self._trusted(host):
+            return host
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not self._trusted(hop):
+                return hop
+        return hops[0] if hops else host
+
+    def client(self, request: Request) -> tuple[str, float]:
+        """Returns the bucket name and budget of the client making ``request``.
+
+        Unknown API keys are ignored, so inventing keys does not buy budget.
+        """
+        key = request.headers.get(API_KEY_HEADER)
+        if key and key in self.api_keys:
+            digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+            return f"key:{digest}", self.api_keys[key] or self.budget
+        return f"addr:{self.address(request)}", self.budget
+
+    def charge(self, request: Request, cost: float) -> QuotaState:
+        """Charges ``cost`` units to the requesting client.
+
+        Costs above the client's whole budget are capped at the budget, so an
+        expensive request is still possible with a full bucket.
+        """
+        client, budget = self.client(request)
+        cost = min(max(cost, 0.0), budget)
+        state = self.store.consume(client, cost, budget, budget / self.window_seconds)
+        if state.allowed:
+            CHARGED.inc(cost)
+        else:
+            REJECTED.inc()
+            log.info(f"Quota exceeded for {client}: cost {cost:.0f}, {state}")
+        return state
+
+    def refund(self, request: Request, state: QuotaState) -> None:
+        """Returns the units charged by ``state`` to the requesting client."""
+        if state.charged <= 0:
+            return
+        client, budget = self.client(request)
+        self.store.consume(client, -state.charged, budget, budget / self.window_seconds)
+        REFUNDED.inc(state.charged)
+        log.info(f"Refunded {state.charged:.0f} units to {client}")
+
+
+def quota_headers(state: QuotaState) -> dict[str, str]:
+    """Response headers describing the remaining budget."""
+    headers = {
+        "X-RateLimit-Limit": str(int(state.limit)),
+        "X-RateLimit-Remaining": str(int(state.remaining)),
+        "X-RateLimit-Reset": str(math.ceil(min(state.reset_seconds, 1e9))),
+    }
+    if not state.allowed:
+        headers["Retry-After"] = str(math.ceil(min(state.retry_after, 1e9)))
+    return headers
+
+
+_quota: Quota | None = None
+_quota_lock = threading.Lock()
+
+
+def get_quota() -> Quota | None:
+    """Returns the configured quota, or None when ``QUOTA_ENABLED`` is off."""
+    global _quota
+    if not config.QUOTA_ENABLED:
+        return None
+    with _quota_lock:
+        if _quota is None:
+            path = config.QUOTA_STORE_PATH or (
+                Path(config.ANALYSIS_STORE_PATH) / "quota.sqlite3"
+            )
+            _quota = Quota(
+                QuotaStore(path),
+                budget=config.QUOTA_BUDGET,
+                window_seconds=config.QUOTA_WINDOW_SECONDS,
+                api_keys=parse_api_keys(list(config.QUOTA_API_KEYS)),
+                trusted_proxies=parse_networks(list(config.QUOTA_TRUSTED_PROXIES)),
+            )
+        return _quota
+
+
+def charge(
+    request: Request, response: Response, cost: float, quota: Quota | None
+) -> QuotaState | None:
+    """Charges the request and sets the budget headers; raises 429 when over quota."""
+    if quota is None:
+        return None
+    state = quota.charge(request, cost)
+    headers = quota_headers(state)
+    if not state.allowed:
+        raise HTTPException(
+            status_code=429, detail="Quota exceeded, retry later.", headers=headers
+        )
+    response.headers.update(headers)
+    return state
+
+
+def refund(request: Request, state: QuotaState | None, quota: Quota | None) -> None:
+    """Refunds a charge made by :func:`charge`, e.g. when the work failed."""
+    if quota is not None and state is not None:
+        quota.refund(request, state)
+
+
+def request_cost(cost: float | None = None) -> Callable[..., QuotaState | None]:
+    """Dependency charging a fixed cost (default ``QUOTA_REQUEST_COST``) per request."""
+
+    def dependency(
+        request: Request,
+        response: Response,
+        quota: Quota | None = Depends(get_quota),
+    ) -> QuotaState | None:
+        units = config.QUOTA_REQUEST_COST if cost is None else cost
+        return charge(request, response, units, quota)
+
+    return dependency
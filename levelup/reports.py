@@ -0,0 +1,250 @@
+"""Standalone HTML and PDF reports for analysis results.
+
+A report has the same sections as the result tabs of the web interface. The
+Jinja template is compiled once per process; batch rendering fans the input
+files out over a process pool where every worker reads, renders and writes
+its own files, so only paths cross process boundaries.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+import jinja2
+
+from levelup.cohort import as_record
+
+log = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+REPORT_FORMATS = ("html", "pdf")
+_SAFE_NAME_RE = re.compile(r"[0-9a-zA-Z_-]{1,100}")
+
+
+class BatchResult(NamedTuple):
+    """Reports written by a batch run and the inputs that failed, with the reason."""
+
+    written: list[Path]
+    failed: dict[Path, str]
+
+
+@functools.lru_cache(maxsize=1)
+def _template() -> jinja2.Template:
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATE_DIR),
+        autoescape=True,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    return env.get_template("report.html")
+
+
+def _list(value: Any) -> list[Any]:
+    return value if isinstance(value, list) else []
+
+
+def _dicts(value: Any) -> list[dict[str, Any]]:
+    return [item for item in _list(value) if isinstance(item, dict)]
+
+
+def _by_score(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    def _score(item: dict[str, Any]) -> float:
+        try:
+            return float(item.get("score", 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    return sorted(items, key=_score, reverse=True)
+
+
+def report_context(
+    result: dict[str, Any], record: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Prepares the template variables for one analysis result."""
+    record = record or {}
+    summary = result.get("overall_summary")
+    summary = dict(summary) if isinstance(summary, dict) else {}
+    for key in ("key_strengths", "areas_to_improve"):
+        summary[key] = _list(summary.get(key))
+    summary["role_suitability"] = _dicts(summary.get("role_suitability"))
+
+    role = record.get("role")
+    title = f"CV Analysis — {role}" if role else "CV Analysis"
+    meta = [
+        str(value)
+        for value in (
+            record.get("id"),
+            record.get("language"),
+            str(record.get("created_at") or "")[:10],
+        )
+        if value
+    ]
+    benchmarking = result.get("comparative_benchmarking")
+    missing = [
+        {"skill": m.get("skill", ""), "priority": str(m.get("priority", "")).strip()}
+        for m in _dicts(result.get("missing_skills"))
+    ]
+    return {
+        "title": title,
+        "meta": meta,
+        "result": result,
+        "summary": summary,
+        "missing_skills": missing,
+        "mismatched_experience": _list(result.get("mismatched_experience")),
+        "competencies": _by_score(_dicts(result.get("competency_scores"))),
+        "domains": _by_score(_dicts(result.get("domain_scores"))),
+        "benchmarking": benchmarking.strip() if isinstance(benchmarking, str) else "",
+        "recommendations": _list(result.get("development_recommendations")),
+    }
+
+
+def render_html(result: dict[str, Any], record: dict[str, Any] | None = None) -> str:
+    """Renders an analysis result as a standalone HTML document.
+
+    ``record`` is the store record the result belongs to, if any; its id,
+    target role, language and date are shown in the report header.
+    """
+    return _template().render(report_context(result, record))
+
+
+def ensure_pdf_support() -> None:
+    """Raises RuntimeError if the optional PDF renderer is not installed."""
+    try:
+        import weasyprint  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError(
+            "PDF reports need the optional 'weasyprint' package "
+            "(pip install 'LevelUP[pdf]')."
+        ) from e
+
+
+def html_to_pdf(html: str) -> bytes:
+    """Converts a rendered report to PDF with WeasyPrint."""
+    ensure_pdf_support()
+    import weasyprint
+
+    pdf: bytes = weasyprint.HTML(string=html).write_pdf()
+    return pdf
+
+
+def report_name(analysis_id: Any) -> str:
+    """Returns a safe file name stem for a report, from an untrusted analysis id.
+
+    Ids that are not plain names (path separators, dots, other characters)
+    are replaced by a hash of the id.
+    """
+    name = str(analysis_id)
+    if _SAFE_NAME_RE.fullmatch(name):
+        return name
+    return "report-" + hashlib.sha256(name.encode("utf-8")).hexdigest()[:16]
+
+
+def _claim(claims: Path, name: str, source: Path) -> str:
+    """Reserves ``name`` for ``source`` in this batch, across worker processes.
+
+    A second input with the same id gets a name suffixed with a hash of its
+    path, so reports are not silently overwritten.
+    """
+    try:
+        (claims / name).touch(exist_ok=False)
+        return name
+    except FileExistsError:
+        digest = hashlib.sha256(str(source).encode("utf-8")).hexdigest()[:8]
+        return _claim(claims, f"{name}-{digest}", source)
+
+
+def render_file(
+    source: Path, out_dir: Path, fmt: str = "html", claims: Path | None = None
+) -> Path:
+    """Renders one analysis JSON file (a store record or bare result) to ``out_dir``.
+
+    ``claims`` is the directory in which a batch reserves its report names.
+    """
+    data = json.loads(Path(source).read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError("not a JSON object")
+    record = as_record(data, Path(source).stem)
+    html = render_html(record["result"], record)
+
+    name = report_name(record["id"])
+    if claims is not None:
+        name = _claim(claims, name, Path(source))
+    path = Path(out_dir) / f"{name}.{fmt}"
+    if fmt == "pdf":
+        path.write_bytes(html_to_pdf(html))
+    else:
+        path.write_text(html, encoding="utf-8")
+    return path
+
+
+def _render_chunk(
+    sources: list[Path], out_dir: Path, fmt: str, claims: Path
+) -> list[tuple[Path, Path | None, str | None]]:
+    outcomes: list[tuple[Path, Path | None, str | None]] = []
+    for source in sources:
+        try:
+            path = render_file(source, out_dir, fmt, claims)
+            outcomes.append((source, path, None))
+        except Exception as e:
+            outcomes.append((source, None, f"{type(e).__name__}: {e}"))
+    return outcomes
+
+
+def _render_all(
+    paths: list[Path], out_dir: Path, fmt: str, workers: int, claims: Path
+) -> list[tuple[Path, Path | None, str | None]]:
+    if workers == 1:
+        return _render_chunk(paths, out_dir, fmt, claims)
+    # A few chunks per worker keeps the pool busy without per-file IPC.
+    size = max(1, -(-len(paths) // (workers * 4)))
+    chunks = [paths[i : i + size] for i in range(0, len(paths), size)]
+    # forkserver: forking a multi-threaded parent (web servers) can deadlock.
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("forkserver"),
+        initializer=_template,
+    ) as pool:
+        futures = [pool.submit(_render_chunk, c, out_dir, fmt, claims) for c in chunks]
+        return [outcome for f in futures for outcome in f.result()]
+
+
+def render_batch(
+    sources: Iterable[Path | str],
+    out_dir: Path | str,
+    fmt: str = "html",
+    workers: int | None = None,
+) -> BatchResult:
+    """Renders many analysis files in parallel across processes.
+
+    A failing input is reported in ``BatchResult.failed`` instead of aborting
+    the batch. Reports are named after the analysis id (see
+    :func:`report_name`); inputs sharing an id get distinct names.
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format {fmt!r}")
+    if fmt == "pdf":
+        ensure_pdf_support()
+    paths = [Path(s) for s in sources]
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+
+    with tempfile.TemporaryDirectory(prefix=".claims-", dir=out_dir) as claims:
+        outcomes = _render_all(paths, out_dir, fmt, workers, Path(claims))
+
+    result = BatchResult(written=[], failed={})
+    for source, path, error in outcomes:
+        if path is not None:
+            result.written.append(path)
+        else:
+            log.warning("Could not render %s: %s", source, error)
+            result.failed[source] = error or "unknown error"
+    return result
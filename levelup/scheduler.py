@@ -0,0 +1,247 @@
+"""Scheduling of LLM calls in priority lanes with fair sharing between tenants.
+
+Every model call waits for one of ``LLM_MAX_CONCURRENCY`` slots. Waiting calls
+are queued in a lane: ``interactive`` (the web interface and synchronous API
+requests, the default) or ``bulk`` (background jobs). When a slot frees up:
+
+* the interactive lane goes first, and bulk calls never hold more than
+  ``LLM_MAX_CONCURRENCY - LLM_INTERACTIVE_RESERVED`` slots, so a user does
+  not wait behind a large import;
+* a lane gains one priority level per ``LLM_SCHEDULER_AGING_SECONDS`` its
+  oldest call has waited, so bulk work is delayed but never starved;
+* within a lane, tenants (organization slugs) share the slots in proportion
+  to their weight (``LLM_TENANT_WEIGHTS``), by the prompt tokens they were
+  granted (weighted fair queuing); each tenant's calls run in order.
+
+The lane and tenant of the calls made in a block are set with
+:func:`use_lane`, which (like ``tokens.track_usage``) follows the context
+into threads started with ``contextvars.copy_context().run``.
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Iterator
+
+from levelup import config, metrics
+from levelup.profiling import record_stage
+
+INTERACTIVE, BULK = "interactive", "bulk"
+LANES = (INTERACTIVE, BULK)
+# Base priority of each lane; aging adds one level per aging period waited.
+LANE_PRIORITY = {INTERACTIVE: 1.0, BULK: 0.0}
+DEFAULT_TENANT = "default"
+
+WAIT_SECONDS = metrics.histogram(
+    "levelup_llm_queue_wait_seconds",
+    "Time model calls waited for a slot, by lane.",
+    ("lane",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+WAITING = metrics.gauge(
+    "levelup_llm_queue_waiting", "Model calls waiting for a slot, by lane.", ("lane",)
+)
+RUNNING = metrics.gauge(
+    "levelup_llm_queue_running", "Model calls holding a slot, by lane.", ("lane",)
+)
+
+
+class _Waiter:
+    __slots__ = ("lane", "tenant", "cost", "enqueued", "granted")
+
+    def __init__(self, lane: str, tenant: str, cost: float, enqueued: float):
+        self.lane = lane
+        self.tenant = tenant
+        self.cost = cost
+        self.enqueued = enqueued
+        self.granted = threading.Event()
+
+
+class LLMScheduler:
+    """Grants a fixed number of concurrent slots to lanes and tenants."""
+
+    def __init__(
+        self,
+        slots: int,
+        reserved: int = 0,
+        aging_seconds: float = 30.0,
+        tenant_weights: dict[str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.slots = max(1, slots)
+        self.reserved = min(max(reserved, 0), self.slots - 1)
+        self.aging_seconds = aging_seconds
+        self.tenant_weights = tenant_weights or {}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._running = {lane: 0 for lane in LANES}
+        self._queues: dict[str, dict[str, deque[_Waiter]]] = {
+            lane: {} for lane in LANES
+        }
+        # Virtual time of each (lane, tenant): tokens granted / weight.
+        self._vtime: dict[tuple[str, str], float] = {}
+        self._lane_vtime = {lane: 0.0 for lane in LANES}
+
+    def waiting(self, lane: str) -> int:
+        return sum(len(q) for q in self._queues[lane].values())
+
+    def running(self, lane: str) -> int:
+        return self._running[lane]
+
+    def _can_start(self, lane: str) -> bool:
+        if sum(self._running.values()) >= self.slots:
+            return False
+        return lane == INTERACTIVE or self._running[BULK] < self.slots - self.reserved
+
+    def _next(self) -> _Waiter | None:
+        now = self._clock()
+        best: tuple[float, _Waiter] | None = None
+        for lane in LANES:
+            queues = self._queues[lane]
+            if not queues or not self._can_start(lane):
+                continue
+            tenant = min(
+                queues,
+                key=lambda t: (self._vtime[lane, t], queues[t][0].enqueued),
+            )
+            oldest = min(q[0].enqueued for q in queues.values())
+            score = LANE_PRIORITY[lane]
+            if self.aging_seconds > 0:
+                score += (now - oldest) / self.aging_seconds
+            if best is None or score > best[0]:
+                best = (score, queues[tenant][0])
+        return best[1] if best else None
+
+    def _dispatch(self) -> None:
+        while (waiter := self._next()) is not None:
+            queue = self._queues[waiter.lane][waiter.tenant]
+            queue.popleft()
+            if not queue:
+                del self._queues[waiter.lane][waiter.tenant]
+            key = (waiter.lane, waiter.tenant)
+            self._lane_vtime[waiter.lane] = self._vtime[key]
+            weight = self.tenant_weights.get(waiter.tenant, 1.0)
+            self._vtime[key] += waiter.cost / max(weight, 1e-9)
+            self._running[waiter.lane] += 1
+            waiter.granted.set()
+
+    def acquire(self, lane: str, tenant: str, cost: float = 1.0) -> None:
+        """Blocks until the call is granted a slot; pair with :meth:`release`."""
+        if lane not in LANE_PRIORITY:
+            raise ValueError(f"Unknown lane: {lane}")
+        waiter = _Waiter(lane, tenant, max(cost, 1.0), self._clock())
+        with self._lock:
+            queues = self._queues[lane]
+            if tenant not in queues:
+                # A tenant that was idle does not bank credit for the idle time.
+                key = (lane, tenant)
+                self._vtime[key] = max(
+                    self._vtime.get(key, 0.0), self._lane_vtime[lane]
+                )
+                queues[tenant] = deque()
+            queues[tenant].append(waiter)
+            self._dispatch()
+        try:
+            waiter.granted.wait()
+        except BaseException:
+            with self._lock:
+                if waiter.granted.is_set():
+                    self._running[lane] -= 1
+                else:
+                    queue = self._queues[lane][tenant]
+                    queue.remove(waiter)
+                    if not queue:
+                        del self._queues[lane][tenant]
+                self._dispatch()
+            raise
+        WAIT_SECONDS.observe(self._clock() - waiter.enqueued, lane=lane)
+
+    def release(self, lane: str) -> None:
+        with self._lock:
+            self._running[lane] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(
+        self, lane: str | None = None, tenant: str | None = None, cost: float = 1.0
+    ) -> Iterator[None]:
+        """Holds a slot for the block; lane and tenant default to :func:`current_lane`."""
+        current, current_tenant = current_lane()
+        lane = lane or current
+        self.acquire(lane, tenant or current_tenant, cost)
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+
+_lane: contextvars.ContextVar[tuple[str, str]] = contextvars.ContextVar(
+    "levelup_llm_lane", default=(INTERACTIVE, DEFAULT_TENANT)
+)
+
+
+@contextmanager
+def use_lane(lane: str, tenant: str | None = None) -> Iterator[None]:
+    """Schedules the model calls made in this context in ``lane`` for ``tenant``."""
+    if lane not in LANE_PRIORITY:
+        raise ValueError(f"Unknown lane: {lane}")
+    token = _lane.set((lane, tenant or DEFAULT_TENANT))
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane() -> tuple[str, str]:
+    """The (lane, tenant) of the model calls made in this context."""
+    return _lane.get()
+
+
+def parse_weights(entries: list[str]) -> dict[str, float]:
+    """Parses ``slug=weight`` entries into a tenant -> weight map."""
+    weights: dict[str, float] = {}
+    for entry in entries:
+        tenant, sep, weight = entry.strip().partition("=")
+        if tenant and sep:
+            weights[tenant] = float(weight)
+    return weights
+
+
+_scheduler: LLMScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler | None:
+    """Returns the process-wide scheduler, or None when ``LLM_MAX_CONCURRENCY`` is 0."""
+    global _scheduler
+    if config.LLM_MAX_CONCURRENCY <= 0:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            scheduler = LLMScheduler(
+                config.LLM_MAX_CONCURRENCY,
+                reserved=config.LLM_INTERACTIVE_RESERVED,
+                aging_seconds=config.LLM_SCHEDULER_AGING_SECONDS,
+                tenant_weights=parse_weights(list(config.LLM_TENANT_WEIGHTS)),
+            )
+            for lane in LANES:
+                WAITING.set_function(partial(scheduler.waiting, lane), lane=lane)
+                RUNNING.set_function(partial(scheduler.running, lane), lane=lane)
+            _scheduler = scheduler
+    return _scheduler
+
+
+@contextmanager
+def llm_slot(cost: float = 1.0) -> Iterator[None]:
+    """Holds a scheduler slot for one model call (nothing if scheduling is off)."""
+    scheduler = get_scheduler()
+    if scheduler is None:
+        yield
+        return
+    started = time.perf_counter()
+    with scheduler.slot(cost=cost):
+        record_stage("llm_queue", time.perf_counter() - started)
+        yield
@@ -0,0 +1,225 @@
+"""Inverted-index full-text search over extracted resume text.
+
+Postings are kept per term in compact ``array`` buffers (4-byte document
+numbers and 2-byte term frequencies) and are appended to as resumes are
+added, so the index is built incrementally. Queries only touch the postings of
+their own terms and are ranked with BM25. An index is saved as a single
+``.npz`` file in CSR layout; the analysis store keeps a compacted base and
+small segments merged into it (see ``levelup.segments``).
+"""
+
+import io
+import math
+import os
+import re
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w(?:[\w+#]|[.\-/](?=\w))*")
+_MAX_TF = 2**16 - 1
+
+
+def tokenize(text: str) -> list[str]:
+    """Splits text into lowercase terms, keeping names like ``pci-dss`` or ``c++`` intact."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    """BM25-ranked inverted index with incremental add and delete.
+
+    Deleted documents are tombstoned and their postings are dropped the next
+    time the index is compacted (automatically on save once enough of them
+    have accumulated).
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._doc_ids: dict[str, array] = {}
+        self._tfs: dict[str, array] = {}
+        self._keys: list[str] = []
+        self._lengths = array("I")
+        self._alive = bytearray()
+        self._positions: dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._positions
+
+    def add(self, key: str, text: str) -> None:
+        """Indexes ``text`` under ``key``, replacing any previous version."""
+        self.delete(key)
+        doc = len(self._keys)
+        terms = Counter(tokenize(text))
+        for term, tf in terms.items():
+            if term not in self._doc_ids:
+                self._doc_ids[term] = array("I")
+                self._tfs[term] = array("H")
+            self._doc_ids[term].append(doc)
+            self._tfs[term].append(min(tf, _MAX_TF))
+        length = sum(terms.values())
+        self._keys.append(key)
+        self._lengths.append(length)
+        self._alive.append(1)
+        self._positions[key] = doc
+        self._total_length += length
+
+    def delete(self, key: str) -> bool:
+        """Removes ``key`` from search results. Returns False if it was not indexed."""
+        doc = self._positions.pop(key, None)
+        if doc is None:
+            return False
+        self._alive[doc] = 0
+        self._total_length -= self._lengths[doc]
+        return True
+
+    def merge(self, other: "SearchIndex", removed: Iterable[str] = ()) -> None:
+        """Deletes the ``removed`` keys, then adds the documents of ``other``."""
+        for key in [*removed, *other._positions]:
+            self.delete(key)
+        alive = np.frombuffer(other._alive, dtype=np.uint8).astype(bool)
+        renumber = len(self._keys) + np.cumsum(alive, dtype=np.int64) - 1
+        for term, doc_ids in other._doc_ids.items():
+            docs = np.frombuffer(doc_ids, dtype=np.uint32)
+            keep = alive[docs]
+            if not keep.any():
+                continue
+            if term not in self._doc_ids:
+                self._doc_ids[term] = array("I")
+                self._tfs[term] = array("H")
+            self._doc_ids[term].frombytes(
+                renumber[docs[keep]].astype(np.uint32).tobytes()
+            )
+            tfs = np.frombuffer(other._tfs[term], dtype=np.uint16)
+            self._tfs[term].frombytes(tfs[keep].tobytes())
+        for doc in np.flatnonzero(alive):
+            key, length = other._keys[doc], other._lengths[doc]
+            self._positions[key] = len(self._keys)
+            self._keys.append(key)
+            self._lengths.append(length)
+            self._alive.append(1)
+            self._total_length += length
+
+    def search(self, query: str, k: int = 10) -> list[tuple[str, float]]:
+        """Returns up to ``k`` ``(key, score)`` pairs for ``query``, best first."""
+        live = len(self._positions)
+        if not live or k <= 0:
+            return []
+        avg_length = self._total_length / live
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+
+        doc_parts: list[np.ndarray] = []
+        score_parts: list[np.ndarray] = []
+        for term in set(tokenize(query)):
+            if term not in self._doc_ids:
+                continue
+            docs = np.frombuffer(self._doc_ids[term], dtype=np.uint32)
+            tfs = np.frombuffer(self._tfs[term], dtype=np.uint16).astype(float)
+            keep = alive[docs]
+            docs, tfs = docs[keep], tfs[keep]
+            if not docs.size:
+                continue
+            idf = math.log(1 + (live - docs.size + 0.5) / (docs.size + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[docs] / avg_length)
+            doc_parts.append(docs)
+            score_parts.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+        if not doc_parts:
+            return []
+
+        docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        k = min(k, docs.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((docs[top], -scores[top]))]
+        return [(self._keys[docs[i]], float(scores[i])) for i in top]
+
+    def compact(self) -> None:
+        """Drops tombstoned documents and renumbers the remaining ones."""
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        renumber = np.cumsum(alive, dtype=np.int64) - 1
+        for term in list(self._doc_ids):
+            docs = np.frombuffer(self._doc_ids[term], dtype=np.uint32)
+            keep = alive[docs]
+            if not keep.any():
+                del self._doc_ids[term], self._tfs[term]
+                continue
+            tfs = np.frombuffer(self._tfs[term], dtype=np.uint16)
+            self._doc_ids[term] = array(
+                "I", renumber[docs[keep]].astype(np.uint32).tobytes()
+            )
+            self._tfs[term] = array("H", tfs[keep].tobytes())
+        self._keys = [key for key, flag in zip(self._keys, self._alive) if flag]
+        self._lengths = array(
+            "I", np.frombuffer(self._lengths, dtype=np.uint32)[alive].tobytes()
+        )
+        self._alive = bytearray(b"\x01" * len(self._keys))
+        self._positions = {key: i for i, key in enumerate(self._keys)}
+
+    def save(self, path: Path | str) -> None:
+        """Atomically writes the index to ``path``, compacting it first if needed."""
+        if len(self._keys) - len(self._positions) > 0.1 * len(self._keys):
+            self.compact()
+        terms = sorted(self._doc_ids)
+        counts = np.fromiter(
+            (len(self._doc_ids[t]) for t in terms), dtype=np.int64, count=len(terms)
+        )
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        empty_docs = np.empty(0, dtype=np.uint32)
+        empty_tfs = np.empty(0, dtype=np.uint16)
+
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            params=np.array([self.k1, self.b]),
+            terms=np.array(terms, dtype=str),
+            offsets=offsets,
+            doc_ids=np.concatenate(
+                [np.frombuffer(self._doc_ids[t], dtype=np.uint32) for t in terms]
+                or [empty_docs]
+            ),
+            tfs=np.concatenate(
+                [np.frombuffer(self._tfs[t], dtype=np.uint16) for t in terms]
+                or [empty_tfs]
+            ),
+            keys=np.array(self._keys, dtype=str),
+            lengths=np.frombuffer(self._lengths, dtype=np.uint32),
+            alive=np.frombuffer(self._alive, dtype=np.uint8),
+        )
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "SearchIndex":
+        """Loads an index written by :meth:`save`."""
+        with np.load(path, allow_pickle=False) as data:
+            k1, b = (float(x) for x in data["params"])
+            index = cls(k1=k1, b=b)
+            offsets = data["offsets"]
+            doc_ids = data["doc_ids"]
+            tfs = data["tfs"]
+            for i, term in enumerate(data["terms"]):
+                start, end = offsets[i], offsets[i + 1]
+                index._doc_ids[str(term)] = array("I", doc_ids[start:end].tobytes())
+                index._tfs[str(term)] = array("H", tfs[start:end].tobytes())
+            index._keys = [str(k) for k in data["keys"]]
+            index._lengths = array("I", data["lengths"].tobytes())
+            index._alive = bytearray(data["alive"].tobytes())
+        index._positions = {
+            key: i for i, key in enumerate(index._keys) if index._alive[i]
+        }
+        index._total_length = sum(
+            length for length, flag in zip(index._lengths, index._alive) if flag
+        )
+        return index
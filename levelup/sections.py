@@ -0,0 +1,290 @@
+"""Concurrent, per-section resume analysis.
+
+The single-call prompt asks the model for every section in one generation, so
+latency is bounded by generating the whole JSON object serially. This module
+splits the analysis into independent groups of sections, requests them in
+parallel and merges the answers into the same result dict the single-call
+mode returns.
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from levelup import config
+from levelup.llm import Generate, extract_json, generate_text
+from levelup.prompts import (
+    ANALYSIS_KEYS,
+    get_resume_analysis_prompt,
+    get_section_analysis_prompt,
+)
+from levelup.skills import normalize_missing_skills, present_skills
+from levelup.tokens import current_usage, fit_to_budget
+
+log = logging.getLogger(__name__)
+
+# Groups of top-level result keys that are requested together in one call.
+SECTION_GROUPS: dict[str, tuple[str, ...]] = {
+    "domains": ("language", "domain_scores"),
+    "competencies": ("competency_scores",),
+    "gaps": ("missing_skills", "mismatched_experience"),
+    "insights": (
+        "strategic_insights",
+        "development_recommendations",
+        "comparative_benchmarking",
+    ),
+    "summary": ("overall_summary",),
+}
+
+MISSING_SKILL_PRIORITIES = ("Critical", "Important", "Nice to have")
+
+
+def _clamp_score(value: Any) -> Any:
+    try:
+        return max(0, min(100, int(round(float(value)))))
+    except (TypeError, ValueError):
+        return value
+
+
+def merge_section_results(
+    parts: dict[str, dict[str, Any]],
+) -> dict[str, Any]:
+    """Merges per-group answers into one result dict in the canonical key order.
+
+    Each group only contributes the keys it owns, so a model that answers with
+    extra sections cannot overwrite another group's output.
+    """
+    merged: dict[str, Any] = {}
+    for group, keys in SECTION_GROUPS.items():
+        part = parts.get(group, {})
+        for key in keys:
+            if key in part:
+                merged[key] = part[key]
+    return {key: merged[key] for key in ANALYSIS_KEYS if key in merged}
+
+
+def enforce_consistency(
+    result: dict[str, Any], target_role: str | None = None
+) -> list[str]:
+    """Repairs cross-section inconsistencies in place and returns what was fixed.
+
+    Sections produced by separate calls cannot see each other, so the rules the
+    single prompt states (for example role_suitability[0].score being equal to
+    overall_score for a target role) are checked and enforced here.
+    """
+    fixes: list[str] = []
+
+    for key in ("domain_scores", "competency_scores"):
+        for item in result.get(key, []) or []:
+            if isinstance(item, dict) and "score" in item:
+                clamped = _clamp_score(item["score"])
+                if clamped != item["score"]:
+                    fixes.append(f"{key}: score {item['score']!r} clamped to {clamped}")
+                    item["score"] = clamped
+
+    for item in result.get("missing_skills", []) or []:
+        if not isinstance(item, dict):
+            continue
+        priority = str(item.get("priority", "")).strip()
+        canonical = next(
+            (p for p in MISSING_SKILL_PRIORITIES if p.lower() == priority.lower()),
+            None,
+        )
+        if canonical and canonical != item.get("priority"):
+            item["priority"] = canonical
+
+    summary = result.get("overall_summary")
+    if not isinstance(summary, dict):
+        return fixes
+
+    overall = _clamp_score(summary.get("overall_score"))
+    if not isinstance(overall, int):
+        return fixes
+    if overall != summary.get("overall_score"):
+        fixes.append(f"overall_score clamped to {overall}")
+        summary["overall_score"] = overall
+
+    if target_role is None:
+        return fixes
+
+    roles = [
+        r for r in summary.get("role_suitability", []) or [] if isinstance(r, dict)
+    ]
+    target = next(
+        (
+            r
+            for r in roles
+            if str(r.get("role", "")).strip().lower() == target_role.lower()
+        ),
+        None,
+    )
+    if target is None:
+        target = {"role": target_role, "score": overall}
+        fixes.append("role_suitability: added missing target role entry")
+    if roles and roles[0] is not target:
+        fixes.append("role_suitability: moved target role to the first position")
+    roles = [target] + [r for r in roles if r is not target]
+
+    if target.get("score") != overall:
+        fixes.append(
+            f"role_suitability[0].score {target.get('score')!r} set to overall_score {overall}"
+        )
+        target["score"] = overall
+    for other in roles[1:]:
+        score = _clamp_score(other.get("score"))
+        if isinstance(score, int) and score > overall:
+            fixes.append(
+                f"role_suitability: {other.get('role')!r} capped at overall_score {overall}"
+            )
+            other["score"] = overall
+    summary["role_suitability"] = roles
+    return fixes
+
+
+def run_section_groups(
+    text: str,
+    report_language: str,
+    groups: list[str],
+    target_role: str | None = None,
+    generate: Generate = generate_text,
+    max_workers: int | None = None,
+    skills: list[str] | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Requests the given section groups concurrently and returns their answers.
+
+    ``skills`` are the taxonomy skills found in ``text``, if already known.
+
+    Raises:
+        ValueError: if any section response does not contain a JSON object.
+    """
+    workers = max(1, min(len(groups), max_workers or config.ANALYSIS_SECTION_WORKERS))
+    if skills is None:
+        skills = present_skills(text)
+
+    def _run(group: str) -> dict[str, Any] | None:
+        started = time.perf_counter()
+        prompt = get_section_analysis_prompt(
+            text, report_language, SECTION_GROUPS[group], target_role, skills
+        )
+        data = extract_json(generate(prompt))
+        log.debug("Section %s finished in %.2fs", group, time.perf_counter() - started)
+        return data
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="levelup-section"
+    ) as pool:
+        # Each call runs in a copy of this context so its token usage is tracked.
+        futures = {
+            group: pool.submit(contextvars.copy_context().run, _run, group)
+            for group in groups
+        }
+        answers = {group: future.result() for group, future in futures.items()}
+
+    failed = sorted(group for group, data in answers.items() if data is None)
+    if failed:
+        raise ValueError(f"Could not parse section response(s): {', '.join(failed)}")
+    return {group: data for group, data in answers.items() if data is not None}
+
+
+def analyze_sections(
+    text: str,
+    report_language: str,
+    target_role: str | None = None,
+    generate: Generate = generate_text,
+    max_workers: int | None = None,
+) -> dict[str, Any]:
+    """Runs the analysis as concurrent section calls and returns the merged result.
+
+    Raises:
+        ValueError: if any section response does not contain a JSON object.
+    """
+    skills = present_skills(text)
+    answers = run_section_groups(
+        text,
+        report_language,
+        list(SECTION_GROUPS),
+        target_role,
+        generate,
+        max_workers,
+        skills,
+    )
+    result = merge_section_results(answers)
+    fixes = enforce_consistency(result, target_role)
+    fixes += normalize_missing_skills(result, skills)
+    for fix in fixes:
+        log.info("Consistency fix: %s", fix)
+    return result
+
+
+def analyze_single(
+    text: str,
+    report_language: str,
+    target_role: str | None = None,
+    generate: Generate = generate_text,
+) -> dict[str, Any]:
+    """Runs the analysis as one prompt and returns the parsed result.
+
+    Raises:
+        ValueError: if the response does not contain a JSON object.
+    """
+    skills = present_skills(text)
+    result = extract_json(
+        generate(get_resume_analysis_prompt(text, report_language, target_role, skills))
+    )
+    if not result:
+        raise ValueError("Could not parse the analysis response")
+    normalize_missing_skills(result, skills)
+    return result
+
+
+def analyze(
+    text: str,
+    report_language: str,
+    target_role: str | None = None,
+    concurrent: bool | None = None,
+    generate: Generate = generate_text,
+) -> dict[str, Any]:
+    """Runs the analysis in single-call or concurrent mode.
+
+    ``concurrent`` defaults to ``ANALYSIS_CONCURRENT_SECTIONS``. The resume is
+    first trimmed to the prompt input budget (see ``tokens.fit_to_budget``).
+    """
+    trim = fit_to_budget(text, report_language, target_role)
+    text = trim.text
+    if (usage := current_usage()) is not None:
+        usage.trim = trim
+    if concurrent is None:
+        concurrent = config.ANALYSIS_CONCURRENT_SECTIONS
+    if concurrent:
+        return analyze_sections(text, report_language, target_role, generate=generate)
+    return analyze_single(text, report_language, target_role, generate=generate)
+
+
+def measure_latency(
+    text: str,
+    report_language: str,
+    target_role: str | None = None,
+    generate: Generate = generate_text,
+    runs: int = 3,
+) -> dict[str, list[float]]:
+    """Times the single-call and concurrent modes on the same resume.
+
+    Returns the wall-clock seconds of every run, keyed by mode.
+    """
+    timings: dict[str, list[float]] = {"single": [], "concurrent": []}
+    for _ in range(runs):
+        started = time.perf_counter()
+        skills = present_skills(text)
+        extract_json(
+            generate(
+                get_resume_analysis_prompt(text, report_language, target_role, skills)
+            )
+        )
+        timings["single"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        analyze_sections(text, report_language, target_role, generate=generate)
+        timings["concurrent"].append(time.perf_counter() - started)
+    return timings
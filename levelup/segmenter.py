@@ -0,0 +1,704 @@
+"""Splits resume text into its sections.
+
+A line is a section heading when, ignoring case, accents, surrounding
+punctuation, numbering ("2.", "IV -") and letter spacing ("S K I L L S"), it is
+one of the known titles of a section in any of the report languages
+(``Experience``, ``Berufserfahrung``, ``Expérience professionnelle``,
+``Опыт работы``, ...). A known title followed by a colon starts a section on
+the same line (``Skills: Python, SQL``), except inside experience or project
+entries where such labels (``Tools: ...``) are part of the entry unless a
+blank line precedes them. Text before the first heading is the ``header``
+section (name and contact details).
+
+:func:`split_entries` splits an experience-like section into its entries by
+their date ranges, and :func:`drop_boilerplate` removes lines that carry no
+information for an analysis (page numbers, "Curriculum Vitae" titles).
+"""
+
+import hashlib
+import re
+import time
+import unicodedata
+from typing import NamedTuple
+
+# Changes whenever the same text can be split into different sections, so
+# section digests of different versions are never compared (see
+# ``levelup.incremental``). Version 1 had no contact section or inline titles.
+SEGMENTER_VERSION = 2
+
+# Canonical section -> heading titles, in the report languages.
+SECTION_TITLES: dict[str, tuple[str, ...]] = {
+    "contact": (
+        # en, de, fr, es, it, pt, nl
+        "contact",
+        "contact information",
+        "contact details",
+        "personal details",
+        "personal information",
+        "kontakt",
+        "kontaktdaten",
+        "persönliche daten",
+        "persönliche angaben",
+        "coordonnées",
+        "informations personnelles",
+        "contacto",
+        "datos personales",
+        "información personal",
+        "contatti",
+        "dati personali",
+        "informazioni personali",
+        "contato",
+        "dados pessoais",
+        "contactgegevens",
+        "persoonlijke gegevens",
+        # sv, da, fi, pl, cs, tr
+        "kontaktuppgifter",
+        "personuppgifter",
+        "kontaktoplysninger",
+        "personlige oplysninger",
+        "yhteystiedot",
+        "henkilötiedot",
+        "dane kontaktowe",
+        "dane osobowe",
+        "kontaktní údaje",
+        "osobní údaje",
+        "iletişim",
+        "iletişim bilgileri",
+        "kişisel bilgiler",
+        # ru, uk, el, ku
+        "контакты",
+        "контактная информация",
+        "личные данные",
+        "контакти",
+        "контактна інформація",
+        "особисті дані",
+        "επικοινωνία",
+        "στοιχεία επικοινωνίας",
+        "προσωπικά στοιχεία",
+        "têkilî",
+        "agahiyên kesane",
+    ),
+    "summary": (
+        "summary",
+        "profile",
+        "professional summary",
+        "career summary",
+        "about me",
+        "objective",
+        "career objective",
+        "personal statement",
+        "professional profile",
+        "zusammenfassung",
+        "profil",
+        "kurzprofil",
+        "über mich",
+        "berufsziel",
+        "synthèse",
+        "profil professionnel",
+        "à propos de moi",
+        "objectif",
+        "objectif professionnel",
+        "resumen",
+        "perfil",
+        "perfil profesional",
+        "sobre mí",
+        "acerca de mí",
+        "objetivo",
+        "sommario",
+        "profilo",
+        "profilo professionale",
+        "chi sono",
+        "obiettivo",
+        "resumo",
+        "perfil profissional",
+        "sobre mim",
+        "samenvatting",
+        "profiel",
+        "over mij",
+        "sammanfattning",
+        "om mig",
+        "yhteenveto",
+        "profiili",
+        "podsumowanie",
+        "o mnie",
+        "cel zawodowy",
+        "shrnutí",
+        "o mně",
+        "özet",
+        "hakkımda",
+        "kariyer hedefi",
+        "профиль",
+        "о себе",
+        "профіль",
+        "про себе",
+        "περίληψη",
+        "προφίλ",
+        "kurte",
+        "profîl",
+    ),
+    "experience": (
+        "experience",
+        "work experience",
+        "professional experience",
+        "relevant experience",
+        "employment",
+        "employment history",
+        "work history",
+        "career history",
+        "berufserfahrung",
+        "erfahrung",
+        "berufliche erfahrung",
+        "beruflicher werdegang",
+        "werdegang",
+        "expérience",
+        "expériences",
+        "expérience professionnelle",
+        "expériences professionnelles",
+        "parcours professionnel",
+        "experiencia",
+        "experiencia laboral",
+        "experiencia profesional",
+        "trayectoria profesional",
+        "esperienza",
+        "esperienze",
+        "esperienza lavorativa",
+        "esperienze lavorative",
+        "esperienza professionale",
+        "experiência",
+        "experiência profissional",
+        "histórico profissional",
+        "werkervaring",
+        "ervaring",
+        "loopbaan",
+        "arbetslivserfarenhet",
+        "erfarenhet",
+        "yrkeserfarenhet",
+        "erhvervserfaring",
+        "erfaring",
+        "arbejdserfaring",
+        "työkokemus",
+        "kokemus",
+        "doświadczenie",
+        "doświadczenie zawodowe",
+        "pracovní zkušenosti",
+        "zkušenosti",
+        "praxe",
+        "deneyim",
+        "iş deneyimi",
+        "mesleki deneyim",
+        "tecrübe",
+        "опыт работы",
+        "опыт",
+        "профессиональный опыт",
+        "досвід роботи",
+        "досвід",
+        "професійний досвід",
+        "εμπειρία",
+        "επαγγελματική εμπειρία",
+        "ezmûn",
+        "ezmûna kar",
+    ),
+    "education": (
+        "education",
+        "academic background",
+        "qualifications",
+        "education and training",
+        "ausbildung",
+        "bildung",
+        "bildungsweg",
+        "studium",
+        "formation",
+        "formations",
+        "éducation",
+        "parcours académique",
+        "études",
+        "educación",
+        "formación",
+        "formación académica",
+        "estudios",
+        "istruzione",
+        "formazione",
+        "studi",
+        "educação",
+        "formação",
+        "formação académica",
+        "formação acadêmica",
+        "opleiding",
+        "opleidingen",
+        "onderwijs",
+        "utbildning",
+        "uddannelse",
+        "koulutus",
+        "wykształcenie",
+        "edukacja",
+        "vzdělání",
+        "eğitim",
+        "öğrenim",
+        "образование",
+        "освіта",
+        "εκπαίδευση",
+        "σπουδές",
+        "perwerde",
+    ),
+    "skills": (
+        "skills",
+        "technical skills",
+        "core skills",
+        "key skills",
+        "competencies",
+        "core competencies",
+        "technologies",
+        "tech stack",
+        "tools",
+        "kenntnisse",
+        "fähigkeiten",
+        "kompetenzen",
+        "fachkenntnisse",
+        "it-kenntnisse",
+        "technische kenntnisse",
+        "compétences",
+        "compétences techniques",
+        "habilidades",
+        "competencias",
+        "aptitudes",
+        "conocimientos",
+        "competenze",
+        "competenze tecniche",
+        "abilità",
+        "conoscenze",
+        "competências",
+        "conhecimentos",
+        "vaardigheden",
+        "competenties",
+        "färdigheter",
+        "kompetenser",
+        "kunskaper",
+        "kompetencer",
+        "færdigheder",
+        "taidot",
+        "osaaminen",
+        "umiejętności",
+        "kompetencje",
+        "dovednosti",
+        "znalosti",
+        "yetenekler",
+        "beceriler",
+        "yetkinlikler",
+        "навыки",
+        "ключевые навыки",
+        "профессиональные навыки",
+        "компетенции",
+        "навички",
+        "ключові навички",
+        "компетенції",
+        "δεξιότητες",
+        "ικανότητες",
+        "jêhatî",
+    ),
+    "projects": (
+        "projects",
+        "personal projects",
+        "selected projects",
+        "key projects",
+        "projekte",
+        "projets",
+        "proyectos",
+        "progetti",
+        "projetos",
+        "projectos",
+        "projecten",
+        "projekt",
+        "projekter",
+        "projektit",
+        "projekty",
+        "projeler",
+        "проекты",
+        "проєкти",
+        "проекти",
+        "έργα",
+        "proje",
+    ),
+    "certifications": (
+        "certifications",
+        "certificates",
+        "licenses",
+        "licenses & certifications",
+        "courses",
+        "training",
+        "zertifikate",
+        "zertifizierungen",
+        "weiterbildung",
+        "kurse",
+        "certificats",
+        "certificaciones",
+        "certificados",
+        "cursos",
+        "certificazioni",
+        "certificati",
+        "corsi",
+        "certificações",
+        "certificaten",
+        "certificeringen",
+        "cursussen",
+        "certifikat",
+        "kurser",
+        "certificeringer",
+        "sertifikaatit",
+        "kurssit",
+        "certyfikaty",
+        "kursy",
+        "certifikáty",
+        "kurzy",
+        "sertifikalar",
+        "kurslar",
+        "сертификаты",
+        "курсы",
+        "сертифікати",
+        "курси",
+        "πιστοποιήσεις",
+        "sertîfîka",
+    ),
+    "languages": (
+        "languages",
+        "language skills",
+        "sprachen",
+        "sprachkenntnisse",
+        "langues",
+        "idiomas",
+        "lenguas",
+        "lingue",
+        "línguas",
+        "talen",
+        "talenkennis",
+        "språk",
+        "sprog",
+        "kielitaito",
+        "kielet",
+        "języki",
+        "języki obce",
+        "jazyky",
+        "jazykové znalosti",
+        "diller",
+        "yabancı diller",
+        "языки",
+        "знание языков",
+        "мови",
+        "знання мов",
+        "γλώσσες",
+        "ziman",
+    ),
+    "awards": (
+        "awards",
+        "honors",
+        "honours",
+        "achievements",
+        "auszeichnungen",
+        "distinctions",
+        "récompenses",
+        "premios",
+        "logros",
+        "reconocimientos",
+        "premi",
+        "riconoscimenti",
+        "prémios",
+        "prêmios",
+        "onderscheidingen",
+        "utmärkelser",
+        "priser",
+        "palkinnot",
+        "nagrody",
+        "osiągnięcia",
+        "ocenění",
+        "ödüller",
+        "başarılar",
+        "награды",
+        "достижения",
+        "нагороди",
+        "досягнення",
+        "βραβεία",
+        "xelat",
+    ),
+    "publications": (
+        "publications",
+        "papers",
+        "talks",
+        "publikationen",
+        "veröffentlichungen",
+        "publicaciones",
+        "pubblicazioni",
+        "publicações",
+        "publicaties",
+        "publikationer",
+        "julkaisut",
+        "publikacje",
+        "publikace",
+        "yayınlar",
+        "публикации",
+        "публікації",
+        "δημοσιεύσεις",
+        "weşan",
+    ),
+    "volunteering": (
+        "volunteering",
+        "volunteer experience",
+        "activities",
+        "ehrenamt",
+        "ehrenamtliches engagement",
+        "bénévolat",
+        "voluntariado",
+        "volontariato",
+        "vrijwilligerswerk",
+        "ideellt arbete",
+        "frivilligt arbejde",
+        "vapaaehtoistyö",
+        "wolontariat",
+        "dobrovolnictví",
+        "gönüllülük",
+        "волонтерство",
+        "волонтёрство",
+        "εθελοντισμός",
+    ),
+    "interests": (
+        "interests",
+        "hobbies",
+        "hobbies and interests",
+        "interessen",
+        "hobbys",
+        "centres d'intérêt",
+        "loisirs",
+        "intérêts",
+        "intereses",
+        "aficiones",
+        "interessi",
+        "hobby",
+        "interesses",
+        "passatempos",
+        "hobby's",
+        "intressen",
+        "interesser",
+        "fritidsinteresser",
+        "harrastukset",
+        "zainteresowania",
+        "zájmy",
+        "koníčky",
+        "ilgi alanları",
+        "hobiler",
+        "интересы",
+        "хобби",
+        "увлечения",
+        "інтереси",
+        "хобі",
+        "захоплення",
+        "ενδιαφέροντα",
+        "hobî",
+    ),
+    "references": (
+        "references",
+        "referees",
+        "referenzen",
+        "références",
+        "referencias",
+        "referenze",
+        "referências",
+        "referenties",
+        "referenser",
+        "referencer",
+        "suosittelijat",
+        "referencje",
+        "reference",
+        "referanslar",
+        "рекомендации",
+        "рекомендації",
+        "συστάσεις",
+        "referans",
+    ),
+}
+
+# Sections made of dated entries (jobs, projects), see split_entries.
+ENTRY_SECTIONS = frozenset({"experience", "projects", "volunteering"})
+
+# Longest line considered as a heading, and longest title before an inline colon.
+_MAX_HEADING = 60
+_MAX_INLINE_TITLE = 40
+_NUMBERING = re.compile(r"^(?:\d{1,2}|[ivx]{1,4})[.)]?\s+|^(?:\d{1,2}|[ivx]{1,4})[.)]")
+_STRIP = re.compile(r"^[\W_]+|[\W_]+$")
+
+
+def normalize_title(line: str) -> str:
+    """Folds a heading candidate to the form used in the title lookup.
+
+    Lower case without accents, numbering, surrounding punctuation or letter
+    spacing: ``"2. E X P É R I E N C E :"`` becomes ``"experience"``.
+    """
+    if line.isascii():
+        folded = line.lower()
+    else:
+        folded = unicodedata.normalize("NFKD", line.casefold())
+        folded = "".join(c for c in folded if not unicodedata.combining(c))
+    folded = _STRIP.sub("", _NUMBERING.sub("", _STRIP.sub("", folded)))
+    words = folded.split()
+    if len(words) > 3 and all(len(w) == 1 for w in words):
+        return "".join(words)  # letter-spaced heading
+    return " ".join(words)
+
+
+_TITLE_TO_SECTION = {
+    normalize_title(title): section
+    for section, titles in SECTION_TITLES.items()
+    for title in titles
+}
+
+
+class Section(NamedTuple):
+    name: str  # canonical name, "header" for the text before the first heading
+    text: str  # including the heading line
+
+
+def _few_words(line: str) -> bool:
+    # Titles have at most five words, unless they are letter-spaced.
+    words = line.split()
+    return len(words) <= 5 or all(len(w) == 1 for w in words)
+
+
+def heading_section(line: str, inline: bool = True) -> str | None:
+    """Returns the canonical section a heading line starts, if it is one.
+
+    With ``inline``, a known title followed by a colon and content on the same
+    line (``Skills: Python``) counts as a heading too.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if len(line) <= _MAX_HEADING and _few_words(line):
+        section = _TITLE_TO_SECTION.get(normalize_title(line))
+        if section is not None:
+            return section
+    if inline:
+        title, colon, _ = line.partition(":")
+        if colon and len(title) <= _MAX_INLINE_TITLE and _few_words(title):
+            return _TITLE_TO_SECTION.get(normalize_title(title))
+    return None
+
+
+def segment(text: str) -> list[Section]:
+    """Splits ``text`` into sections in document order.
+
+    Joining the texts of the sections with newlines gives back ``text``.
+    """
+    sections: list[Section] = []
+    name = "header"
+    lines: list[str] = []
+    previous_blank = True
+    for line in text.split("\n"):
+        # Labels such as "Tools: ..." inside a job entry do not end the entry.
+        inline = previous_blank or name not in ENTRY_SECTIONS
+        section = heading_section(line, inline)
+        if section is not None:
+            if lines:
+                sections.append(Section(name, "\n".join(lines)))
+            name, lines = section, []
+        lines.append(line)
+        previous_blank = not line.strip()
+    if lines:
+        sections.append(Section(name, "\n".join(lines)))
+    return sections
+
+
+def section_digests(text: str) -> dict[str, str]:
+    """Returns a content digest per section name, for diffing resume versions.
+
+    Sections with the same name (two ``Experience`` headings) are digested
+    together; whitespace differences do not change a digest.
+    """
+    texts: dict[str, list[str]] = {}
+    for section in segment(text):
+        texts.setdefault(section.name, []).append(" ".join(section.text.split()))
+    return {
+        name: hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+        for name, parts in texts.items()
+    }
+
+
+# "2019 - 2021", "03/2019 – heute", "Jan 2020 to Present", "2018 – настоящее время"
+_YEAR = r"(?:19|20)\d\d"
+_PRESENT = (
+    r"present|current|now|today|heute|aktuell|jetzt|aujourd'hui|actuel|presente|"
+    r"actualidad|actual|atualmente|attuale|oggi|heden|nu|nutid|nyt|nykyinen|"
+    r"obecnie|současnost|dosud|günümüz|halen|devam|настоящее время|н\.в\.|"
+    r"наст\. время|сейчас|теперішній час|дотепер|зараз|σήμερα|niha"
+)
+DATE_RANGE = re.compile(
+    rf"{_YEAR}\s*(?:[-–—]|\b(?:to|bis|à|a|até|al|tot|till|until)\b)\s*"
+    rf"(?:[\w.]+\s+)?(?:\d{{1,2}}[./])?(?:{_YEAR}|{_PRESENT})",
+    re.IGNORECASE,
+)
+_BULLET = re.compile(r"^\s*(?:[-*•·▪◦‣–>]|\d{1,2}[.)])\s+")
+
+
+def split_entries(text: str) -> list[str]:
+    """Splits the body of an experience-like section into its entries.
+
+    An entry starts at a line with a date range, together with the title line
+    just above it (the role or employer), once the previous entry has its own
+    date range. The heading line is the first entry's. Joining the entries
+    with newlines gives back ``text``.
+    """
+    entries: list[list[str]] = [[]]
+    dated = False
+    for line in text.split("\n"):
+        if DATE_RANGE.search(line):
+            if dated:
+                current = entries[-1]
+                title: list[str] = []
+                previous = current[-1] if current else ""
+                if (
+                    previous.strip()
+                    and not _BULLET.match(previous)
+                    and len(previous) < 80
+                ):
+                    title = [current.pop()]
+                entries.append(title)
+            dated = True
+        entries[-1].append(line)
+    return ["\n".join(entry) for entry in entries if entry]
+
+
+_BOILERPLATE = re.compile(
+    r"^\W*(?:"
+    r"(?:page|seite|página|pagina|sayfa|strona|strana|sivu|sida|side|σελίδα|"
+    r"страница|сторінка)?\s*\d{1,3}\s*(?:/|of|von|de|di|van|av|af|z|ze|из|з|από)\s*\d{1,3}"
+    r"|curriculum vitae|cv|resume|résumé|lebenslauf|özgeçmiş|životopis|życiorys|"
+    r"ansioluettelo|levnadsbeskrivning|резюме|βιογραφικό σημείωμα|βιογραφικό"
+    r"|(?:references|referenzen|références|referencias|referenze|referências)"
+    r"\s+(?:available\s+)?(?:up)?on\s+request"
+    r"|(?:references|referenzen)\s+(?:auf anfrage|available on request)"
+    r")\W*$",
+    re.IGNORECASE,
+)
+
+
+def is_boilerplate(line: str) -> bool:
+    """True for lines without content for an analysis (page numbers, CV titles)."""
+    return len(line) <= _MAX_HEADING and bool(_BOILERPLATE.match(line.strip()))
+
+
+def drop_boilerplate(text: str) -> str:
+    """Removes boilerplate lines (see :func:`is_boilerplate`) from ``text``."""
+    return "\n".join(line for line in text.split("\n") if not is_boilerplate(line))
+
+
+class Throughput(NamedTuple):
+    resumes_per_second: float
+    megabytes_per_second: float
+    sections: int  # sections found in the sample
+
+
+def measure_throughput(text: str, runs: int = 200) -> Throughput:
+    """Times :func:`segment` on ``text`` over ``runs`` runs."""
+    runs = max(1, runs)
+    started = time.perf_counter()
+    for _ in range(runs):
+        sections = segment(text)
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    size = len(text.encode("utf-8")) * runs / 1e6
+    return Throughput(runs / elapsed, size / elapsed, len(sections))
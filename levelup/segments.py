@@ -0,0 +1,179 @@
+"""Append-only, multi-process persistence of the store's indexes.
+
+Rewriting a whole index file on every saved analysis costs O(N) per save,
+and two processes (API workers, ``levelup worker``, the CLI) saving at the
+same time lose each other's entries. :class:`SegmentedIndex` keeps an index
+in a directory instead:
+
+* ``base-<seq>.npz``: a compacted snapshot of everything up to ``seq``;
+* ``<seq>.npz``: a segment with the entries added by one save;
+* ``<seq>.del``: the keys removed by one delete, one per line.
+
+Writers append the next segment under an exclusive ``flock`` on the
+directory's lock file, after catching up with the segments of other
+processes, and every ``compact_every`` segments fold them into a new base.
+Readers check the directory's modification time on each access and only
+apply the segments they have not seen yet, so every process sees the others'
+analyses without reloading the whole index.
+"""
+
+import fcntl
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Generic, Iterable, Iterator, Protocol, TypeVar
+
+log = logging.getLogger(__name__)
+
+_FILE_RE = re.compile(r"(base-)?(\d+)\.(npz|del)")
+# Modification times this recent are not trusted: another write in the same
+# tick of the filesystem's clock would leave the directory's mtime unchanged.
+_MTIME_SLACK_NS = 2_000_000_000
+
+
+class Mergeable(Protocol):
+    def merge(self, other: Any, removed: Iterable[str] = ()) -> None: ...
+
+    def save(self, path: Path | str) -> None: ...
+
+
+T = TypeVar("T", bound=Mergeable)
+
+
+class SegmentedIndex(Generic[T]):
+    """An index persisted as a compacted base plus append-only segments.
+
+    ``new`` creates an empty index and ``load`` reads one saved with its
+    ``save`` method. A single-file index at ``legacy_path`` (the format used
+    before segments) becomes the first base.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        new: Callable[[], T],
+        load: Callable[[Path], T],
+        legacy_path: Path | str | None = None,
+        compact_every: int = 64,
+    ):
+        self.directory = Path(directory)
+        self.compact_every = compact_every
+        self._new = new
+        self._load = load
+        self._legacy_path = Path(legacy_path) if legacy_path else None
+        self._index: T | None = None
+        self._seq = 0  # last base or segment applied to _index
+        self._segments = 0  # segments applied since the base
+        self._stamp: int | None = None
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / ".lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _modified(self) -> int | None:
+        try:
+            return self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _settled(self) -> int | None:
+        """The directory's mtime, or None while it is too recent to rely on."""
+        stamp = self._modified()
+        if stamp is None or time.time_ns() - stamp < _MTIME_SLACK_NS:
+            return None
+        return stamp
+
+    def _files(self) -> tuple[list[int], list[tuple[int, str]]]:
+        bases, segments = [], []
+        for name in os.listdir(self.directory):
+            if match := _FILE_RE.fullmatch(name):
+                seq = int(match[2])
+                if match[1]:
+                    bases.append(seq)
+                else:
+                    segments.append((seq, match[3]))
+        return sorted(bases), sorted(segments)
+
+    def _path(self, seq: int, kind: str = "npz", base: bool = False) -> Path:
+        return self.directory / f"{'base-' if base else ''}{seq:010d}.{kind}"
+
+    def _catch_up(self) -> None:
+        """Applies the files written since the last call. Needs the lock."""
+        self._stamp = self._settled()
+        bases, segments = self._files()
+        legacy = self._legacy_path
+        if not bases and not segments and legacy is not None and legacy.exists():
+            os.replace(legacy, self._path(0, base=True))
+            bases = [0]
+        if self._index is None or (bases and bases[-1] > self._seq):
+            self._seq = bases[-1] if bases else 0
+            self._index = (
+                self._load(self._path(self._seq, base=True)) if bases else self._new()
+            )
+            self._segments = 0
+        for seq, kind in segments:
+            if seq <= self._seq:
+                continue
+            path = self._path(seq, kind)
+            if kind == "npz":
+                self._index.merge(self._load(path))
+            else:
+                self._index.merge(self._new(), path.read_text().split())
+            self._seq = seq
+            self._segments += 1
+
+    @property
+    def index(self) -> T:
+        """The index, with the segments saved by any process since the last access."""
+        if self._stamp is None or self._modified() != self._stamp:
+            with self._locked():
+                self._catch_up()
+        assert self._index is not None
+        return self._index
+
+    def append(self, segment: T | None = None, removed: Iterable[str] = ()) -> None:
+        """Saves a segment of new entries (or removed keys) and applies it."""
+        with self._locked():
+            self._catch_up()
+            assert self._index is not None
+            seq = self._seq + 1
+            if segment is not None:
+                segment.save(self._path(seq))
+                self._index.merge(segment)
+            else:
+                removed = list(removed)
+                path = self._path(seq, "del")
+                tmp_path = path.with_name(path.name + ".tmp")
+                tmp_path.write_text("".join(f"{key}\n" for key in removed))
+                os.replace(tmp_path, path)
+                self._index.merge(self._new(), removed)
+            self._seq = seq
+            self._segments += 1
+            if self._segments >= self.compact_every:
+                self._compact()
+            self._stamp = self._settled()
+
+    def _compact(self) -> None:
+        assert self._index is not None
+        self._index.save(self._path(self._seq, base=True))
+        bases, segments = self._files()
+        for seq in bases:
+            if seq < self._seq:
+                self._path(seq, base=True).unlink()
+        for seq, kind in segments:
+            if seq <= self._seq:
+                self._path(seq, kind).unlink()
+        self._segments = 0
+        log.info(f"Compacted {self.directory.name} index at segment {self._seq}")
@@ -0,0 +1,143 @@
+"""Coalescing of identical in-flight calls ("single flight").
+
+While a call for a key is running, further calls for the same key do not
+start their own: they wait for the running one and receive its result, or
+its exception. Once it finishes the key is forgotten, so later calls run
+again (this is not a cache).
+
+:meth:`SingleFlight.do` coalesces across threads (the Streamlit server, the
+API's sync routes), :meth:`SingleFlight.do_async` across tasks of an event
+loop. An async waiter that is cancelled only stops waiting; the shared call is
+cancelled once every waiter has gone.
+"""
+
+import asyncio
+import copy
+import functools
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+from levelup import metrics
+from levelup.prompts import get_resume_analysis_prompt
+
+T = TypeVar("T")
+
+CALLS = metrics.counter(
+    "levelup_singleflight_calls_total",
+    "Calls through a single-flight group, by whether they ran or joined a running call.",
+    ("flight", "role"),
+)
+
+
+class _AsyncCall:
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Shares one in-flight call per key between concurrent callers.
+
+    ``clone`` is applied to the result handed to callers that joined a
+    running call, so that callers sharing a mutable result (a dict) cannot
+    see each other's changes.
+    """
+
+    def __init__(self, name: str, clone: Callable[[T], T] | None = None):
+        self.name = name
+        self.clone = clone
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future[T]] = {}
+        self._tasks: dict[tuple[int, Hashable], _AsyncCall] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._tasks)
+
+    def _shared(self, result: T) -> T:
+        return self.clone(result) if self.clone else result
+
+    def do(self, key: Hashable, fn: Callable[[], T], timeout: float | None = None) -> T:
+        """Runs ``fn`` unless a call for ``key`` is running, then waits for that one.
+
+        ``timeout`` only bounds the wait of a joining caller (raising
+        ``TimeoutError``); the running call is not affected.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if future is None:
+                future = self._calls[key] = Future()
+        if not leader:
+            CALLS.inc(flight=self.name, role="joined")
+            return self._shared(future.result(timeout))
+
+        CALLS.inc(flight=self.name, role="ran")
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Awaits ``fn()`` unless a call for ``key`` is running in this event loop."""
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        call = self._tasks.get(task_key)
+        if call is None:
+            CALLS.inc(flight=self.name, role="ran")
+            call = _AsyncCall(asyncio.ensure_future(fn()))
+            self._tasks[task_key] = call
+            leader = True
+
+            def forget(_: "asyncio.Task[Any]", call: _AsyncCall = call) -> None:
+                if self._tasks.get(task_key) is call:
+                    del self._tasks[task_key]
+
+            call.task.add_done_callback(forget)
+        else:
+            CALLS.inc(flight=self.name, role="joined")
+            leader = False
+
+        call.waiters += 1
+        try:
+            result: T = await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+        return result if leader else self._shared(result)
+
+
+@functools.lru_cache(maxsize=1)
+def prompt_version() -> str:
+    """A short hash of the analysis prompt template.
+
+    It changes whenever the prompt wording changes, so results produced with
+    an older prompt are never shared with callers expecting the new one.
+    """
+    template = get_resume_analysis_prompt("", "", None)
+    return hashlib.sha256(template.encode()).hexdigest()[:12]
+
+
+def analysis_key(
+    text: str, report_language: str, target_role: str | None, mode: str = ""
+) -> tuple[str, str, str, str, str]:
+    """Single-flight key of an analysis: (text hash, language, role, template, mode)."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return (digest, report_language, target_role or "", prompt_version(), mode)
+
+
+# Analyses in flight in this process, shared by the web interface and the API.
+analysis_flight: SingleFlight[dict[str, Any]] = SingleFlight(
+    "analysis", clone=copy.deepcopy
+)
@@ -0,0 +1,328 @@
+"""Local skill taxonomy matching.
+
+All aliases of the taxonomy are compiled once into an Aho-Corasick automaton,
+so a resume is scanned for every known skill in a single linear pass. The
+skills found are passed to the model as a compact "already present" hint and
+are used to normalize the spelling of the ``missing_skills`` it returns.
+"""
+
+import functools
+import json
+import re
+from collections import deque
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+from levelup import config
+
+# Canonical skill name -> alternative spellings (matched case-insensitively).
+DEFAULT_TAXONOMY: dict[str, tuple[str, ...]] = {
+    # languages
+    "Python": ("python3",),
+    "Java": (),
+    "JavaScript": ("js", "ecmascript"),
+    "TypeScript": ("ts",),
+    "Golang": ("go lang",),
+    "Rust": (),
+    "C++": ("cpp",),
+    "C#": ("csharp", "c sharp"),
+    "Kotlin": (),
+    "Swift": (),
+    "Scala": (),
+    "Ruby": (),
+    "PHP": (),
+    "SQL": (),
+    "Bash": ("shell scripting", "shell script"),
+    "MATLAB": (),
+    # web and mobile
+    "React": ("react.js", "reactjs"),
+    "Angular": ("angularjs", "angular.js"),
+    "Vue.js": ("vue", "vuejs"),
+    "Node.js": ("node", "nodejs"),
+    "Django": (),
+    "Flask": (),
+    "FastAPI": (),
+    "Spring Boot": ("spring framework",),
+    ".NET": ("dotnet", ".net core", "asp.net"),
+    "GraphQL": (),
+    "REST APIs": ("rest api", "restful", "restful apis"),
+    "HTML": ("html5",),
+    "CSS": ("css3",),
+    "Android": (),
+    "iOS": (),
+    "Flutter": (),
+    # data and machine learning
+    "PostgreSQL": ("postgres",),
+    "MySQL": (),
+    "Microsoft SQL Server": ("sql server", "mssql"),
+    "MongoDB": ("mongo",),
+    "Redis": (),
+    "Elasticsearch": ("elastic search",),
+    "Apache Kafka": ("kafka",),
+    "Apache Spark": ("spark", "pyspark"),
+    "Apache Airflow": ("airflow",),
+    "dbt": (),
+    "Snowflake": (),
+    "BigQuery": ("google bigquery",),
+    "Pandas": (),
+    "NumPy": (),
+    "scikit-learn": ("sklearn", "scikit learn"),
+    "TensorFlow": (),
+    "PyTorch": (),
+    "Machine Learning": ("ml",),
+    "Deep Learning": (),
+    "Natural Language Processing": ("nlp",),
+    "Computer Vision": (),
+    "Data Visualization": (),
+    "Tableau": (),
+    "Power BI": ("powerbi",),
+    "Microsoft Excel": ("ms excel",),
+    "Statistics": ("statistical analysis",),
+    "A/B Testing": ("ab testing", "a/b tests", "split testing"),
+    # cloud and operations
+    "AWS": ("amazon web services",),
+    "Microsoft Azure": ("azure",),
+    "Google Cloud Platform": ("gcp", "google cloud"),
+    "Docker": (),
+    "Kubernetes": ("k8s",),
+    "Terraform": (),
+    "Ansible": (),
+    "Linux": (),
+    "Git": (),
+    "CI/CD": ("ci / cd", "continuous integration", "continuous delivery"),
+    "Jenkins": (),
+    "GitHub Actions": (),
+    "Prometheus": (),
+    "Grafana": (),
+    "Microservices": ("microservice architecture",),
+    "System Design": (),
+    # security and compliance
+    "PCI DSS": ("pci-dss",),
+    "GDPR": (),
+    "ISO 27001": ("iso/iec 27001",),
+    "SOC 2": ("soc2",),
+    "OWASP": (),
+    "Penetration Testing": ("pentesting", "pen testing"),
+    "Identity and Access Management": ("iam",),
+    # product, design and ways of working
+    "Agile": ("agile methodologies",),
+    "Scrum": (),
+    "Kanban": (),
+    "Jira": (),
+    "Product Management": (),
+    "Project Management": (),
+    "Stakeholder Management": (),
+    "User Research": (),
+    "Figma": (),
+    "UX Design": ("user experience design",),
+    "UI Design": ("user interface design",),
+    "Technical Writing": (),
+    "Public Speaking": (),
+    "Mentoring": (),
+    "SEO": ("search engine optimization",),
+    "Google Analytics": (),
+    "Salesforce": (),
+    "SAP": (),
+}
+
+# Aliases that are also ordinary words or other abbreviations (a network
+# "node", "500 ml", a "spark" of inspiration, "TS/SCI" clearance). In resume
+# text they only count with one of these words within CONTEXT_WINDOW
+# characters; as a whole skill name, e.g. in ``missing_skills``, they always do.
+AMBIGUOUS_ALIASES: dict[str, str] = {
+    "ts": r"javascript|js|react|angular|vue|node|npm|frontend|front-end|web",
+    "vue": r"javascript|js|typescript|ts|react|angular|frontend|front-end|web|spa",
+    "node": r"javascript|js|typescript|ts|express|npm|react|backend|back-end|api",
+    "mongo": r"database|db|nosql|sql|mongoose|mern|node|express|redis|postgres",
+    "spark": r"hadoop|big data|pyspark|scala|databricks|etl|hive|kafka|airflow",
+    "ml": r"machine|learning|model|models|ai|data scien\w*|python|pytorch"
+    r"|tensorflow|scikit-learn|sklearn|nlp|deep|mlops",
+    "iam": r"aws|azure|gcp|cloud|okta|identity|access|sso|active directory"
+    r"|security|polic\w*|roles?|permissions?",
+}
+CONTEXT_WINDOW = 60
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_PARENTHETICAL_RE = re.compile(r"\s*\([^)]*\)\s*$")
+
+
+def normalize_skill(name: str) -> str:
+    """Lowercases a skill name or text and collapses runs of whitespace."""
+    return _WHITESPACE_RE.sub(" ", name.lower()).strip()
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char in "+#"
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over all aliases of a skill taxonomy.
+
+    ``context`` maps ambiguous aliases to a regex of words, one of which must
+    appear near the alias for it to be found in text.
+    """
+
+    def __init__(
+        self,
+        taxonomy: Mapping[str, Iterable[str]],
+        context: Mapping[str, str] | None = None,
+    ):
+        self.skills = list(taxonomy)
+        self._context = {
+            normalize_skill(alias): re.compile(rf"(?<![\w+#])(?:{words})(?![\w+#])")
+            for alias, words in (context or {}).items()
+        }
+        self._lookup: dict[str, int] = {}
+        for index, (canonical, aliases) in enumerate(taxonomy.items()):
+            for alias in (canonical, *aliases):
+                if normalized := normalize_skill(alias):
+                    self._lookup.setdefault(normalized, index)
+
+        # Trie over the aliases; state 0 is the root.
+        self._goto: list[dict[str, int]] = [{}]
+        self._outputs: list[list[tuple[int, int]]] = [[]]
+        for alias, index in self._lookup.items():
+            state = 0
+            for char in alias:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append((index, len(alias)))
+
+        # Breadth-first failure links, merging the outputs of each suffix state.
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state].extend(self._outputs[self._fail[next_state]])
+
+    def _matches(self, text: str) -> list[tuple[int, int, int]]:
+        """Returns ``(start, end, skill_index)`` for every whole-word alias match."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index, length in outputs[state]:
+                start, end = position - length + 1, position + 1
+                if (start == 0 or not _is_word_char(text[start - 1])) and (
+                    end == len(text) or not _is_word_char(text[end])
+                ):
+                    matches.append((start, end, index))
+        return matches
+
+    def find(self, text: str) -> list[str]:
+        """Returns the canonical skills mentioned in ``text`` in order of appearance.
+
+        Overlapping aliases resolve to the leftmost longest one, so "SQL Server"
+        counts as Microsoft SQL Server rather than also as SQL. Ambiguous
+        aliases only count with one of their context words nearby.
+        """
+        text = normalize_skill(text)
+        found: dict[int, None] = {}
+        covered_until = 0
+        for start, end, index in sorted(
+            self._matches(text), key=lambda m: (m[0], m[0] - m[1])
+        ):
+            if start >= covered_until:
+                if not self._in_context(text, start, end):
+                    continue
+                found.setdefault(index)
+                covered_until = end
+        return [self.skills[index] for index in found]
+
+    def _in_context(self, text: str, start: int, end: int) -> bool:
+        pattern = self._context.get(text[start:end])
+        if pattern is None:
+            return True
+        before = text[max(start - CONTEXT_WINDOW, 0) : start]
+        after = text[end : end + CONTEXT_WINDOW]
+        return bool(pattern.search(before) or pattern.search(after))
+
+    def canonical(self, name: str) -> str | None:
+        """Returns the canonical spelling of a skill name, or None if it is unknown."""
+        normalized = normalize_skill(name)
+        index = self._lookup.get(normalized)
+        if index is None:
+            index = self._lookup.get(_PARENTHETICAL_RE.sub("", normalized))
+        return None if index is None else self.skills[index]
+
+
+def load_taxonomy(path: Path | str) -> dict[str, tuple[str, ...]]:
+    """Loads a ``{"Canonical Skill": ["alias", ...]}`` JSON taxonomy file."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError(f"Skill taxonomy {path} must be a JSON object")
+    return {
+        str(skill): tuple(map(str, aliases or ())) for skill, aliases in data.items()
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def get_skill_matcher() -> SkillMatcher:
+    """Returns the matcher for the built-in taxonomy plus ``SKILL_TAXONOMY_PATH``."""
+    taxonomy = dict(DEFAULT_TAXONOMY)
+    if config.SKILL_TAXONOMY_PATH:
+        taxonomy.update(load_taxonomy(config.SKILL_TAXONOMY_PATH))
+    return SkillMatcher(taxonomy, AMBIGUOUS_ALIASES)
+
+
+def present_skills(text: str) -> list[str]:
+    """Returns the taxonomy skills found in a resume, or [] when pre-screening is off."""
+    if not config.SKILL_PRESCREEN_ENABLED:
+        return []
+    return get_skill_matcher().find(text)
+
+
+def normalize_missing_skills(
+    result: dict[str, Any],
+    present: Iterable[str] = (),
+    matcher: SkillMatcher | None = None,
+) -> list[str]:
+    """Canonicalizes ``missing_skills`` names in place and returns what was fixed.
+
+    Entries that name a skill already present in the resume, and repeated
+    entries for the same skill, are dropped.
+    """
+    items = result.get("missing_skills")
+    if not isinstance(items, list):
+        return []
+    if matcher is None:
+        matcher = get_skill_matcher()
+    present_set = set(present)
+    fixes: list[str] = []
+    seen: set[str] = set()
+    kept = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("skill"), str):
+            kept.append(item)
+            continue
+        name = item["skill"].strip()
+        canonical = matcher.canonical(name)
+        if canonical is not None and canonical != name:
+            fixes.append(f"missing_skills: {name!r} renamed to {canonical!r}")
+            item["skill"] = canonical
+        skill = item["skill"]
+        if skill in present_set:
+            fixes.append(f"missing_skills: dropped {skill!r}, already in the CV")
+            continue
+        if normalize_skill(skill) in seen:
+            fixes.append(f"missing_skills: dropped duplicate {skill!r}")
+            continue
+        seen.add(normalize_skill(skill))
+        kept.append(item)
+    result["missing_skills"] = kept
+    return fixes
@@ -0,0 +1,178 @@
+"""Local, file-backed storage of analysis results.
+
+Each analysis is kept as one JSON record under ``<root>/analyses`` next to a
+near-duplicate index of the resume texts, so a resubmitted CV can be answered
+from a previous analysis instead of another LLM call, and a full-text search
+index of the same texts. Both indexes are saved in append-only segments (see
+``levelup.segments``), so the processes sharing a store see each other's
+analyses.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from levelup import config
+from levelup.dedup import DuplicateIndex
+from levelup.search import SearchIndex
+from levelup.segmenter import SEGMENTER_VERSION, section_digests
+from levelup.segments import SegmentedIndex
+
+log = logging.getLogger(__name__)
+
+
+def text_digest(text: str) -> str:
+    """Returns the SHA-256 hex digest of a resume text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class AnalysisStore:
+    """Stores analysis records as JSON files and indexes their resume texts."""
+
+    def __init__(self, root: Path | str):
+        self.root = Path(root)
+        self.analyses_dir = self.root / "analyses"
+        self._index = SegmentedIndex(
+            self.root / "dedup",
+            DuplicateIndex,
+            DuplicateIndex.load,
+            legacy_path=self.root / "dedup.npz",
+        )
+        self._search_index = SegmentedIndex(
+            self.root / "search",
+            SearchIndex,
+            SearchIndex.load,
+            legacy_path=self.root / "search.npz",
+        )
+
+    @property
+    def index(self) -> DuplicateIndex:
+        """The near-duplicate index, with the analyses saved by other processes."""
+        return self._index.index
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """The full-text search index, with the analyses saved by other processes."""
+        return self._search_index.index
+
+    @property
+    def version(self) -> int:
+        """Changes whenever an analysis is saved or deleted (0 for an empty store)."""
+        try:
+            return self.analyses_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _record_path(self, analysis_id: str) -> Path:
+        return self.analyses_dir / f"{analysis_id}.json"
+
+    def save(
+        self,
+        result: dict[str, Any],
+        text: str,
+        language: str,
+        role: str | None = None,
+        incremental: dict[str, Any] | None = None,
+    ) -> str:
+        """Persists an analysis, indexes its resume text and returns the new id.
+
+        ``incremental`` records how the analysis was derived from a previous
+        version of the resume (see ``levelup.incremental``).
+        """
+        analysis_id = uuid.uuid4().hex
+        record = {
+            "id": analysis_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "language": language,
+            "role": role,
+            "text_sha256": text_digest(text),
+            "sections": section_digests(text),
+            "segmenter_version": SEGMENTER_VERSION,
+            "result": result,
+        }
+        if incremental is not None:
+            record["incremental"] = incremental
+        self.analyses_dir.mkdir(parents=True, exist_ok=True)
+        path = self._record_path(analysis_id)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+        duplicates = DuplicateIndex()
+        duplicates.add(analysis_id, text, language, role)
+        self._index.append(duplicates)
+        terms = SearchIndex()
+        terms.add(analysis_id, text)
+        self._search_index.append(terms)
+        return analysis_id
+
+    def get(self, analysis_id: str) -> dict[str, Any] | None:
+        """Returns the stored record for ``analysis_id``, or None if unknown."""
+        path = self._record_path(analysis_id)
+        if not path.exists():
+            return None
+        record: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+        return record
+
+    def delete(self, analysis_id: str) -> bool:
+        """Deletes a stored analysis. Returns False if it did not exist."""
+        path = self._record_path(analysis_id)
+        if not path.exists():
+            return False
+        path.unlink()
+        if analysis_id in self.index:
+            self._index.append(removed=[analysis_id])
+        if analysis_id in self.search_index:
+            self._search_index.append(removed=[analysis_id])
+        return True
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        if not self.analyses_dir.exists():
+            return
+        for path in sorted(self.analyses_dir.glob("*.json")):
+            yield json.loads(path.read_text(encoding="utf-8"))
+
+    def find_similar(
+        self,
+        text: str,
+        language: str,
+        role: str | None = None,
+        threshold: float | None = None,
+    ) -> tuple[dict[str, Any], float] | None:
+        """Returns a stored record for a near-duplicate resume and its similarity.
+
+        The previous analysis only matches when it was made for the same report
+        language and target role.
+        """
+        if threshold is None:
+            threshold = config.ANALYSIS_REUSE_THRESHOLD
+        match = self.index.query(text, language, role, threshold)
+        if match is None:
+            return None
+        analysis_id, similarity = match
+        record = self.get(analysis_id)
+        if record is None:
+            log.warning("Indexed analysis %s is missing from the store", analysis_id)
+            return None
+        return record, similarity
+
+    def search(self, query: str, k: int = 10) -> list[tuple[dict[str, Any], float]]:
+        """Returns the stored records best matching ``query`` with their BM25 scores."""
+        hits = []
+        for analysis_id, score in self.search_index.search(query, k):
+            record = self.get(analysis_id)
+            if record is not None:
+                hits.append((record, score))
+        return hits
+
+
+@functools.lru_cache(maxsize=1)
+def get_store() -> AnalysisStore:
+    """Returns the store at the configured ``ANALYSIS_STORE_PATH``."""
+    return AnalysisStore(config.ANALYSIS_STORE_PATH)
@@ -0,0 +1,153 @@
+"""Streaming analysis: progress events and sections as the model writes them.
+
+:func:`analyze_stream` runs the single-call analysis with a streaming model
+response and yields :class:`Event` objects:
+
+* ``prompted``: the prompt was sent (its estimated tokens, trimmed sections);
+* ``tokens``: more of the response arrived (estimated tokens received so far);
+* ``section``: a top-level member of the analysis JSON is complete, for
+  example ``overall_summary``, parsed from the partial response by
+  :class:`MemberParser`;
+* ``result``: the whole, post-processed analysis (the same dict the
+  non-streaming analysis returns);
+* ``error``: the analysis failed; no ``result`` follows.
+
+:func:`sse` and :func:`ndjson` format events for the wire.
+"""
+
+import json
+import logging
+from typing import Any, Iterator, NamedTuple
+
+from levelup.llm import Stream, stream_text
+from levelup.prompts import get_resume_analysis_prompt
+from levelup.skills import normalize_missing_skills, present_skills
+from levelup.tokens import current_usage, estimate_tokens, fit_to_budget
+
+log = logging.getLogger(__name__)
+
+
+class Event(NamedTuple):
+    event: str
+    data: Any
+
+
+class MemberParser:
+    """Incrementally parses the top-level members of a streamed JSON object.
+
+    :meth:`feed` takes the next chunk of the response and returns the
+    ``(key, value)`` pairs completed by it. Anything before the first ``{``
+    (such as a Markdown code fence) is ignored, as is anything after the
+    object is closed.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = 0  # next character to scan
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = -1  # start of the member being read, -1 before "{"
+        self.done = False
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        if self.done:
+            return []
+        self._buffer += chunk
+        members: list[tuple[str, Any]] = []
+        buffer = self._buffer
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif self._member_start < 0:
+                if char == "{":
+                    self._depth, self._member_start = 1, pos + 1
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    members += self._member(buffer[self._member_start : pos])
+                    self.done = True
+                    break
+            elif char == "," and self._depth == 1:
+                members += self._member(buffer[self._member_start : pos])
+                self._member_start = pos + 1
+        # Drop the scanned text that belongs to no unfinished member.
+        start = self._member_start if self._member_start >= 0 else len(buffer)
+        self._buffer = buffer[start:]
+        self._pos = len(buffer) - start
+        self._member_start = 0 if self._member_start >= 0 else -1
+        return members
+
+    @staticmethod
+    def _member(text: str) -> list[tuple[str, Any]]:
+        if not text.strip():
+            return []
+        try:
+            member = json.loads("{" + text + "}")
+        except json.JSONDecodeError:
+            log.debug(f"Skipping unparsable member: {text[:80]!r}")
+            return []
+        return list(member.items())
+
+
+def analyze_stream(
+    text: str,
+    report_language: str,
+    target_role: str | None = None,
+    stream: Stream = stream_text,
+) -> Iterator[Event]:
+    """Runs the single-call analysis, yielding events as the response streams in."""
+    trim = fit_to_budget(text, report_language, target_role)
+    if (usage := current_usage()) is not None:
+        usage.trim = trim
+    skills = present_skills(trim.text)
+    prompt = get_resume_analysis_prompt(trim.text, report_language, target_role, skills)
+    yield Event(
+        "prompted", {"prompt_tokens": estimate_tokens(prompt), "trimmed": trim.trimmed}
+    )
+
+    parser = MemberParser()
+    result: dict[str, Any] = {}
+    received = 0
+    chunks = stream(prompt)
+    try:
+        for chunk in chunks:
+            received += estimate_tokens(chunk)
+            yield Event("tokens", {"received": received})
+            for name, value in parser.feed(chunk):
+                result[name] = value
+                yield Event("section", {"name": name, "value": value})
+    except Exception as e:
+        log.warning(f"Streaming analysis failed: {e}")
+        yield Event("error", {"detail": f"Error calling LLM: {e}"})
+        return
+    finally:
+        # Frees the model call (and its scheduler slot) if the client went away.
+        if close := getattr(chunks, "close", None):
+            close()
+
+    if not parser.done or not result:
+        yield Event("error", {"detail": "Could not parse the analysis response."})
+        return
+    normalize_missing_skills(result, skills)
+    yield Event("result", result)
+
+
+def sse(event: Event) -> str:
+    """Formats an event as a server-sent event."""
+    return f"event: {event.event}\ndata: {json.dumps(event.data)}\n\n"
+
+
+def ndjson(event: Event) -> str:
+    """Formats an event as one line of newline-delimited JSON."""
+    return json.dumps({"event": event.event, "data": event.data}) + "\n"
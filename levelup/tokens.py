@@ -0,0 +1,278 @@
+"""Prompt token estimation, input budgets and token usage accounting.
+
+:func:`estimate_tokens` is a fast local estimate; with ``TOKEN_COUNT_EXACT``
+the model backend counts the prompt instead. :func:`fit_to_budget` trims the
+resume text so the analysis prompt stays within ``PROMPT_MAX_INPUT_TOKENS``,
+dropping or shortening the least important resume sections first.
+
+Every model call reports its input and output tokens through
+:func:`record_usage`, which feeds the metrics and any :func:`track_usage`
+block active in the calling context.
+"""
+
+import contextvars
+import logging
+import re
+from contextlib import contextmanager
+from typing import Iterator, NamedTuple
+
+from levelup import config, metrics, tracing
+from levelup.prompts import get_resume_analysis_prompt
+from levelup.segmenter import (
+    ENTRY_SECTIONS,
+    Section,
+    drop_boilerplate,
+    segment,
+    split_entries,
+)
+from levelup.skills import present_skills
+
+log = logging.getLogger(__name__)
+
+# Relative importance of resume sections; the lowest are trimmed first.
+SECTION_PRIORITY: dict[str, int] = {
+    "header": 100,
+    "contact": 100,
+    "skills": 96,
+    "experience": 95,
+    "summary": 90,
+    "education": 80,
+    "projects": 70,
+    "certifications": 60,
+    "languages": 50,
+    "awards": 40,
+    "publications": 35,
+    "volunteering": 30,
+    "interests": 10,
+    "references": 5,
+}
+DEFAULT_PRIORITY = 50
+
+# Words, numbers and single punctuation marks; long words cost extra tokens.
+_PIECES = re.compile(r"\w+|[^\w\s]")
+_LONG_WORD = 6
+
+TOKENS = metrics.counter(
+    "levelup_llm_tokens_total",
+    "Tokens sent to and received from the model.",
+    ("direction", "source"),
+)
+CALLS = metrics.counter("levelup_llm_calls_total", "Model calls made.")
+PROMPT_TOKENS = metrics.histogram(
+    "levelup_llm_prompt_tokens",
+    "Input tokens per model call.",
+    buckets=(500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000),
+)
+TRIMMED = metrics.counter(
+    "levelup_prompt_trimmed_total", "Resumes trimmed to fit the input token budget."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the token count of ``text`` without calling the model.
+
+    Every word or punctuation mark counts as one token, plus one for every
+    further six characters of a long word. This lands within about 10-15%
+    of the real count for resume text in Latin scripts.
+    """
+    pieces = _PIECES.findall(text)
+    extra = sum(len(p) // _LONG_WORD for p in pieces if len(p) > _LONG_WORD)
+    return len(pieces) + extra
+
+
+def count_tokens(text: str, exact: bool | None = None) -> int:
+    """Counts the tokens of ``text``, through the backend if ``exact``.
+
+    ``exact`` defaults to ``TOKEN_COUNT_EXACT``. A failing exact count falls
+    back to the local estimate.
+    """
+    if exact is None:
+        exact = config.TOKEN_COUNT_EXACT
+    if exact:
+        from levelup import llm
+
+        try:
+            return llm.count_tokens(text)
+        except Exception as e:
+            log.warning(f"Exact token count failed, estimating instead: {e}")
+    return estimate_tokens(text)
+
+
+class TrimResult(NamedTuple):
+    text: str
+    tokens: int  # estimated tokens of the returned text
+    original_tokens: int
+    trimmed: list[str]  # names of the sections that were shortened or dropped
+
+
+def _truncate(section: Section, max_tokens: int) -> str:
+    if section.name in ENTRY_SECTIONS:
+        # Keep whole jobs or projects rather than the first lines of the last one.
+        entries = split_entries(section.text)
+        kept, used = [], 0
+        for entry in entries:
+            cost = estimate_tokens(entry) + entry.count("\n") + 1
+            if used + cost > max_tokens:
+                break
+            kept.append(entry)
+            used += cost
+        if kept:
+            return "\n".join(kept)
+    kept = []
+    used = 0
+    for line in section.text.split("\n"):
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
+def trim_to_budget(text: str, max_tokens: int) -> TrimResult:
+    """Shortens ``text`` to about ``max_tokens`` by section priority.
+
+    Boilerplate lines (page numbers, "Curriculum Vitae" titles) go first.
+    Then sections are removed from the least important up (and, within a
+    priority, from the end of the document); the section that crosses the
+    budget is cut after its last whole entry (job, project) that fits, or at a
+    line boundary. The remaining sections keep their order.
+    """
+    sections = segment(text)
+    sizes = [estimate_tokens(s.text) + 1 for s in sections]
+    total = original = sum(sizes)
+    if total <= max_tokens:
+        return TrimResult(text, total, original, [])
+    sections = segment(drop_boilerplate(text))
+    sizes = [estimate_tokens(s.text) + 1 for s in sections]
+    total = sum(sizes)
+
+    texts = [s.text for s in sections]
+    trimmed: list[str] = []
+    order = sorted(
+        range(len(sections)),
+        key=lambda i: (SECTION_PRIORITY.get(sections[i].name, DEFAULT_PRIORITY), -i),
+    )
+    for index in order:
+        if total <= max_tokens:
+            break
+        keep = max(sizes[index] - (total - max_tokens), 0)
+        texts[index] = _truncate(sections[index], keep) if keep else ""
+        total -= sizes[index]
+        sizes[index] = estimate_tokens(texts[index]) + 1 if texts[index] else 0
+        total += sizes[index]
+        if sections[index].name not in trimmed:
+            trimmed.append(sections[index].name)
+    return TrimResult("\n".join(t for t in texts if t), total, original, trimmed)
+
+
+def fit_to_budget(
+    text: str,
+    report_language: str,
+    target_role: str | None = None,
+    max_tokens: int | None = None,
+) -> TrimResult:
+    """Trims ``text`` so the analysis prompt fits ``PROMPT_MAX_INPUT_TOKENS``.
+
+    The budget covers the whole prompt, so the instructions around the resume
+    are subtracted first. A budget of 0 disables trimming.
+    """
+    if max_tokens is None:
+        max_tokens = config.PROMPT_MAX_INPUT_TOKENS
+    resume_tokens = estimate_tokens(text)
+    if not max_tokens:
+        return TrimResult(text, resume_tokens, resume_tokens, [])
+
+    skills = present_skills(text)
+    overhead = count_tokens(
+        get_resume_analysis_prompt("", report_language, target_role, skills)
+    )
+    if config.TOKEN_COUNT_EXACT:
+        prompt = get_resume_analysis_prompt(text, report_language, target_role, skills)
+        if count_tokens(prompt) <= max_tokens:
+            return TrimResult(text, resume_tokens, resume_tokens, [])
+    elif overhead + resume_tokens <= max_tokens:
+        return TrimResult(text, resume_tokens, resume_tokens, [])
+
+    result = trim_to_budget(text, max(max_tokens - overhead, 0))
+    TRIMMED.inc()
+    log.info(
+        f"Resume trimmed from ~{result.original_tokens} to ~{result.tokens} tokens "
+        f"to fit the {max_tokens} token budget ({', '.join(result.trimmed)})"
+    )
+    return result
+
+
+class TokenUsage:
+    """Token usage of the model calls made inside a :func:`track_usage` block."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.estimated = False  # True if any call had to be estimated
+        self.trim: TrimResult | None = None
+
+    def add(self, input_tokens: int, output_tokens: int, estimated: bool) -> None:
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.estimated = self.estimated or estimated
+
+    def summary(self) -> str:
+        approx = "~" if self.estimated else ""
+        line = (
+            f"Tokens: {approx}{self.input_tokens} input, {approx}{self.output_tokens} "
+            f"output in {self.calls} call(s)"
+        )
+        if self.trim and self.trim.trimmed:
+            line += (
+                f"; resume trimmed from ~{self.trim.original_tokens} to "
+                f"~{self.trim.tokens} tokens ({', '.join(self.trim.trimmed)})"
+            )
+        return line
+
+
+_usage: contextvars.ContextVar[TokenUsage | None] = contextvars.ContextVar(
+    "levelup_token_usage", default=None
+)
+
+
+@contextmanager
+def track_usage() -> Iterator[TokenUsage]:
+    """Collects the token usage of the calls made in this context.
+
+    Worker threads only report into the block if they run in a copy of the
+    caller's context (``contextvars.copy_context().run``).
+    """
+    usage = TokenUsage()
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def current_usage() -> TokenUsage | None:
+    return _usage.get()
+
+
+def record_usage(
+    input_tokens: int, output_tokens: int, estimated: bool = False
+) -> None:
+    """Records one model call in the metrics and the active usage block."""
+    source = "estimated" if estimated else "reported"
+    CALLS.inc()
+    TOKENS.inc(input_tokens, direction="input", source=source)
+    TOKENS.inc(output_tokens, direction="output", source=source)
+    PROMPT_TOKENS.observe(input_tokens)
+    tracing.set_attributes(
+        **{
+            "llm.input_tokens": input_tokens,
+            "llm.output_tokens": output_tokens,
+            "llm.tokens_estimated": estimated,
+        }
+    )
+    usage = _usage.get()
+    if usage is not None:
+        usage.add(input_tokens, output_tokens, estimated)
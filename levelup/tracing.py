@@ -0,0 +1,403 @@
+"""Tracing of requests, jobs and CLI analyses with head and tail sampling.
+
+A trace is started with :func:`start_trace` around one unit of work (an HTTP
+request, a queued job, a CLI analysis). Inside it, :func:`span` blocks record
+timed, nested spans: the analysis stages of ``levelup.profiling`` (PDF
+extraction, prompt building, model calls with their token counts, JSON
+parsing) and every database query of an engine passed to
+:func:`trace_queries`. Like ``tokens.track_usage``, spans of worker threads
+join the trace if they run in a copy of the caller's context.
+
+Which traces are kept is decided in two steps:
+
+* head sampling: ``TRACE_SAMPLE_RATE`` of the traces are kept whatever happens;
+* tail sampling: the spans of the other traces are still recorded, and the
+  trace is kept if it turns out slower than ``TRACE_SLOW_MS`` or it failed
+  (``TRACE_KEEP_ERRORS``), which are the ones worth debugging.
+
+Kept traces are handed to an exporter. :class:`FileExporter` appends them,
+one JSON object per line, to ``TRACE_FILE`` from a background thread, so
+tracing needs no outside service and never waits for the disk in a request.
+With tracing disabled (``TRACING_ENABLED``), :func:`span` is a single context
+variable lookup.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import secrets
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Iterator
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from levelup import config, metrics
+
+log = logging.getLogger(__name__)
+
+# Spans kept per trace; later ones are only counted, bounding memory per trace.
+MAX_SPANS = 1000
+# Characters of a SQL statement kept as a span attribute.
+MAX_STATEMENT_LENGTH = 300
+
+TRACES = metrics.counter(
+    "levelup_traces_total",
+    "Finished traces, by sampling decision (head, slow, error or dropped).",
+    ("decision",),
+)
+EXPORT_DROPPED = metrics.counter(
+    "levelup_traces_export_dropped_total",
+    "Kept traces dropped because the exporter's queue was full.",
+)
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "start", "duration", "attributes")
+
+    def __init__(self, name: str, parent_id: str | None, attributes: dict[str, Any]):
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self.duration = 0.0
+        self.attributes = attributes
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """The spans recorded for one unit of work."""
+
+    def __init__(self, name: str, sampled: bool, attributes: dict[str, Any]):
+        self.trace_id = secrets.token_hex(16)
+        self.sampled = sampled  # kept by head sampling
+        self.root = Span(name, None, attributes)
+        self.spans: list[Span] = []
+        self.dropped = 0
+        self.error: str | None = None
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            if len(self.spans) < MAX_SPANS:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+    def as_dict(self, decision: str) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "start": round(self.root.start, 6),
+            "duration_ms": round(self.root.duration * 1000, 3),
+            "decision": decision,
+            "error": self.error,
+            "attributes": self.root.attributes,
+            "spans": [span.as_dict() for span in self.spans],
+            "dropped_spans": self.dropped,
+        }
+
+
+# Receives every kept trace as a JSON-serializable dict.
+Exporter = Callable[[dict[str, Any]], None]
+
+
+class FileExporter:
+    """Appends traces to a file as NDJSON, one trace per line.
+
+    Traces are queued and written in batches by a daemon thread, so exporting
+    from ``TraceMiddleware`` does not block the event loop. When ``max_queued``
+    traces are waiting, new ones are dropped and counted. :meth:`flush` waits
+    for the queued traces, and runs at interpreter exit.
+    """
+
+    def __init__(self, path: Path | str, max_queued: int = 1000):
+        self.path = Path(path)
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue(max_queued)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def __call__(self, trace: dict[str, Any]) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            EXPORT_DROPPED.inc()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="trace-exporter", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 100:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                log.warning(f"Could not export {len(batch)} traces: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, traces: list[dict[str, Any]]) -> None:
+        lines = "".join(
+            json.dumps(trace, ensure_ascii=False, default=str) + "\n"
+            for trace in traces
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def flush(self) -> None:
+        """Waits until the queued traces are written."""
+        self._queue.join()
+
+
+class Tracer:
+    """Starts traces and decides which ones are exported."""
+
+    def __init__(
+        self,
+        exporter: Exporter,
+        sample_rate: float = 0.01,
+        slow_ms: float = 0.0,
+        keep_errors: bool = True,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.keep_errors = keep_errors
+        self._rng = rng
+
+    @property
+    def tail_sampling(self) -> bool:
+        return self.slow_ms > 0 or self.keep_errors
+
+    def decide(self, trace: Trace) -> str:
+        if trace.sampled:
+            return "head"
+        if trace.error is not None and self.keep_errors:
+            return "error"
+        if self.slow_ms > 0 and trace.root.duration * 1000 >= self.slow_ms:
+            return "slow"
+        return "dropped"
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Trace | None]:
+        sampled = self._rng() < self.sample_rate
+        if not sampled and not self.tail_sampling:
+            TRACES.inc(decision="dropped")
+            yield None
+            return
+        trace = Trace(name, sampled, attributes)
+        trace_token = _trace.set(trace)
+        span_token = _span.set(trace.root)
+        started = time.perf_counter()
+        try:
+            yield trace
+        except BaseException as e:
+            trace.error = trace.error or f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            trace.root.duration = time.perf_counter() - started
+            _span.reset(span_token)
+            _trace.reset(trace_token)
+            self.finish(trace)
+
+    def finish(self, trace: Trace) -> None:
+        decision = self.decide(trace)
+        TRACES.inc(decision=decision)
+        if decision == "dropped":
+            return
+        try:
+            self.exporter(trace.as_dict(decision))
+        except Exception as e:
+            log.warning(f"Could not export trace {trace.trace_id}: {e}")
+
+
+_trace: contextvars.ContextVar[Trace | None] = contextvars.ContextVar(
+    "levelup_trace", default=None
+)
+_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "levelup_span", default=None
+)
+_NOT_TRACED = nullcontext()
+
+_tracer: Tracer | None = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer | None:
+    """Returns the process-wide tracer, or None when ``TRACING_ENABLED`` is off."""
+    global _tracer
+    if not config.TRACING_ENABLED:
+        return None
+    with _tracer_lock:
+        if _tracer is None:
+            path = config.TRACE_FILE or os.path.join(
+                config.ANALYSIS_STORE_PATH, "traces.ndjson"
+            )
+            _tracer = Tracer(
+                FileExporter(path),
+                sample_rate=config.TRACE_SAMPLE_RATE,
+                slow_ms=config.TRACE_SLOW_MS,
+                keep_errors=config.TRACE_KEEP_ERRORS,
+            )
+    return _tracer
+
+
+def start_trace(name: str, **attributes: Any) -> ContextManager[Trace | None]:
+    """Traces the block as one unit of work (nothing if tracing is off or nested)."""
+    tracer = get_tracer()
+    if tracer is None or _trace.get() is not None:
+        return nullcontext()
+    return tracer.trace(name, **attributes)
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+@contextmanager
+def _span_block(trace: Trace, name: str, attributes: dict[str, Any]) -> Iterator[Span]:
+    parent = _span.get()
+    span = Span(name, parent.span_id if parent else None, attributes)
+    # Restored rather than reset: a streamed response resumes a generator in
+    # a different copy of the context, where the reset token is not valid.
+    _span.set(span)
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException as e:
+        span.attributes["error"] = f"{type(e).__name__}: {e}"
+        trace.error = trace.error or span.attributes["error"]
+        raise
+    finally:
+        span.duration = time.perf_counter() - started
+        _span.set(parent)
+        trace.add(span)
+
+
+def span(name: str, **attributes: Any) -> ContextManager[Span | None]:
+    """Records the block as a span of the current trace, if there is one."""
+    trace = _trace.get()
+    if trace is None:
+        return _NOT_TRACED
+    return _span_block(trace, name, attributes)
+
+
+def record_span(name: str, seconds: float, **attributes: Any) -> None:
+    """Records a span that ended just now, timed by the caller, if tracing."""
+    if (trace := _trace.get()) is None:
+        return
+    parent = _span.get()
+    span = Span(name, parent.span_id if parent else None, attributes)
+    span.start -= seconds
+    span.duration = seconds
+    trace.add(span)
+
+
+def mark_error(message: str) -> None:
+    """Marks the current trace as failed when the error was handled, not raised."""
+    if (trace := _trace.get()) is not None:
+        trace.error = trace.error or message
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Sets attributes on the innermost open span, if tracing."""
+    if _trace.get() is not None and (current := _span.get()) is not None:
+        current.set(**attributes)
+
+
+def trace_queries(engine: Engine) -> None:
+    """Records the queries run on ``engine`` as ``db_query`` spans."""
+
+    def before(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if (trace := _trace.get()) is None:
+            return
+        block = _span_block(
+            trace,
+            "db_query",
+            {"db.statement": statement[:MAX_STATEMENT_LENGTH]},
+        )
+        block.__enter__()
+        conn.info.setdefault("levelup_spans", []).append(block)
+
+    def after(conn: Any, cursor: Any, *args: Any) -> None:
+        if blocks := conn.info.get("levelup_spans"):
+            set_attributes(**{"db.rows": getattr(cursor, "rowcount", -1)})
+            blocks.pop().__exit__(None, None, None)
+
+    def failed(context: Any) -> None:
+        conn = context.connection
+        if conn is not None and (blocks := conn.info.get("levelup_spans")):
+            error = context.original_exception
+            blocks.pop().__exit__(type(error), error, None)
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    event.listen(engine, "handle_error", failed)
+
+
+class TraceMiddleware:
+    """ASGI middleware tracing every HTTP request, including streamed bodies.
+
+    Responses with a 5xx status count as failed traces for tail sampling.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        with start_trace(
+            f"{method} {path}", **{"http.method": method, "http.path": path}
+        ) as trace:
+            if trace is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    trace.root.set(**{"http.status_code": status})
+                    if status >= 500:
+                        trace.error = trace.error or f"HTTP {status}"
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,302 @@
+"""Bulk export and import of analyses as (compressed) NDJSON.
+
+:func:`export_ndjson` streams the ``analysis`` table through a server-side
+cursor, one JSON record per line, so memory use does not grow with the number
+of rows. The analyses the app keeps in its file store (``levelup.store``) are
+merged into the same stream, in creation order, so an export covers both.
+
+:func:`import_records` loads records with PostgreSQL's ``COPY`` protocol: rows
+are streamed into a temporary table and merged with ``INSERT ... ON CONFLICT
+DO NOTHING``, which makes imports repeatable. Other databases fall back to
+batched inserts.
+
+:func:`read_records` accepts NDJSON exports, analysis store records and the
+bare JSON reports written by ``levelup analyze -o``, optionally gzipped, and
+directories of them.
+"""
+
+import csv
+import gzip
+import hashlib
+import heapq
+import io
+import json
+import logging
+import os
+from contextlib import closing, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, NamedTuple
+
+from sqlalchemy import Engine, Insert, Table, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from levelup.models import Analysis
+from levelup.store import AnalysisStore
+
+log = logging.getLogger(__name__)
+
+COLUMNS = ("id", "created_at", "language", "role", "text_sha256", "result")
+_SUFFIXES = (".json", ".ndjson", ".jsonl", ".json.gz", ".ndjson.gz", ".jsonl.gz")
+
+
+def _table() -> Table:
+    return Analysis.__table__  # type: ignore[return-value]
+
+
+def open_text(path: Path | str, mode: str = "rt") -> IO[str]:
+    """Opens ``path`` as UTF-8 text, gzip-compressed if it ends in ``.gz``."""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8", compresslevel=6)  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:  # SQLite does not keep the offset
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _database_rows(
+    engine: Engine | Session, since: datetime | None, batch_size: int
+) -> Iterator[dict[str, Any]]:
+    table = _table()
+    statement = select(*(table.c[name] for name in COLUMNS)).order_by(
+        table.c.created_at, table.c.id
+    )
+    if since is not None:
+        statement = statement.where(table.c.created_at >= since)
+    connect = (
+        nullcontext(engine.connection())
+        if isinstance(engine, Session)
+        else engine.connect()
+    )
+    with connect as conn:
+        rows = conn.execution_options(
+            stream_results=True, yield_per=batch_size
+        ).execute(statement)
+        for row in rows:
+            record = dict(row._mapping)
+            record["created_at"] = _utc(record["created_at"])
+            yield record
+
+
+def _store_rows(
+    store: AnalysisStore, since: datetime | None
+) -> tuple[set[str], Iterator[dict[str, Any]]]:
+    """Returns the ids of the store's records and the records in creation order.
+
+    Only the creation time and path of each record are held in memory; the
+    records are read again one at a time as they are written out.
+    """
+    entries = []
+    paths = store.analyses_dir.glob("*.json") if store.analyses_dir.exists() else []
+    for path in paths:
+        try:
+            record = _record(json.loads(path.read_text(encoding="utf-8")), path)
+        except (ValueError, TypeError, AttributeError, OSError) as e:
+            log.warning(f"Skipping {path}: {e}")
+            continue
+        created = _utc(record["created_at"])
+        if since is None or created >= since:
+            entries.append((created, record["id"], path))
+    entries.sort()
+
+    def rows() -> Iterator[dict[str, Any]]:
+        for created, _, path in entries:
+            record = _record(json.loads(path.read_text(encoding="utf-8")), path)
+            record["created_at"] = created
+            yield record
+
+    return {analysis_id for _, analysis_id, _ in entries}, rows()
+
+
+def export_ndjson(
+    engine: Engine | Session | None,
+    out: IO[str],
+    since: datetime | None = None,
+    batch_size: int = 1000,
+    store: AnalysisStore | None = None,
+) -> int:
+    """Writes the stored analyses to ``out`` as NDJSON and returns how many.
+
+    ``engine`` may be a session, e.g. one in ``read_only`` to read from a
+    replica. Rows of the ``analysis`` table (unless it is None) are fetched
+    ``batch_size`` at a time from a server-side cursor and merged with the
+    records of ``store``, if given, in creation order. A record that is in
+    both is written once.
+    """
+    streams: list[Iterator[dict[str, Any]]] = []
+    store_ids: set[str] = set()
+    if store is not None:
+        store_ids, store_rows = _store_rows(store, since)
+        streams.append(store_rows)
+    if engine is not None:
+        streams.append(
+            row
+            for row in _database_rows(engine, since, batch_size)
+            if row["id"] not in store_ids
+        )
+    count = 0
+    for record in heapq.merge(*streams, key=lambda r: (r["created_at"], r["id"])):
+        record["created_at"] = record["created_at"].isoformat()
+        out.write(_dumps(record) + "\n")
+        count += 1
+    return count
+
+
+def _record(data: dict[str, Any], path: Path) -> dict[str, Any]:
+    """Normalizes an exported/stored record or a bare analysis report."""
+    if "result" not in data:
+        # A report written by "levelup analyze -o": identified by its content.
+        created = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+        digest = hashlib.sha256(_dumps(data).encode("utf-8")).hexdigest()[:32]
+        data = {"id": digest, "created_at": created.isoformat(), "result": data}
+    if not isinstance(data.get("result"), dict) or not data.get("id"):
+        raise ValueError("not an analysis record")
+    record = {name: data.get(name) for name in COLUMNS}
+    created_at = record["created_at"] or datetime.now(timezone.utc).isoformat()
+    record["created_at"] = datetime.fromisoformat(created_at)
+    return record
+
+
+def read_records(
+    paths: Iterable[Path], errors: list[str] | None = None
+) -> Iterator[dict[str, Any]]:
+    """Yields the analysis records in JSON/NDJSON files and directories.
+
+    Invalid records are skipped and described in ``errors``, if given.
+    """
+    for path in paths:
+        if path.is_dir():
+            files = sorted(p for p in path.rglob("*") if p.name.endswith(_SUFFIXES))
+            yield from read_records(files, errors)
+            continue
+        ndjson = not path.name.removesuffix(".gz").endswith(".json")
+        with open_text(path) as f:
+            if ndjson:
+                items: Iterable[tuple[int, str]] = enumerate(f, 1)
+            else:
+                loaded = json.load(f)
+                items = [
+                    (i, _dumps(d))
+                    for i, d in enumerate(
+                        loaded if isinstance(loaded, list) else [loaded], 1
+                    )
+                ]
+            for number, line in items:
+                if not line.strip():
+                    continue
+                try:
+                    yield _record(json.loads(line), path)
+                except (ValueError, TypeError, AttributeError) as e:
+                    log.warning(f"Skipping {path}:{number}: {e}")
+                    if errors is not None:
+                        errors.append(f"{path}:{number}: {e}")
+
+
+class _CopyReader:
+    """A file-like object feeding CSV rows to ``COPY ... FROM STDIN`` on demand.
+
+    Each read returns the next batch of rows whatever size was asked for;
+    psycopg2 sends every chunk as it is returned.
+    """
+
+    def __init__(self, records: Iterator[dict[str, Any]], batch_size: int):
+        self.rows = 0
+        self._records = records
+        self._batch_size = batch_size
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+
+    def _chunk(self) -> str:
+        batch = [r for _, r in zip(range(self._batch_size), self._records)]
+        self.rows += len(batch)
+        self._writer.writerows(
+            [
+                r["id"],
+                r["created_at"].isoformat(),
+                r["language"],
+                r["role"],
+                r["text_sha256"],
+                _dumps(r["result"]),
+            ]
+            for r in batch
+        )
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def read(self, size: int = -1) -> str:
+        if size < 0:
+            return "".join(iter(self._chunk, ""))
+        return self._chunk()
+
+
+class ImportResult(NamedTuple):
+    read: int
+    inserted: int
+
+
+def _copy_import(
+    engine: Engine, records: Iterator[dict[str, Any]], batch_size: int
+) -> ImportResult:
+    table = _table()
+    target = f"{table.schema}.{table.name}" if table.schema else table.name
+    columns = ", ".join(COLUMNS)
+    reader = _CopyReader(records, batch_size)
+    with engine.begin() as conn, closing(conn.connection.cursor()) as cursor:
+        cursor.execute(
+            f"CREATE TEMP TABLE analysis_import (LIKE {target} INCLUDING DEFAULTS) "
+            "ON COMMIT DROP"
+        )
+        cursor.copy_expert(
+            f"COPY analysis_import ({columns}) FROM STDIN WITH (FORMAT csv)",
+            reader,
+        )
+        cursor.execute(
+            f"INSERT INTO {target} ({columns}) SELECT {columns} FROM analysis_import "
+            "ON CONFLICT (id) DO NOTHING"
+        )
+        inserted = cursor.rowcount
+    return ImportResult(reader.rows, inserted)
+
+
+def _insert_import(
+    engine: Engine, records: Iterator[dict[str, Any]], batch_size: int
+) -> ImportResult:
+    table = _table()
+    dialect = engine.dialect.name
+    statement: Insert
+    if dialect == "sqlite":
+        statement = sqlite.insert(table).on_conflict_do_nothing()
+    elif dialect == "postgresql":
+        statement = postgresql.insert(table).on_conflict_do_nothing()
+    else:
+        statement = insert(table)
+    read = inserted = 0
+    with engine.begin() as conn:
+        while batch := [r for _, r in zip(range(batch_size), records)]:
+            read += len(batch)
+            inserted += conn.execute(statement, batch).rowcount
+    return ImportResult(read, inserted)
+
+
+def import_records(
+    engine: Engine, records: Iterable[dict[str, Any]], batch_size: int = 5000
+) -> ImportResult:
+    """Loads records into the ``analysis`` table, skipping ids already present.
+
+    Uses ``COPY`` on PostgreSQL (psycopg2) and batched inserts elsewhere. The
+    import is one transaction: it is loaded completely or not at all.
+    """
+    records = iter(records)
+    if engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2":
+        return _copy_import(engine, records, batch_size)
+    return _insert_import(engine, records, batch_size)
@@ -0,0 +1,189 @@
+"""Analysis workers for the durable job queue.
+
+A :class:`Worker` runs up to ``concurrency`` jobs at a time in threads. Its
+main loop claims as many due jobs as it has free slots, extends the leases
+of the running jobs every third of the lease, requeues jobs whose worker
+died, and sleeps ``WORKER_POLL_SECONDS`` when the queue is empty. On stop it
+claims nothing more and waits for the running jobs to finish.
+
+Adding machines running ``levelup worker`` scales throughput: each claims
+its own jobs from the shared table. Jobs make their model calls in the
+scheduler's ``bulk`` lane, for the organization named in their payload.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from levelup import config, metrics
+from levelup.jobs import JobQueue
+from levelup.scheduler import BULK, use_lane
+from levelup.tracing import mark_error, start_trace
+
+log = logging.getLogger(__name__)
+
+# A handler receives the job's payload and returns its (JSON) result.
+Handler = Callable[[dict[str, Any]], dict[str, Any] | None]
+
+JOB_SECONDS = metrics.histogram(
+    "levelup_job_duration_seconds",
+    "Time spent running jobs, by kind.",
+    ("kind",),
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300),
+)
+RUNNING_JOBS = metrics.gauge(
+    "levelup_worker_running_jobs", "Jobs running in this worker process."
+)
+
+
+def run_analysis(payload: dict[str, Any]) -> dict[str, Any]:
+    """Handler of ``analysis`` jobs: analyzes ``payload["text"]``.
+
+    The result is also kept in the analysis store when the payload asks for
+    it (``"save": true``).
+    """
+    from levelup.sections import analyze
+    from levelup.singleflight import analysis_flight, analysis_key
+    from levelup.store import get_store
+
+    text = payload["text"]
+    language = payload.get("language", "English")
+    role = payload.get("role")
+    concurrent = payload.get("concurrent")
+    result = analysis_flight.do(
+        analysis_key(text, language, role, f"job:{concurrent}"),
+        lambda: analyze(text, language, role, concurrent),
+    )
+    if payload.get("save"):
+        result["_analysis_id"] = get_store().save(result, text, language, role)
+    return result
+
+
+HANDLERS: dict[str, Handler] = {"analysis": run_analysis}
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Worker:
+    """Claims jobs from a :class:`JobQueue` and runs them concurrently."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: dict[str, Handler] | None = None,
+        concurrency: int | None = None,
+        worker_id: str | None = None,
+        poll_seconds: float | None = None,
+        reap_seconds: float = 30.0,
+    ):
+        self.queue = queue
+        self.handlers = HANDLERS if handlers is None else handlers
+        self.concurrency = max(1, concurrency or config.WORKER_CONCURRENCY)
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_seconds = (
+            config.WORKER_POLL_SECONDS if poll_seconds is None else poll_seconds
+        )
+        self.reap_seconds = reap_seconds
+        self.heartbeat_seconds = queue.lease.total_seconds() / 3
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._running: dict[int, Future[None]] = {}
+        self._lock = threading.Lock()
+
+    def stop(self) -> None:
+        """Stops claiming jobs; :meth:`run` returns once running jobs finish."""
+        self._stop.set()
+        self._wake.set()
+
+    def _execute(self, job: dict[str, Any]) -> None:
+        kind = job["kind"]
+        with start_trace(
+            f"job {kind}", **{"job.id": job["id"], "job.attempt": job["attempts"]}
+        ):
+            self._run_job(job)
+
+    def _run_job(self, job: dict[str, Any]) -> None:
+        kind = job["kind"]
+        started = time.perf_counter()
+        try:
+            handler = self.handlers[kind]
+            with use_lane(BULK, job["payload"].get("organization")):
+                result = handler(job["payload"])
+        except Exception as e:
+            log.warning(f"Job {job['id']} ({kind}) failed: {e}")
+            error = "".join(traceback.format_exception_only(type(e), e)).strip()
+            mark_error(error)
+            self.queue.fail(job["id"], self.worker_id, error)
+        else:
+            if not self.queue.complete(job["id"], self.worker_id, result):
+                log.warning(f"Job {job['id']} finished after losing its lease")
+        finally:
+            JOB_SECONDS.observe(time.perf_counter() - started, kind=kind)
+            with self._lock:
+                self._running.pop(job["id"], None)
+            self._wake.set()
+
+    def run_once(self, pool: ThreadPoolExecutor) -> int:
+        """Claims jobs for the free slots and starts them; returns how many."""
+        with self._lock:
+            free = self.concurrency - len(self._running)
+        if free <= 0 or self._stop.is_set():
+            return 0
+        jobs = self.queue.claim(self.worker_id, free, kinds=self.handlers)
+        for job in jobs:
+            with self._lock:
+                self._running[job["id"]] = pool.submit(self._execute, job)
+        return len(jobs)
+
+    def _heartbeat(self) -> None:
+        with self._lock:
+            ids = set(self._running)
+        if ids:
+            held = self.queue.heartbeat(self.worker_id, ids)
+            with self._lock:
+                # Jobs that finished meanwhile were settled, not lost.
+                lost = (ids - held) & set(self._running)
+            if lost:
+                log.warning(f"Lost the lease of job(s) {sorted(lost)}")
+
+    def run(self) -> None:
+        """Runs jobs until :meth:`stop` is called."""
+        log.info(
+            f"Worker {self.worker_id} started with {self.concurrency} slot(s) "
+            f"for {', '.join(self.handlers)}"
+        )
+        RUNNING_JOBS.set_function(lambda: len(self._running))
+        last_heartbeat = last_reap = 0.0
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="levelup-job"
+        ) as pool:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                try:
+                    if now - last_reap >= self.reap_seconds:
+                        self.queue.reap()
+                        last_reap = now
+                    if now - last_heartbeat >= self.heartbeat_seconds:
+                        self._heartbeat()
+                        last_heartbeat = now
+                    claimed = self.run_once(pool)
+                except Exception as e:
+                    log.error(f"Worker loop error: {e}")
+                    claimed = 0
+                self._wake.clear()
+                if not claimed:
+                    self._wake.wait(min(self.poll_seconds, self.heartbeat_seconds))
+
+            # Keep the leases of the jobs that are still finishing.
+            while self._running:
+                self._heartbeat()
+                self._wake.wait(self.heartbeat_seconds)
+                self._wake.clear()
+        log.info(f"Worker {self.worker_id} stopped")
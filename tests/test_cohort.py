@@ -0,0 +1,118 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from levelup.cohort import (
+    NO_ROLE,
+    build_frames,
+    competency_heatmap,
+    export_parquet,
+    load_records,
+    score_distribution,
+    score_histogram,
+    skill_gap_frequency,
+)
+
+
+def _record(cid: str, role: str | None, score: int, skills: list[str]) -> dict:
+    return {
+        "id": cid,
+        "role": role,
+        "language": "English",
+        "result": {
+            "domain_scores": [{"domain": "IT", "score": score}],
+            "competency_scores": [
+                {"category": "Communication", "score": score - 10},
+                {"category": "Leadership", "score": "60"},
+            ],
+            "missing_skills": [
+                {"skill": s, "priority": "critical" if i == 0 else "Important"}
+                for i, s in enumerate(skills)
+            ],
+            "overall_summary": {
+                "overall_score": score,
+                "role_suitability": [{"role": role or "Analyst", "score": score}],
+            },
+        },
+    }
+
+
+RECORDS = [
+    _record("a", "Data Engineer", 80, ["Terraform", "Kafka"]),
+    _record("b", "Data Engineer", 60, ["Terraform"]),
+    _record("c", "Data Engineer", 100, []),
+    _record("d", None, 50, ["Figma"]),
+]
+
+
+def test_build_frames_flattens_records() -> None:
+    frames = build_frames(RECORDS)
+
+    assert list(frames.candidates["id"]) == ["a", "b", "c", "d"]
+    assert frames.candidates.loc[3, "role"] == NO_ROLE
+    assert len(frames.competencies) == 8
+    assert frames.competencies["score"].dtype.kind == "i"
+    assert list(frames.missing_skills["priority"].astype(str)) == [
+        "Critical",
+        "Important",
+        "Critical",
+        "Critical",
+    ]
+
+
+def test_build_frames_skips_malformed_entries() -> None:
+    record = _record("e", "Analyst", 70, ["SQL"])
+    result = record["result"]
+    result["domain_scores"].append("IT: 80")
+    result["competency_scores"].append(None)
+    result["missing_skills"].insert(0, ["Go", "Critical"])
+    malformed = [
+        record,
+        {"id": "f", "result": {"overall_summary": "strong", "domain_scores": "IT"}},
+        {"id": "g", "result": ["not", "a", "dict"]},
+    ]
+
+    frames = build_frames(malformed)
+
+    assert list(frames.candidates["id"]) == ["e", "f", "g"]
+    assert frames.candidates["overall_score"].isna().tolist() == [False, True, True]
+    assert len(frames.domains) == 1
+    assert len(frames.competencies) == 2
+    assert list(frames.missing_skills["skill"]) == ["SQL"]
+
+
+def test_skill_gap_frequency_by_role() -> None:
+    gaps = skill_gap_frequency(build_frames(RECORDS))
+
+    terraform = gaps[(gaps["role"] == "Data Engineer") & (gaps["skill"] == "Terraform")]
+    assert terraform.iloc[0]["candidates"] == 2
+    assert terraform.iloc[0]["critical"] == 2
+    assert terraform.iloc[0]["share"] == 2 / 3
+
+
+def test_score_aggregates() -> None:
+    frames = build_frames(RECORDS)
+
+    distribution = score_distribution(frames, percentiles=[0.5])
+    assert distribution.loc["Data Engineer", "p50"] == 80
+    assert distribution.loc["Data Engineer", "count"] == 3
+
+    histogram = score_histogram(frames, bin_width=50)
+    assert histogram.loc[50, "Data Engineer"] == 3
+
+    heatmap = competency_heatmap(frames)
+    assert heatmap.loc["Data Engineer", "Communication"] == 70
+
+
+def test_load_records_and_export(tmp_path: Path) -> None:
+    (tmp_path / "stored.json").write_text(json.dumps(RECORDS[0]))
+    (tmp_path / "bare.json").write_text(json.dumps(RECORDS[1]["result"]))
+
+    records = load_records(sorted(tmp_path.glob("*.json")))
+    assert [r["id"] for r in records] == ["bare", "a"]
+
+    written = export_parquet(build_frames(records), tmp_path / "out")
+    candidates = pd.read_parquet(tmp_path / "out" / "candidates.parquet")
+    assert len(written) == 5
+    assert list(candidates["id"]) == ["bare", "a"]
@@ -0,0 +1,94 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+from fastapi import FastAPI, HTTPException
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    create_engine,
+    event,
+    func,
+    select,
+)
+from sqlalchemy.orm import sessionmaker
+
+from levelup.database.core import DbSession, SessionTracker
+from levelup.database.middleware import DBSessionMiddleware
+
+metadata = MetaData()
+item = Table("item", metadata, Column("id", Integer, primary_key=True))
+
+
+def _app(tmp_path: Path) -> tuple[Any, Any]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    metadata.create_all(engine)
+    app = FastAPI()
+
+    @app.get("/health")
+    def health() -> dict[str, str]:
+        return {"status": "healthy"}
+
+    @app.post("/items")
+    def create(db: DbSession) -> dict[str, int]:
+        db.execute(item.insert())
+        return {"count": db.scalar(select(func.count()).select_from(item))}
+
+    @app.post("/fail")
+    def fail(db: DbSession) -> None:
+        db.execute(item.insert())
+        raise HTTPException(status_code=409)
+
+    app.add_middleware(DBSessionMiddleware, session_factory=sessionmaker(engine))
+    return app, engine
+
+
+def _request(app: Any, method: str, path: str) -> int:
+    messages: list[dict[str, Any]] = []
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+        "scheme": "http",
+        "server": ("test", 80),
+        "client": ("test", 1234),
+        "http_version": "1.1",
+        "root_path": "",
+    }
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return int(messages[0]["status"])
+
+
+def test_session_is_only_opened_when_used(tmp_path: Path) -> None:
+    app, engine = _app(tmp_path)
+    checkouts: list[object] = []
+    event.listen(engine, "checkout", lambda *args: checkouts.append(args))
+
+    assert _request(app, "GET", "/health") == 200
+    assert checkouts == []
+    assert SessionTracker.get_active_sessions() == []
+
+
+def test_session_is_committed_or_rolled_back_and_released(tmp_path: Path) -> None:
+    app, engine = _app(tmp_path)
+
+    assert _request(app, "POST", "/items") == 200
+    assert _request(app, "POST", "/fail") == 409
+    assert _request(app, "POST", "/items") == 200
+
+    with engine.connect() as connection:
+        assert connection.scalar(select(func.count()).select_from(item)) == 2
+    assert engine.pool.checkedout() == 0
+    assert SessionTracker.get_active_sessions() == []
@@ -0,0 +1,126 @@
+from pathlib import Path
+
+from levelup.dedup import DuplicateIndex, normalize_text
+from levelup.store import AnalysisStore
+
+RESUME = """
+Jane Doe - jane.doe@example.com - +1 (555) 123-4567
+Senior Data Engineer with eight years of experience building batch and
+streaming pipelines on Spark, Kafka and Airflow. Designed a lakehouse on
+Delta Lake serving analytics for the finance and marketing departments.
+Led a team of four engineers and introduced data contracts, automated
+quality checks and cost monitoring for the cloud warehouse.
+Education: MSc Computer Science, Technical University of Munich.
+Skills: Python, Scala, SQL, dbt, Terraform, Kubernetes, AWS, GCP.
+"""
+
+RESUBMITTED = (
+    RESUME.replace("+1 (555) 123-4567", "+49 151 2345 6789")
+    + "Mentored two junior engineers through their first production launch.\n"
+)
+
+OTHER = """
+John Smith, UX Designer. Ten years designing mobile banking apps and design
+systems in Figma. Ran usability studies, accessibility audits and workshops
+with product managers. Education: BA Graphic Design. Skills: Figma, Sketch,
+prototyping, user research, interaction design, illustration.
+"""
+
+
+def test_normalize_text_drops_contact_details() -> None:
+    normalized = normalize_text("Call +1 (555) 123-4567 or mail a@b.com, see www.x.io")
+
+    assert normalized == "call or mail see"
+
+
+def test_duplicate_index_finds_resubmitted_resume() -> None:
+    index = DuplicateIndex()
+    index.add("first", RESUME, "English", "Data Engineer")
+    index.add("other", OTHER, "English", "Data Engineer")
+
+    match = index.query(RESUBMITTED, "English", "Data Engineer")
+
+    assert match is not None
+    assert match[0] == "first"
+    assert match[1] >= 0.8
+
+
+def test_duplicate_index_requires_same_language_and_role() -> None:
+    index = DuplicateIndex()
+    index.add("first", RESUME, "English", "Data Engineer")
+
+    assert index.query(RESUME, "German", "Data Engineer") is None
+    assert index.query(RESUME, "English", None) is None
+    assert index.query(OTHER, "English", "Data Engineer") is None
+
+
+def test_duplicate_index_remove_and_persistence(tmp_path: Path) -> None:
+    index = DuplicateIndex()
+    index.add("first", RESUME, "English", None)
+    index.add("other", OTHER, "English", None)
+    assert index.remove("other")
+    assert not index.remove("other")
+
+    index.save(tmp_path / "index.npz")
+    loaded = DuplicateIndex.load(tmp_path / "index.npz")
+
+    assert len(loaded) == 1
+    assert loaded.query(RESUBMITTED, "English", None) is not None
+    assert loaded.query(OTHER, "English", None) is None
+
+
+def test_empty_index_round_trips(tmp_path: Path) -> None:
+    DuplicateIndex().save(tmp_path / "index.npz")
+    loaded = DuplicateIndex.load(tmp_path / "index.npz")
+    assert len(loaded) == 0
+    assert loaded.query(RESUME, "English", None) is None
+
+    store = AnalysisStore(tmp_path / "store")
+    store._index.compact_every = 2
+    analysis_id = store.save({}, RESUME, "English", None)
+    assert store.delete(analysis_id)  # compacts into an empty base
+
+    reopened = AnalysisStore(tmp_path / "store")
+    assert len(reopened.index) == 0
+    assert reopened.find_similar(RESUME, "English", None) is None
+
+
+def test_store_reuses_analysis_for_near_duplicate(tmp_path: Path) -> None:
+    store = AnalysisStore(tmp_path)
+    result = {"language": "English", "overall_summary": {"overall_score": 80}}
+    analysis_id = store.save(result, RESUME, "English", "Data Engineer")
+
+    reopened = AnalysisStore(tmp_path)
+    match = reopened.find_similar(RESUBMITTED, "English", "Data Engineer")
+
+    assert match is not None
+    record, _ = match
+    assert record["id"] == analysis_id
+    assert record["result"] == result
+
+    assert reopened.delete(analysis_id)
+    assert reopened.find_similar(RESUME, "English", "Data Engineer") is None
+
+
+def test_stores_sharing_a_directory_see_each_others_analyses(tmp_path: Path) -> None:
+    stores = [AnalysisStore(tmp_path) for _ in range(3)]
+    for store in stores:
+        store._index.compact_every = 8
+    result = {"overall_summary": {"overall_score": 50}}
+
+    ids = [
+        store.save(result, f"{OTHER} {n} {i}", "English")
+        for i in range(10)
+        for n, store in enumerate(stores)
+    ]
+
+    assert stores[0].delete(ids[0])
+    for store in [*stores, AnalysisStore(tmp_path)]:
+        assert len(store.index) == 29 and ids[0] not in store.index
+        assert all(analysis_id in store.index for analysis_id in ids[1:])
+    # 31 segments, compacted every 8: the base and the last 7 segments remain
+    names = sorted(path.name for path in (tmp_path / "dedup").glob("[0-9b]*"))
+    assert names[0] == "0000000025.npz" and names[-2:] == [
+        "0000000031.del",
+        "base-0000000024.npz",
+    ]
@@ -0,0 +1,86 @@
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from levelup.health import (
+    DegradedError,
+    HealthChecker,
+    database_check,
+    queue_depth_check,
+)
+
+
+def test_report_is_cached_and_refreshed_in_background() -> None:
+    now = [0.0]
+    calls: list[float] = []
+    refreshed = threading.Event()
+
+    def check() -> str:
+        calls.append(now[0])
+        if len(calls) > 1:
+            refreshed.set()
+        return "fine"
+
+    checker = HealthChecker(ttl=10, clock=lambda: now[0])
+    checker.register("db", check, critical=True)
+
+    first = checker.report()
+    assert first.status == "healthy"
+    now[0] = 5
+    assert checker.report() is first
+    assert len(calls) == 1
+
+    # Stale: served from cache while a single refresh runs in the background.
+    now[0] = 11
+    assert checker.report() is first
+    assert refreshed.wait(2)
+    for _ in range(100):
+        if checker.report() is not first:
+            break
+        time.sleep(0.01)
+    assert len(calls) == 2
+    assert checker.report().as_dict()["checks"]["db"]["detail"] == "fine"
+
+
+def test_status_combines_critical_and_degraded_checks() -> None:
+    def down() -> str:
+        raise ConnectionError("refused")
+
+    checker = HealthChecker()
+    checker.register("queue", queue_depth_check(lambda: 50, warn=10))
+    assert checker.run_checks().status == "degraded"
+
+    checker.register("llm", down)
+    report = checker.run_checks().as_dict()
+    assert report["status"] == "degraded"
+    assert report["checks"]["llm"]["detail"] == "ConnectionError: refused"
+    assert report["checks"]["queue"] == {
+        "status": "degraded",
+        "critical": False,
+        "latency_ms": report["checks"]["queue"]["latency_ms"],
+        "detail": "50 queued (warning at 10)",
+    }
+
+    checker.register("db", down, critical=True)
+    assert checker.run_checks().status == "unhealthy"
+
+
+def test_slow_check_times_out(tmp_path: Path) -> None:
+    release = threading.Event()
+
+    def hang() -> str:
+        release.wait(5)
+        raise DegradedError("late")
+
+    checker = HealthChecker(timeout=0.1)
+    checker.register("db", database_check(create_engine(f"sqlite:///{tmp_path}/h.db")))
+    checker.register("llm", hang)
+    started = time.perf_counter()
+    report = checker.run_checks()
+    release.set()
+
+    assert time.perf_counter() - started < 1
+    statuses = {c.name: c.status for c in report.checks}
+    assert statuses == {"db": "ok", "llm": "down"}
@@ -0,0 +1,96 @@
+import json
+import threading
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from levelup import incremental
+from levelup.incremental import affected_groups, changed_sections, find_previous
+from levelup.prompts import ANALYSIS_KEYS
+from levelup.segmenter import section_digests
+from levelup.store import AnalysisStore
+
+RESUME = """Jane Doe
+jane.doe@example.com
+
+Summary
+Senior data engineer building batch and streaming pipelines for analytics.
+
+Experience
+Acme Corp, 2018-2024: designed a lakehouse on Delta Lake serving the finance
+and marketing departments, led four engineers, introduced data contracts.
+
+Education
+MSc Computer Science, Technical University of Munich.
+
+Skills
+Python, Scala, SQL, dbt, Terraform, Kubernetes.
+
+Interests
+Climbing, chess.
+"""
+
+PREVIOUS = {key: f"old {key}" for key in ANALYSIS_KEYS}
+
+
+def test_changed_sections_map_to_affected_groups() -> None:
+    previous = section_digests(RESUME)
+    assert section_digests(RESUME.replace("\n\n", "\n  \n")) == previous
+
+    edited = RESUME.replace("Kubernetes.", "Kubernetes, Airflow.")
+    assert changed_sections(previous, section_digests(edited)) == ["skills"]
+    assert affected_groups(["skills"]) == ["competencies", "gaps", "summary"]
+
+    moved = RESUME.replace("jane.doe@example.com", "jane@example.org")
+    removed = RESUME.replace("Interests\nClimbing, chess.\n", "")
+    for text in (moved, removed):
+        assert affected_groups(changed_sections(previous, section_digests(text))) == []
+    assert affected_groups(["experience"]) == list(incremental.SECTION_GROUPS)
+
+
+def test_new_version_only_refreshes_affected_groups(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(incremental.config, "ANALYSIS_INCREMENTAL_ENABLED", True)
+    mocker.patch.object(incremental.config, "SKILL_PRESCREEN_ENABLED", False)
+    store = AnalysisStore(tmp_path)
+    previous_id = store.save(dict(PREVIOUS), RESUME, "English")
+    prompts: list[str] = []
+    lock = threading.Lock()
+
+    def generate(prompt: str) -> str:
+        with lock:
+            prompts.append(prompt)
+        return json.dumps({key: f"new {key}" for key in ANALYSIS_KEYS})
+
+    edited = RESUME.replace("Kubernetes.", "Kubernetes, Airflow.")
+    previous = find_previous(store, edited, "English")
+    assert previous is not None and previous["id"] == previous_id
+    assert find_previous(store, edited, "German") is None
+
+    # Digests of the first segmenter (no version) are not comparable
+    old = AnalysisStore(tmp_path / "old")
+    path = old.analyses_dir / f"{old.save(dict(PREVIOUS), RESUME, 'English')}.json"
+    stale = json.loads(path.read_text())
+    del stale["segmenter_version"]
+    path.write_text(json.dumps(stale))
+    assert find_previous(old, edited, "English") is None
+
+    update = incremental.reanalyze(edited, "English", None, previous, generate)
+    assert update.changed == ["skills"] and len(prompts) == 3
+    assert update.refreshed == ["competencies", "gaps", "summary"]
+    assert update.result["domain_scores"] == "old domain_scores"
+    assert update.result["competency_scores"] == "new competency_scores"
+    assert update.result["missing_skills"] == "new missing_skills"
+    assert update.result["overall_summary"] == "new overall_summary"
+    assert list(update.result) == list(ANALYSIS_KEYS)
+
+    new_id = store.save(update.result, edited, "English", None, update.record())
+    record = store.get(new_id)
+    assert record is not None
+    assert record["incremental"]["previous_id"] == previous_id
+    assert record["incremental"]["refreshed_groups"] == update.refreshed
+
+    unchanged = incremental.reanalyze(edited, "English", None, record, generate)
+    assert (unchanged.changed, unchanged.refreshed) == ([], [])
+    assert unchanged.result == update.result and len(prompts) == 3
@@ -0,0 +1,137 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine, update
+
+from levelup.api.routes.jobs import get_job
+from levelup.database.routing import ReplicaSet, RoutingSession
+from levelup.jobs import DEAD, QUEUED, RUNNING, SUCCEEDED, JobQueue
+from levelup.models import AnalysisJob
+from levelup.worker import Worker
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+
+def _queue(path: Path, clock: Clock | None = None, lease: float = 60) -> JobQueue:
+    engine = create_engine(f"sqlite:///{path / 'jobs.db'}").execution_options(
+        schema_translate_map={"dispatch_core": None}
+    )
+    AnalysisJob.__table__.create(engine)
+    return JobQueue(engine, lease_seconds=lease, clock=clock or Clock())
+
+
+def test_claims_by_priority_and_never_twice(tmp_path: Path) -> None:
+    queue = _queue(tmp_path)
+    low = queue.enqueue({"n": 1})
+    high = queue.enqueue({"n": 2}, priority=5)
+    later = queue.enqueue({"n": 3}, priority=9, delay=30)
+
+    assert [job["id"] for job in queue.claim("a", limit=1)] == [high]
+    assert [job["id"] for job in queue.claim("b", limit=5)] == [low]
+    assert queue.claim("c", limit=5) == []
+    assert queue.depth() == 0
+
+    job = queue.get(low)
+    assert job is not None
+    assert (job["status"], job["locked_by"], job["attempts"]) == (RUNNING, "b", 1)
+    assert queue.get(later)["status"] == QUEUED  # type: ignore[index]
+
+
+def test_failures_retry_with_backoff_then_dead_letter(tmp_path: Path) -> None:
+    clock = Clock()
+    queue = _queue(tmp_path, clock)
+    job_id = queue.enqueue({}, max_attempts=2)
+
+    queue.claim("a")
+    assert queue.fail(job_id, "other", "boom") is None  # not the holder
+    assert queue.fail(job_id, "a", "boom") == QUEUED
+    assert queue.claim("a") == []  # backing off
+
+    clock.advance(3600)
+    queue.claim("a")
+    assert queue.fail(job_id, "a", "boom again") == DEAD
+    job = queue.get(job_id)
+    assert job is not None
+    assert (job["status"], job["last_error"]) == (DEAD, "boom again")
+
+    assert queue.requeue([job_id]) == 1
+    assert [job["attempts"] for job in queue.claim("a")] == [1]
+    assert queue.complete(job_id, "a", {"ok": True})
+    assert queue.get(job_id)["result"] == {"ok": True}  # type: ignore[index]
+
+
+def test_expired_leases_are_reaped(tmp_path: Path) -> None:
+    clock = Clock()
+    queue = _queue(tmp_path, clock, lease=60)
+    kept, lost = queue.enqueue({}), queue.enqueue({}, max_attempts=1)
+    queue.claim("a", limit=2)
+
+    clock.advance(45)
+    assert queue.heartbeat("a", [kept]) == {kept}
+    clock.advance(30)
+    assert queue.reap() == 1
+    assert queue.get(lost)["status"] == DEAD  # type: ignore[index]
+    assert queue.get(kept)["status"] == RUNNING  # type: ignore[index]
+
+    clock.advance(120)
+    assert queue.reap() == 1
+    assert queue.heartbeat("a", [kept]) == set()
+    assert not queue.complete(kept, "a")
+    assert [job["id"] for job in queue.claim("b")] == [kept]
+
+
+def test_worker_runs_jobs_until_stopped(tmp_path: Path) -> None:
+    queue = _queue(tmp_path)
+    ids = [queue.enqueue({"n": n}) for n in range(5)]
+    failing = queue.enqueue({"n": -1}, max_attempts=1)
+
+    def square(payload: dict[str, int]) -> dict[str, int]:
+        if payload["n"] < 0:
+            raise ValueError("negative")
+        return {"square": payload["n"] ** 2}
+
+    worker = Worker(queue, {"analysis": square}, concurrency=2, poll_seconds=0.01)
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and queue.get(failing)["status"] != DEAD:  # type: ignore[index]
+        time.sleep(0.01)
+    worker.stop()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    jobs = [queue.get(job_id) for job_id in ids]
+    assert [(j["status"], j["result"]) for j in jobs] == [  # type: ignore[index]
+        (SUCCEEDED, {"square": n**2}) for n in range(5)
+    ]
+    failed = queue.get(failing)
+    assert failed is not None
+    assert failed["status"] == DEAD and "negative" in failed["last_error"]
+
+
+def test_job_polls_read_replicas_and_fall_back_to_primary(tmp_path: Path) -> None:
+    primary = _queue(tmp_path)
+    (tmp_path / "replica").mkdir()
+    replica = _queue(tmp_path / "replica")
+    for queue in (primary, replica):
+        queue.enqueue({"text": "resume"})
+    newest = primary.enqueue({"text": "just submitted"})  # not replicated yet
+    with replica.engine.begin() as connection:
+        connection.execute(update(replica.table).values(status=SUCCEEDED))
+
+    with RoutingSession(
+        bind=primary.engine, replicas=ReplicaSet([replica.engine])
+    ) as session:
+        assert get_job(1, session, primary).status == SUCCEEDED  # from the replica
+        assert get_job(newest, session, primary).status == QUEUED
@@ -0,0 +1,71 @@
+import random
+from io import BytesIO
+
+import pytest
+
+from levelup import config, llm
+from levelup.loadtest import (
+    Latency,
+    compare,
+    make_pdf,
+    parse_latency,
+    parse_mix,
+    run_load_test,
+    synthetic_resume,
+)
+from levelup.pdf import extract_text
+
+
+def test_parses_latency_distributions_and_mixes() -> None:
+    assert parse_latency("fixed:0.5") == Latency("fixed", 0.5)
+    assert parse_latency("lognormal:2,0.4") == Latency("lognormal", 2, 0.4)
+    for spec in ("fixed", "uniform:1", "gamma:1,2", "normal:a,b", "lognormal:0,1"):
+        with pytest.raises(ValueError):
+            parse_latency(spec)
+
+    rng = random.Random(1)
+    samples = [parse_latency("uniform:1,2").sample(rng) for _ in range(100)]
+    assert 1 <= min(samples) and max(samples) <= 2
+
+    assert parse_mix("analyze=3, poll=1,rank") == {"analyze": 3, "poll": 1, "rank": 1}
+    for spec in ("upload=1", "analyze=-1", "analyze=0"):
+        with pytest.raises(ValueError):
+            parse_mix(spec)
+
+
+def test_synthetic_resumes_are_readable_pdfs() -> None:
+    lines = synthetic_resume(random.Random(7))
+    lines += ["Hobbies (chess), back\\slash"] + [f"line {i}" for i in range(70)]
+
+    text = extract_text(BytesIO(make_pdf(lines)), max_pages=0, max_tokens=0)
+
+    assert text.splitlines()[0] == lines[0]
+    assert "Experience" in text and "Hobbies (chess), back\\slash" in text
+    assert "line 69" in text  # on the second page
+
+
+def test_run_reports_per_kind_and_restores_the_app() -> None:
+    from levelup.main import app
+
+    store_path, get_model = config.ANALYSIS_STORE_PATH, llm.get_model
+
+    report = run_load_test(
+        app,
+        duration=1,
+        concurrency=3,
+        mix="analyze=2,search=1,rank=1",
+        latency="fixed:0.01",
+        resumes=3,
+    )
+
+    assert config.ANALYSIS_STORE_PATH == store_path and llm.get_model is get_model
+    assert set(report["kinds"]) <= {"analyze", "search", "rank"}
+    analyze = report["kinds"]["analyze"]
+    assert analyze["requests"] > 0 and analyze["statuses"] == {
+        "200": analyze["requests"]
+    }
+    assert report["total"]["error_rate"] == 0
+    assert report["total"]["latency_ms"]["p50"] <= report["total"]["latency_ms"]["p99"]
+    assert 0 < report["llm_calls"] <= analyze["requests"]
+    assert report["resources"]["peak_rss_mb"] > 0
+    assert "analyze" in compare(report, report)
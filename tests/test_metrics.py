@@ -0,0 +1,40 @@
+import pytest
+
+from levelup.metrics import Registry, counter, gauge, histogram
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = Registry()
+    requests = counter("app_requests_total", "Requests.", ("route",), registry)
+    requests.inc(route="/a")
+    requests.inc(2, route='/b"x')
+    gauge("app_queue_depth", "Queue depth.", registry=registry).set_function(lambda: 7)
+    latency = histogram(
+        "app_latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry
+    )
+    latency.observe(0.1)
+    latency.observe(0.5)
+    latency.observe(3)
+
+    text = registry.render()
+
+    assert "# TYPE app_requests_total counter" in text
+    assert 'app_requests_total{route="/a"} 1' in text
+    assert 'app_requests_total{route="/b\\"x"} 2' in text
+    assert "app_queue_depth 7" in text
+    assert 'app_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'app_latency_seconds_bucket{le="1"} 2' in text
+    assert 'app_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "app_latency_seconds_count 3" in text
+    assert "app_latency_seconds_sum 3.6" in text
+
+
+def test_metrics_are_created_once_and_validate_labels() -> None:
+    registry = Registry()
+    first = counter("jobs_total", "Jobs.", ("state",), registry)
+
+    assert counter("jobs_total", "Jobs.", ("state",), registry) is first
+    with pytest.raises(ValueError):
+        gauge("jobs_total", "Jobs.", ("state",), registry)
+    with pytest.raises(ValueError):
+        first.inc(kind="x")
@@ -0,0 +1,57 @@
+from io import BytesIO
+from unittest.mock import MagicMock
+
+from pytest_mock import MockerFixture
+
+from levelup.pdf import extract_text, iter_page_texts
+
+
+def _mock_pdf(mocker: MockerFixture, texts: list[str]) -> tuple[MagicMock, list]:
+    pages = []
+    for text in texts:
+        page = MagicMock()
+        page.extract_text.return_value = text
+        pages.append(page)
+    pdf = MagicMock()
+    pdf.pages = pages
+    mock_open = mocker.patch("levelup.pdf.pdfplumber.open")
+    mock_open.return_value.__enter__.return_value = pdf
+    return mock_open, pages
+
+
+def test_iter_page_texts_spools_upload_and_releases_pages(
+    mocker: MockerFixture,
+) -> None:
+    seen: list[bytes] = []
+    mock_open, pages = _mock_pdf(mocker, ["one", "two"])
+
+    def open_spooled(readable: MagicMock, pages: list[int]) -> MagicMock:
+        seen.append(readable.read())
+        return mock_open.return_value
+
+    mock_open.side_effect = open_spooled
+    upload = BytesIO(b"%PDF-1.4 content")
+    upload.read(4)
+
+    texts = list(iter_page_texts(upload, max_pages=5))
+
+    assert texts == ["one", "two"]
+    assert seen == [b"%PDF-1.4 content"]
+    assert all(page.close.call_count == 1 for page in pages)
+
+
+def test_extract_text_limits_pages(mocker: MockerFixture) -> None:
+    mock_open, _ = _mock_pdf(mocker, ["a", "b"])
+
+    extract_text("resume.pdf", max_pages=2, max_tokens=0)
+
+    mock_open.assert_called_once_with("resume.pdf", pages=[1, 2])
+
+
+def test_extract_text_stops_at_token_budget(mocker: MockerFixture) -> None:
+    _, pages = _mock_pdf(mocker, ["x" * 30, "y" * 30, "z" * 30])
+
+    text = extract_text("resume.pdf", max_pages=0, max_tokens=10)
+
+    assert text == "x" * 30 + "\n" + "y" * 9
+    pages[2].extract_text.assert_not_called()
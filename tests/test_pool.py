@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from levelup.database.pool import (
+    CHECKED_OUT,
+    CHECKOUT_WAIT,
+    CONNECTIONS,
+    INVALIDATIONS,
+    MIN_SAMPLES,
+    TIMEOUTS,
+    InstrumentedQueuePool,
+    PoolAdvisor,
+    instrument_pool,
+)
+
+
+def _engine(tmp_path: Path, name: str, **kwargs: object):  # type: ignore[no-untyped-def]
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'db.sqlite'}",
+        poolclass=InstrumentedQueuePool,
+        **kwargs,
+    )
+    telemetry = instrument_pool(engine.pool, name=name)
+    return engine, telemetry
+
+
+def test_pool_records_checkouts_timeouts_and_invalidations(tmp_path: Path) -> None:
+    engine, _ = _engine(
+        tmp_path, "test-basic", pool_size=2, max_overflow=0, pool_timeout=0.05
+    )
+    first, second = engine.connect(), engine.connect()
+    assert CHECKED_OUT.value(pool="test-basic") == 2
+
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    assert TIMEOUTS.value(pool="test-basic") == 1
+    assert CHECKOUT_WAIT.count(pool="test-basic") == 3
+    assert CHECKOUT_WAIT.sum(pool="test-basic") >= 0.05
+
+    first.invalidate()
+    first.close()
+    second.close()
+    assert CONNECTIONS.value(pool="test-basic") == 2
+    assert INVALIDATIONS.value(pool="test-basic", kind="hard") == 1
+    assert CHECKED_OUT.value(pool="test-basic") == 0
+
+
+def test_resized_pool_keeps_listeners_and_limits(tmp_path: Path) -> None:
+    engine, _ = _engine(tmp_path, "test-resize", pool_size=4, max_overflow=0)
+    pool = engine.pool
+    assert isinstance(pool, InstrumentedQueuePool)
+
+    resized = pool.resized(3, 2)
+    engine.pool = resized
+    connections = [engine.connect() for _ in range(5)]
+    assert (resized.size(), resized.max_overflow()) == (3, 2)
+    assert resized.checkedout() == 5 and pool.checkedout() == 0
+    assert CONNECTIONS.value(pool="test-resize") == 5  # listeners came along
+    for connection in connections:
+        connection.close()
+    assert resized.checkedin() == 3
+
+
+def test_advisor_recommends_from_observed_concurrency() -> None:
+    advisor = PoolAdvisor(window=60, max_total=30)
+    assert advisor.recommend(30, now=0) is None
+
+    for i in range(MIN_SAMPLES * 2):
+        advisor.observe(12 if i % 50 == 0 else 4, now=i * 0.1)
+    recommendation = advisor.recommend(30, now=10)
+    assert recommendation is not None
+    assert (recommendation.steady, recommendation.peak) == (4, 12)
+    assert recommendation.pool_size == 5  # p95 of 4 with headroom
+    assert recommendation.max_overflow == 10  # peak of 12 with headroom
+
+    advisor.observe_timeout(now=11)
+    grown = advisor.recommend(30, now=11)
+    assert grown is not None
+    assert grown.pool_size + grown.max_overflow == 30  # capped at max_total
+
+    assert advisor.recommend(30, now=200) is None  # samples expired
+
+
+def test_adjust_mode_resizes_pool(tmp_path: Path) -> None:
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'db.sqlite'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=20,
+        max_overflow=10,
+    )
+    telemetry = instrument_pool(
+        engine.pool,
+        name="test-adjust",
+        mode="adjust",
+        advisor=PoolAdvisor(interval=0),
+        engine=engine,
+    )
+    old = engine.pool
+    busy, returned = engine.connect(), engine.connect()
+    for _ in range(MIN_SAMPLES):
+        telemetry.advisor.observe(3)
+
+    returned.close()  # recommends on checkin, replaces on the next checkout
+
+    assert telemetry.recommendation is not None
+    # Shrinking stops at the advisor's min_size (5), not the observed 3.
+    assert telemetry.pending == (5, 0) and engine.pool is old
+    assert old.checkedin() == 1  # the connection went back to a live pool
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert telemetry.pending is None
+    assert engine.pool is telemetry.pool and engine.pool is not old
+    assert (engine.pool.size(), telemetry.pool.max_overflow()) == (5, 0)
+    assert old.checkedin() == 0  # disposed
+    busy.execute(text("SELECT 1"))  # checked out before the swap, still usable
+    busy.close()
+    assert engine.pool.checkedin() == 1
+
+    with pytest.raises(ValueError):
+        instrument_pool(engine.pool, name="test-adjust", mode="adjust")
@@ -0,0 +1,68 @@
+import pstats
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from pytest_mock import MockerFixture
+
+from levelup.profiling import (
+    Profile,
+    cprofile,
+    current_profile,
+    record_stage,
+    stage,
+    use_profile,
+)
+from levelup.sections import SECTION_GROUPS, analyze
+
+ANSWER = '```json\n{"overall_summary": {"overall_score": 70}}\n```'
+
+
+def test_stages_are_timed_in_section_threads(mocker: MockerFixture) -> None:
+    model = mocker.Mock()
+    model.generate_content.side_effect = lambda prompt: SimpleNamespace(
+        text=ANSWER, usage_metadata=None
+    )
+    mocker.patch("levelup.llm.get_model", return_value=model)
+
+    profile = Profile()
+    with use_profile(profile):
+        analyze("cv", "English", concurrent=True)
+
+    calls = {row["stage"]: row["calls"] for row in profile.rows()}
+    groups = len(SECTION_GROUPS)
+    assert calls["llm_queue"] == calls["llm_generate"] == groups
+    assert calls["json_extraction"] == groups
+    assert calls["prompt_build"] >= groups  # plus the budget check's prompt
+    assert list(calls)[:2] == ["prompt_build", "llm_queue"]  # pipeline order
+    assert profile.wall > 0
+
+
+def test_nothing_is_recorded_without_a_profile() -> None:
+    with stage("rendering"):
+        record_stage("llm_queue", 1.0)
+    with use_profile(None) as profile:
+        assert profile is None and current_profile() is None
+
+    profile = Profile()
+    with use_profile(profile):
+        with stage("rendering"):
+            time.sleep(0.01)
+        record_stage("custom", 0.5)
+    with stage("rendering"):
+        pass  # outside the block again
+
+    rows = {row["stage"]: row for row in profile.rows()}
+    assert rows["rendering"]["calls"] == 1
+    assert rows["rendering"]["seconds"] >= 0.01
+    assert rows["custom"]["seconds"] == 0.5
+    assert "rendering" in profile.summary() and "wall time" in profile.summary()
+
+
+def test_cprofile_dumps_pstats(tmp_path: Path) -> None:
+    path = tmp_path / "analysis.pstats"
+    with cprofile(path):
+        sorted(range(1000), key=lambda n: -n)
+
+    stats = pstats.Stats(str(path))
+    assert stats.total_calls > 0  # type: ignore[attr-defined]
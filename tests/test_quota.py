@@ -0,0 +1,126 @@
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException, Request, Response, UploadFile
+from pytest_mock import MockerFixture
+
+from levelup.api.routes import analyze as analyze_route
+from levelup.quota import (
+    Quota,
+    QuotaStore,
+    parse_api_keys,
+    parse_networks,
+    quota_headers,
+)
+
+
+def _request(
+    host: str = "10.0.0.1", api_key: str | None = None, forwarded: str | None = None
+) -> Request:
+    headers = [(b"x-api-key", api_key.encode())] if api_key else []
+    if forwarded:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    return Request({"type": "http", "headers": headers, "client": (host, 1234)})
+
+
+def test_store_consumes_refills_and_is_shared(tmp_path: Path) -> None:
+    now = [0.0]
+    store = QuotaStore(tmp_path / "quota.sqlite3", clock=lambda: now[0])
+    other_process = QuotaStore(tmp_path / "quota.sqlite3", clock=lambda: now[0])
+
+    state = store.consume("a", 60, capacity=100, refill_per_second=1)
+    assert state.allowed and state.remaining == 40 and state.reset_seconds == 60
+
+    rejected = other_process.consume("a", 50, capacity=100, refill_per_second=1)
+    assert not rejected.allowed
+    assert rejected.remaining == 40 and rejected.retry_after == 10
+    assert quota_headers(rejected) == {
+        "X-RateLimit-Limit": "100",
+        "X-RateLimit-Remaining": "40",
+        "X-RateLimit-Reset": "60",
+        "Retry-After": "10",
+    }
+
+    now[0] = 10
+    assert other_process.consume("a", 50, capacity=100, refill_per_second=1).allowed
+    assert store.consume("b", 100, capacity=100, refill_per_second=1).allowed
+
+
+def test_clients_are_keyed_by_known_api_key_or_address(tmp_path: Path) -> None:
+    keys = parse_api_keys(["team-a=1000", " team-b "])
+    assert keys == {"team-a": 1000.0, "team-b": None}
+    quota = Quota(QuotaStore(tmp_path / "q.sqlite3"), 100, 3600, keys)
+
+    client, budget = quota.client(_request(api_key="team-a"))
+    assert client.startswith("key:") and "team-a" not in client and budget == 1000
+    assert quota.client(_request(api_key="team-b"))[1] == 100
+    assert quota.client(_request(api_key="made-up")) == ("addr:10.0.0.1", 100)
+
+    assert quota.charge(_request(), 250).remaining == 0  # capped at the budget
+    assert not quota.charge(_request(api_key="made-up"), 1).allowed
+    assert quota.charge(_request(host="10.0.0.2"), 1).allowed
+
+
+def test_forwarded_addresses_are_only_trusted_from_proxies(tmp_path: Path) -> None:
+    proxies = parse_networks(["10.0.0.0/8", " ", "2001:db8::1"])
+    quota = Quota(
+        QuotaStore(tmp_path / "q.sqlite3"), 100, 3600, trusted_proxies=proxies
+    )
+
+    assert quota.address(_request(forwarded="1.2.3.4")) == "1.2.3.4"
+    # A client-supplied first hop is ignored; the proxy appended the real address.
+    assert quota.address(_request(forwarded="6.6.6.6, 1.2.3.4, 10.9.9.9")) == "1.2.3.4"
+    assert quota.address(_request(host="2001:db8::1", forwarded="5.6.7.8")) == "5.6.7.8"
+    assert quota.address(_request(host="8.8.8.8", forwarded="1.2.3.4")) == "8.8.8.8"
+    assert quota.address(_request(forwarded="10.1.1.1, 10.2.2.2")) == "10.1.1.1"
+    untrusting = Quota(QuotaStore(tmp_path / "q.sqlite3"), 100, 3600)
+    assert untrusting.address(_request(forwarded="1.2.3.4")) == "10.0.0.1"
+
+
+def test_failed_analysis_is_refunded(tmp_path: Path, mocker: MockerFixture) -> None:
+    mocker.patch.object(analyze_route.config, "ANALYSIS_STORE_ENABLED", False)
+    mocker.patch.object(analyze_route, "extract_text", return_value="Go " * 500)
+    mocker.patch.object(analyze_route, "analyze", side_effect=RuntimeError("down"))
+    quota = Quota(QuotaStore(tmp_path / "q.sqlite3"), 100000, 3600)
+
+    for _ in range(2):
+        upload = UploadFile(io.BytesIO(b"%PDF"), filename="cv.pdf")
+        with pytest.raises(HTTPException) as error:
+            analyze_route.analyze_cv(
+                _request(), Response(), quota, upload, "English", None
+            )
+        assert error.value.status_code == 502
+
+    state = quota.charge(_request(), 0)
+    assert state.remaining == pytest.approx(100000, abs=1)
+
+
+def test_analysis_is_charged_its_prompt_tokens(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(analyze_route.config, "ANALYSIS_STORE_ENABLED", False)
+    mocker.patch.object(analyze_route, "extract_text", return_value="Python " * 500)
+    analysis = mocker.patch.object(
+        analyze_route, "analyze", return_value={"language": "English"}
+    )
+    cost = analyze_route.estimate_cost("Python " * 500, "English", None)
+    quota = Quota(QuotaStore(tmp_path / "q.sqlite3"), cost * 1.5, 3600)
+
+    def call() -> Response:
+        response = Response()
+        upload = UploadFile(io.BytesIO(b"%PDF"), filename="cv.pdf")
+        result = analyze_route.analyze_cv(
+            _request(), response, quota, upload, "English", None
+        )
+        assert result == {"language": "English"}
+        return response
+
+    response = call()
+    assert int(response.headers["X-RateLimit-Remaining"]) == int(cost * 0.5)
+
+    with pytest.raises(HTTPException) as error:
+        call()
+    assert error.value.status_code == 429
+    assert error.value.headers and "Retry-After" in error.value.headers
+    assert analysis.call_count == 1
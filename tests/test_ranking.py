@@ -0,0 +1,134 @@
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from pytest_mock import MockerFixture
+from typer.testing import CliRunner
+
+from levelup.api.routes.ranking import rank_candidates
+from levelup.cli import app
+from levelup.ranking import (
+    CandidatePool,
+    RankingWeights,
+    get_candidate_pool,
+    parse_weights,
+)
+from levelup.store import AnalysisStore
+
+
+def _record(cid: str, role_score: int, communication: int, critical: int) -> dict:
+    return {
+        "id": cid,
+        "role": "Data Engineer",
+        "result": {
+            "competency_scores": [
+                {"category": "Communication", "score": communication}
+            ],
+            "missing_skills": [
+                {"skill": f"s{i}", "priority": "Critical"} for i in range(critical)
+            ],
+            "overall_summary": {
+                "overall_score": role_score,
+                "role_suitability": [
+                    {"role": "Data Engineer", "score": role_score},
+                    {"role": "Data Analyst", "score": 100 - role_score},
+                ],
+            },
+        },
+    }
+
+
+RECORDS = [
+    _record("a", 90, 40, 2),
+    _record("b", 85, 90, 0),
+    _record("c", 70, 95, 0),
+    _record("d", 60, 50, 1),
+]
+
+
+def test_rank_by_role_score() -> None:
+    pool = CandidatePool.from_records(RECORDS)
+
+    ranked = pool.rank("data engineer", RankingWeights(critical_penalty=0), k=2)
+
+    assert [c.id for c in ranked] == ["a", "b"]
+    assert ranked[0].role_score == 90
+    assert ranked[0].critical_missing == 2
+
+
+def test_rank_with_competency_weights_and_penalties() -> None:
+    pool = CandidatePool.from_records(RECORDS)
+    weights = RankingWeights(competencies={"communication": 1.0}, critical_penalty=10)
+
+    ranked = pool.rank("Data Engineer", weights, k=10)
+
+    assert [c.id for c in ranked] == ["b", "c", "a", "d"]
+    assert ranked[0].score == 175
+
+
+def test_rank_unknown_role_and_empty_pool() -> None:
+    pool = CandidatePool.from_records(RECORDS)
+
+    assert all(c.role_score == 0 for c in pool.rank("Astronaut", k=4))
+    assert CandidatePool.from_records([]).rank("Data Engineer") == []
+
+
+def test_ranking_route_uses_cached_pool(tmp_path: Path) -> None:
+    store = AnalysisStore(tmp_path)
+    for record in RECORDS:
+        store.save(record["result"], record["id"] * 50, "English", record["role"])
+    assert get_candidate_pool(store) is get_candidate_pool(store)
+
+    ranked = rank_candidates(
+        store=store,
+        role="Data Engineer",
+        k=1,
+        role_weight=1.0,
+        competency=["Communication:0.5"],
+        critical_penalty=5.0,
+        important_penalty=0.0,
+    )
+
+    assert len(ranked) == 1
+    assert ranked[0].score == 85 + 45
+
+
+def test_parse_weights_rejects_malformed_pairs() -> None:
+    assert parse_weights(["Team: Work:2"]) == {"Team: Work": 2.0}
+    for pair in ("Communication", ":2", "Communication=2"):
+        with pytest.raises(ValueError):
+            parse_weights([pair])
+
+
+def test_cli_and_route_share_the_weight_syntax(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    store = AnalysisStore(tmp_path)
+    for record in RECORDS:
+        store.save(record["result"], record["id"] * 50, "English", record["role"])
+    mocker.patch("levelup.cli.get_store", return_value=store)
+    pool = mocker.spy(CandidatePool, "from_records")
+    runner = CliRunner()
+
+    for _ in range(2):
+        result = runner.invoke(
+            app, ["rank", "-r", "Data Engineer", "-k", "1", "-w", "Communication:0.5"]
+        )
+        assert result.exit_code == 0
+        assert "130.0" in result.output
+    assert pool.call_count <= 1
+
+    result = runner.invoke(
+        app, ["rank", "-r", "Data Engineer", "-w", "Communication=1"]
+    )
+    assert result.exit_code == 1
+    with pytest.raises(HTTPException):
+        rank_candidates(
+            store=store,
+            role="Data Engineer",
+            k=1,
+            role_weight=1.0,
+            competency=["Communication=1"],
+            critical_penalty=5.0,
+            important_penalty=0.0,
+        )
@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from levelup.reports import render_batch, render_html
+
+RESULT = {
+    "language": "English",
+    "domain_scores": [
+        {"domain": "Data <Engineering>", "score": 70, "justification": "Pipelines"},
+        {"domain": "Analytics", "score": 85, "justification": "Dashboards"},
+    ],
+    "competency_scores": [
+        {"category": "Core Skills", "score": 80, "strength": "SQL", "observation": "-"}
+    ],
+    "strategic_insights": "Strong data foundation.",
+    "development_recommendations": ["Learn Terraform"],
+    "missing_skills": [{"skill": "Terraform", "priority": "Critical"}],
+    "mismatched_experience": None,
+    "overall_summary": {
+        "overall_score": 78,
+        "key_strengths": ["Pipelines"],
+        "talent_potential": "High",
+        "role_suitability": [{"role": "Data Engineer", "score": 78}],
+    },
+}
+
+
+def test_render_html_has_all_sections_and_escapes() -> None:
+    html = render_html(RESULT, {"id": "abc", "role": "Data Engineer"})
+
+    for heading in (
+        "Overall Summary",
+        "Fit &amp; Gaps",
+        "Competency Evaluation",
+        "Career Domain Fit Scores",
+        "Strategic Insights",
+        "Development Recommendations",
+    ):
+        assert f">{heading}<" in html
+    assert "CV Analysis — Data Engineer" in html
+    assert "Data &lt;Engineering&gt;" in html
+    assert "No mismatches detected." in html
+    assert html.index("Analytics") < html.index("Data &lt;Engineering&gt;")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_batch_writes_reports_and_reports_failures(
+    tmp_path: Path, workers: int
+) -> None:
+    record = {"id": "stored-1", "role": None, "language": "English", "result": RESULT}
+    (tmp_path / "stored.json").write_text(json.dumps(record))
+    (tmp_path / "copy.json").write_text(json.dumps(record))
+    (tmp_path / "escape.json").write_text(json.dumps({**record, "id": "../../x"}))
+    (tmp_path / "bare.json").write_text(json.dumps(RESULT))
+    (tmp_path / "broken.json").write_text("[]")
+    sources = sorted(tmp_path.glob("*.json"))
+    out_dir = tmp_path / "out"
+
+    result = render_batch(sources, out_dir, workers=workers)
+
+    names = sorted(p.name for p in result.written)
+    assert names[:2] == ["bare.html", "report-9cdf6a50100a862e.html"]
+    # The second record with the same id gets a suffixed name
+    assert names[2].startswith("stored-1-") and names[3] == "stored-1.html"
+    assert all(p.parent == out_dir for p in result.written)
+    assert sorted(p.name for p in out_dir.iterdir()) == names
+    assert list(result.failed) == [tmp_path / "broken.json"]
+
+
+def test_render_batch_rejects_unknown_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        render_batch([], tmp_path, fmt="docx")
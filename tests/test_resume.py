@@ -28,7 +28,7 @@ def test_extract_text_from_pdf(mocker: MockerFixture) -> None:
     mock_pdf = MagicMock()
     mock_pdf.pages = [mock_page]
 
-    mock_open = mocker.patch("levelup.app.pdfplumber.open")
+    mock_open = mocker.patch("levelup.pdf.pdfplumber.open")
     mock_open.return_value.__enter__.return_value = mock_pdf
     mock_open.return_value.__exit__.return_value = False
 
@@ -37,7 +37,10 @@ def test_extract_text_from_pdf(mocker: MockerFixture) -> None:
     text = extract_text_from_pdf(fake_file)
 
     assert text == "test"
-    mock_open.assert_called_once_with(fake_file)
+    mock_open.assert_called_once()
+    spooled = mock_open.call_args.args[0]
+    assert spooled is not fake_file
+    mock_page.close.assert_called_once()
 
 
 def test_analyzecv_pdf_withllm_success(mocker: MockerFixture) -> None:
@@ -46,7 +49,8 @@ def test_analyzecv_pdf_withllm_success(mocker: MockerFixture) -> None:
     mock_response.text = '{"language":"English","domain_scores":[{"domain":"IT","score":90,"justification":"Strong technical background"}]}'
 
     mocker.patch("levelup.app.get_resume_analysis_prompt", return_value="mocked prompt")
-    mocker.patch("levelup.app.Model.generate_content", return_value=mock_response)
+    model = mocker.patch("levelup.llm.get_model").return_value
+    model.generate_content.return_value = mock_response
 
     result = analyzecv_pdf_withllm("Sample resume text", "English")
 
@@ -62,17 +66,14 @@ def test_analyzecv_pdf_withllm_failure(mocker: MockerFixture) -> None:
     mock_response_no_json.text = "No JSON here"
 
     mocker.patch("levelup.app.get_resume_analysis_prompt", return_value="mocked prompt")
-    mocker.patch(
-        "levelup.app.Model.generate_content", return_value=mock_response_no_json
-    )
+    model = mocker.patch("levelup.llm.get_model").return_value
+    model.generate_content.return_value = mock_response_no_json
     mocker.patch("levelup.app.st.error")
 
     result = analyzecv_pdf_withllm("Sample resume text", "English")
     assert result is None
 
-    mocker.patch(
-        "levelup.app.Model.generate_content", side_effect=Exception("API Error")
-    )
+    model.generate_content.side_effect = Exception("API Error")
     result = analyzecv_pdf_withllm("Sample resume text", "English")
     assert result is None
 
@@ -0,0 +1,90 @@
+from pathlib import Path
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select
+
+from levelup.database.routing import ReplicaSet, RoutingSession, read_only
+
+metadata = MetaData()
+source = Table(
+    "source", metadata, Column("id", Integer, primary_key=True), Column("name", String)
+)
+
+
+def _database(path: Path, name: str):  # type: ignore[no-untyped-def]
+    engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(source.insert().values(id=1, name=name))
+    return engine
+
+
+def _names(session: RoutingSession) -> list[str]:
+    return list(session.scalars(select(source.c.name)))
+
+
+def test_read_only_transactions_go_to_replicas_round_robin(tmp_path: Path) -> None:
+    primary = _database(tmp_path / "primary.db", "primary")
+    replicas = ReplicaSet(
+        [_database(tmp_path / "r1.db", "r1"), _database(tmp_path / "r2.db", "r2")]
+    )
+
+    with RoutingSession(bind=primary, replicas=replicas) as session:
+        assert _names(session) == ["primary"]
+        session.rollback()
+        with read_only(session):
+            names = []
+            for _ in range(3):
+                names.append(_names(session) + _names(session))
+                session.rollback()
+        assert names == [["r1", "r1"], ["r2", "r2"], ["r1", "r1"]]
+
+    with RoutingSession(bind=primary) as session, read_only(session):
+        assert _names(session) == ["primary"]
+
+
+def test_transactions_that_write_run_on_primary(tmp_path: Path) -> None:
+    primary = _database(tmp_path / "primary.db", "primary")
+    replicas = ReplicaSet([_database(tmp_path / "r1.db", "r1")])
+
+    with RoutingSession(bind=primary, replicas=replicas) as session:
+        # The read before the write already sees the primary
+        assert _names(session) == ["primary"]
+        session.execute(source.insert().values(id=2, name="new"))
+        assert _names(session) == ["primary", "new"]
+        session.commit()
+
+        with read_only(session):
+            # The session has written: it reads its own writes from the primary
+            assert _names(session) == ["primary", "new"]
+
+    with RoutingSession(bind=primary, replicas=replicas) as session:
+        with read_only(session):
+            assert _names(session) == ["r1"]
+            assert list(session.scalars(select(source.c.name).with_for_update())) == [
+                "primary",
+                "new",
+            ]
+
+
+def test_failed_replica_is_skipped_and_the_read_retried(tmp_path: Path) -> None:
+    now = [0.0]
+    primary = _database(tmp_path / "primary.db", "primary")
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'r0.db'}")
+    replicas = ReplicaSet(
+        [broken, _database(tmp_path / "r1.db", "r1")],
+        retry_seconds=10,
+        clock=lambda: now[0],
+    )
+
+    with RoutingSession(bind=primary, replicas=replicas) as session:
+        with read_only(session):
+            assert _names(session) == ["r1"]
+    assert replicas.healthy() == [1]
+
+    now[0] = 11
+    assert replicas.healthy() == [0, 1]
+
+    only_broken = ReplicaSet([broken], clock=lambda: now[0])
+    with RoutingSession(bind=primary, replicas=only_broken) as session:
+        with read_only(session):
+            assert _names(session) == ["primary"]
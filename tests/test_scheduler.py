@@ -0,0 +1,84 @@
+import threading
+import time
+
+from levelup.scheduler import BULK, INTERACTIVE, LLMScheduler, current_lane, use_lane
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _queue_call(
+    scheduler: LLMScheduler, lane: str, tenant: str, granted: list[str]
+) -> threading.Thread:
+    """Starts a call that records its tenant when granted; returns once it waits."""
+    waiting = scheduler.waiting(lane)
+
+    def call() -> None:
+        scheduler.acquire(lane, tenant)
+        granted.append(tenant)
+        scheduler.release(lane)
+
+    thread = threading.Thread(target=call)
+    thread.start()
+    while scheduler.waiting(lane) == waiting:
+        time.sleep(0.001)
+    return thread
+
+
+def _drain(scheduler: LLMScheduler, lane: str, threads: list[threading.Thread]) -> None:
+    scheduler.release(lane)
+    for thread in threads:
+        thread.join(5)
+
+
+def test_reserved_slots_keep_bulk_from_blocking_interactive_calls() -> None:
+    scheduler = LLMScheduler(slots=3, reserved=1)
+    scheduler.acquire(BULK, "import")
+    scheduler.acquire(BULK, "import")
+    granted: list[str] = []
+    thread = _queue_call(scheduler, BULK, "import", granted)
+
+    scheduler.acquire(INTERACTIVE, "user")  # the reserved slot is free
+    assert (scheduler.running(BULK), scheduler.waiting(BULK)) == (2, 1)
+
+    scheduler.release(INTERACTIVE)
+    _drain(scheduler, BULK, [thread])
+    assert granted == ["import"]
+
+
+def test_tenants_share_a_lane_by_weight() -> None:
+    for weights, expected in (
+        ({}, ["a", "b", "a", "b", "a", "b"]),
+        ({"b": 2.0}, ["a", "b", "b", "a", "b", "a"]),
+    ):
+        scheduler = LLMScheduler(slots=1, aging_seconds=0, tenant_weights=weights)
+        scheduler.acquire(BULK, "other")
+        granted: list[str] = []
+        threads = [_queue_call(scheduler, BULK, tenant, granted) for tenant in "aaabbb"]
+        _drain(scheduler, BULK, threads)
+        assert granted == expected
+
+
+def test_waiting_bulk_calls_age_past_new_interactive_calls() -> None:
+    for waited, expected in ((10, ["user", "import"]), (40, ["import", "user"])):
+        clock = Clock()
+        scheduler = LLMScheduler(slots=1, aging_seconds=30, clock=clock)
+        scheduler.acquire(INTERACTIVE, "user")
+        granted: list[str] = []
+        threads = [_queue_call(scheduler, BULK, "import", granted)]
+        clock.now += waited
+        threads.append(_queue_call(scheduler, INTERACTIVE, "user", granted))
+        _drain(scheduler, INTERACTIVE, threads)
+        assert granted == expected
+
+
+def test_use_lane_sets_the_lane_of_the_context() -> None:
+    assert current_lane() == (INTERACTIVE, "default")
+    with use_lane(BULK, "acme"):
+        assert current_lane() == (BULK, "acme")
+    assert current_lane() == (INTERACTIVE, "default")
@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from levelup.api.routes.search import search_resumes
+from levelup.search import SearchIndex, tokenize
+from levelup.store import AnalysisStore
+
+DOCS = {
+    "payments": "Backend engineer on PCI-DSS payment systems in Go and C++.",
+    "data": "Data engineer building Kafka and Spark pipelines. Kafka Streams, Kafka Connect.",
+    "design": "UX designer working on design systems in Figma.",
+}
+
+
+def _index() -> SearchIndex:
+    index = SearchIndex()
+    for key, text in DOCS.items():
+        index.add(key, text)
+    return index
+
+
+def test_tokenize_keeps_compound_skill_names() -> None:
+    assert tokenize("PCI-DSS, C++ and C#; node.js.") == [
+        "pci-dss",
+        "c++",
+        "and",
+        "c#",
+        "node.js",
+    ]
+
+
+def test_search_ranks_by_bm25() -> None:
+    index = _index()
+
+    hits = index.search("kafka engineer")
+
+    assert [key for key, _ in hits] == ["data", "payments"]
+    assert hits[0][1] > hits[1][1] > 0
+    assert index.search("c++")[0][0] == "payments"
+    assert index.search("cobol") == []
+
+
+def test_delete_and_replace_update_results() -> None:
+    index = _index()
+
+    assert index.delete("data")
+    assert not index.delete("data")
+    assert index.search("kafka") == []
+
+    index.add("design", "Figma and Kafka")
+    assert [key for key, _ in index.search("kafka")] == ["design"]
+    assert len(index) == 2
+
+
+def test_save_and_load_roundtrip(tmp_path: Path) -> None:
+    index = _index()
+    index.delete("design")
+    path = tmp_path / "search.npz"
+
+    index.save(path)
+    loaded = SearchIndex.load(path)
+
+    assert len(loaded) == 2
+    assert "design" not in loaded
+    assert loaded.search("kafka engineer") == index.search("kafka engineer")
+
+
+def test_merge_adds_and_replaces_documents() -> None:
+    index = _index()
+    update = SearchIndex()
+    update.add("design", "Figma and Kafka")
+    update.add("go", "Go services")
+
+    index.merge(update, removed=["payments"])
+
+    assert [key for key, _ in index.search("kafka")] == ["data", "design"]
+    assert index.search("figma")[0][0] == "design" and index.search("c++") == []
+    assert len(index) == 3
+
+
+def test_store_search_returns_records(tmp_path: Path) -> None:
+    store = AnalysisStore(tmp_path)
+    result = {"overall_summary": {"overall_score": 80}}
+    data_id = store.save(result, DOCS["data"], "English", "Data Engineer")
+    design_id = store.save(result, DOCS["design"], "English")
+
+    hits = AnalysisStore(tmp_path).search("figma")
+    assert [record["id"] for record, _ in hits] == [design_id]
+
+    store.delete(design_id)
+    assert AnalysisStore(tmp_path).search("figma") == []
+    assert AnalysisStore(tmp_path).search("spark")[0][0]["id"] == data_id
+
+
+def test_stores_search_each_others_analyses(tmp_path: Path) -> None:
+    reader = AnalysisStore(tmp_path)
+    assert reader.search("kafka") == []
+    result = {"overall_summary": {"overall_score": 80}}
+
+    def save(text: str) -> str:
+        return AnalysisStore(tmp_path).save(result, text, "English")
+
+    with ThreadPoolExecutor(len(DOCS)) as pool:
+        ids = dict(zip(DOCS, pool.map(save, DOCS.values())))
+
+    assert [record["id"] for record, _ in reader.search("kafka")] == [ids["data"]]
+    assert len(reader.search("engineer")) == 2
+
+
+def test_search_hits_tolerate_malformed_summaries(tmp_path: Path) -> None:
+    store = AnalysisStore(tmp_path)
+    store.save({"overall_summary": "imported text"}, DOCS["data"], "English")
+    store.save({"overall_summary": {"overall_score": 80}}, DOCS["payments"], "English")
+
+    hits = search_resumes(store, q="engineer", k=10)
+
+    assert {hit.overall_score for hit in hits} == {None, 80}
@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+
+import pytest
+
+from levelup.prompts import ANALYSIS_KEYS
+from levelup.sections import (
+    SECTION_GROUPS,
+    analyze_sections,
+    enforce_consistency,
+    merge_section_results,
+)
+
+SECTION_ANSWERS = {
+    "language": "English",
+    "domain_scores": [{"domain": "IT", "score": 90, "justification": "Strong"}],
+    "competency_scores": [
+        {"category": "Core", "score": 120, "strength": "X", "observation": "Y"}
+    ],
+    "missing_skills": [{"skill": "Terraform", "priority": "critical"}],
+    "mismatched_experience": [],
+    "strategic_insights": "Insight",
+    "development_recommendations": ["Learn Terraform"],
+    "comparative_benchmarking": "Above average",
+    "overall_summary": {
+        "overall_score": 72,
+        "key_strengths": ["Python"],
+        "areas_to_improve": ["Cloud"],
+        "talent_potential": "High",
+        "role_suitability": [
+            {"role": "Data Scientist", "score": 85},
+            {"role": "Backend Engineer", "score": 70},
+        ],
+    },
+}
+
+
+def _scope(prompt: str) -> str:
+    scope = prompt.split("produce ONLY the following part(s) of the evaluation:")[1]
+    return scope.split("\n", 1)[0]
+
+
+def _fake_generate(prompt: str) -> str:
+    """Answers with exactly the keys the section prompt asks for."""
+    scope = _scope(prompt)
+    answer = {k: SECTION_ANSWERS[k] for k in ANALYSIS_KEYS if f'"{k}"' in scope}
+    return "```json\n" + json.dumps(answer) + "\n```"
+
+
+def test_analyze_sections_merges_all_groups() -> None:
+    result = analyze_sections("cv", "English", generate=_fake_generate)
+
+    assert list(result) == list(ANALYSIS_KEYS)
+    assert result["domain_scores"][0]["domain"] == "IT"
+    assert result["competency_scores"][0]["score"] == 100
+    assert result["missing_skills"][0]["priority"] == "Critical"
+
+
+def test_analyze_sections_runs_concurrently() -> None:
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_generate(prompt: str) -> str:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return _fake_generate(prompt)
+
+    analyze_sections("cv", "English", generate=slow_generate, max_workers=5)
+
+    assert peak == len(SECTION_GROUPS)
+
+
+def test_analyze_sections_reports_unparsable_section() -> None:
+    def broken_generate(prompt: str) -> str:
+        if '"competency_scores"' in _scope(prompt):
+            return "no json"
+        return _fake_generate(prompt)
+
+    with pytest.raises(ValueError, match="competencies"):
+        analyze_sections("cv", "English", generate=broken_generate)
+
+
+def test_merge_ignores_keys_owned_by_other_groups() -> None:
+    merged = merge_section_results(
+        {
+            "domains": {"language": "English", "overall_summary": {"bogus": 1}},
+            "summary": {"overall_summary": {"overall_score": 50}},
+        }
+    )
+
+    assert merged == {"language": "English", "overall_summary": {"overall_score": 50}}
+
+
+def test_enforce_consistency_aligns_target_role_with_overall_score() -> None:
+    result = json.loads(json.dumps(SECTION_ANSWERS))
+
+    fixes = enforce_consistency(result, target_role="Backend Engineer")
+
+    roles = result["overall_summary"]["role_suitability"]
+    assert roles[0] == {"role": "Backend Engineer", "score": 72}
+    assert roles[1] == {"role": "Data Scientist", "score": 72}
+    assert fixes
+
+
+def test_enforce_consistency_adds_missing_target_role() -> None:
+    result = json.loads(json.dumps(SECTION_ANSWERS))
+
+    enforce_consistency(result, target_role="QA Engineer")
+
+    roles = result["overall_summary"]["role_suitability"]
+    assert roles[0] == {"role": "QA Engineer", "score": 72}
+    assert len(roles) == 3
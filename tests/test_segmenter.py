@@ -0,0 +1,82 @@
+from levelup import tokens
+from levelup.segmenter import (
+    DATE_RANGE,
+    drop_boilerplate,
+    heading_section,
+    measure_throughput,
+    segment,
+    split_entries,
+)
+
+EXPERIENCE = """Experience
+Data Engineer, Acme Corp
+Jan 2021 – Present
+- Built streaming pipelines on Kafka
+Tools: Kafka, Spark
+Analyst, Globex
+2017 - 2020
+- Reporting in SQL
+Intern, Initech
+06/2016 – 09/2016
+- Data cleaning"""
+
+
+def test_headings_in_report_languages_and_layouts() -> None:
+    headings = {
+        "Berufserfahrung": "experience",
+        "AUSBILDUNG": "education",
+        "İş Deneyimi": "experience",
+        "Yetenekler:": "skills",
+        "Опыт работы": "experience",
+        "ОБРАЗОВАНИЕ": "education",
+        "Εκπαίδευση": "education",
+        "Compétences techniques": "skills",
+        "Expérience professionnelle": "experience",
+        "Doświadczenie zawodowe": "experience",
+        "Vzdělání": "education",
+        "Ziman": "languages",
+        "2. Work Experience": "experience",
+        "IV. Projects": "projects",
+        "S K I L L S": "skills",
+        "— Contact Information —": "contact",
+        "Languages: English (native), German (B2)": "languages",
+    }
+    for line, section in headings.items():
+        assert heading_section(line) == section, line
+    for line in ("Jane Doe", "Built the experience platform", "2019 - 2021"):
+        assert heading_section(line) is None
+
+
+def test_labels_inside_entries_do_not_start_sections() -> None:
+    text = f"Jane Doe\n{EXPERIENCE}\n\nSkills: Python, SQL\nLebenslauf"
+    sections = segment(text)
+    assert [s.name for s in sections] == ["header", "experience", "skills"]
+    assert "Tools: Kafka, Spark" in sections[1].text
+    assert "\n".join(s.text for s in sections) == text
+
+
+def test_experience_is_split_into_dated_entries() -> None:
+    entries = split_entries(EXPERIENCE)
+    assert [e.split("\n")[-1] for e in entries] == [
+        "Tools: Kafka, Spark",
+        "- Reporting in SQL",
+        "- Data cleaning",
+    ]
+    assert entries[1].startswith("Analyst, Globex\n2017 - 2020")
+    assert "\n".join(entries) == EXPERIENCE
+    assert not DATE_RANGE.search("Dean's list in 2019 and 2020")
+    assert DATE_RANGE.search("Analista, 2019 a 2021")
+
+    # Trimming keeps whole entries of the section that crosses the budget.
+    resume = "Jane Doe\n" + EXPERIENCE
+    budget = tokens.estimate_tokens(resume) - 5
+    trimmed = tokens.trim_to_budget(resume, budget).text
+    assert trimmed.endswith("- Reporting in SQL")
+
+
+def test_boilerplate_and_throughput() -> None:
+    text = "Curriculum Vitae\nJane Doe\nPage 1 of 2\nSkills\nPython\n2 / 2"
+    assert drop_boilerplate(text) == "Jane Doe\nSkills\nPython"
+
+    result = measure_throughput("Jane Doe\n" + EXPERIENCE * 20, runs=5)
+    assert result.sections == 2 and result.resumes_per_second > 0
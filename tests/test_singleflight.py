@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from levelup.singleflight import SingleFlight, analysis_key
+
+
+def test_concurrent_threads_share_one_call() -> None:
+    flight: SingleFlight[dict[str, list[int]]] = SingleFlight(
+        "test", clone=lambda r: {k: list(v) for k, v in r.items()}
+    )
+    calls: list[int] = []
+    release = threading.Event()
+
+    def work() -> dict[str, list[int]]:
+        calls.append(1)
+        release.wait(2)
+        return {"scores": [1, 2]}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, "cv", work) for _ in range(4)]
+        while flight.in_flight() == 0:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert all(r == {"scores": [1, 2]} for r in results)
+    results[0]["scores"].append(3)
+    assert results[1] == {"scores": [1, 2]}
+    assert flight.in_flight() == 0
+
+    flight.do("cv", work)
+    assert len(calls) == 2  # finished calls are not cached
+
+
+def test_errors_reach_every_waiter() -> None:
+    flight: SingleFlight[int] = SingleFlight("test")
+    started = threading.Event()
+
+    def fail() -> int:
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("quota exhausted")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "k", fail)
+        started.wait(2)
+        follower = pool.submit(flight.do, "k", fail)
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="quota exhausted"):
+                future.result()
+
+
+def test_async_waiters_share_and_cancel() -> None:
+    flight: SingleFlight[str] = SingleFlight("test")
+    calls: list[str] = []
+
+    async def work() -> str:
+        calls.append("run")
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main() -> None:
+        waiters = [asyncio.create_task(flight.do_async("k", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        waiters[0].cancel()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert isinstance(results[0], asyncio.CancelledError)
+        assert results[1:] == ["done", "done"]
+        assert calls == ["run"]
+
+        # Once every waiter is gone the shared call is cancelled too.
+        lone = asyncio.create_task(flight.do_async("k", work))
+        await asyncio.sleep(0.01)
+        task = next(iter(flight._tasks.values())).task
+        lone.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await lone
+        await asyncio.sleep(0)
+        assert task.cancelled()
+        assert flight.in_flight() == 0
+
+    asyncio.run(main())
+
+
+def test_analysis_key_covers_inputs() -> None:
+    key = analysis_key("resume", "English", None, "single")
+    assert key == analysis_key("resume", "English", None, "single")
+    assert key != analysis_key("resume", "German", None, "single")
+    assert key != analysis_key("resume", "English", "Data Engineer", "single")
+    assert key != analysis_key("resume!", "English", None, "single")
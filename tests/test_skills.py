@@ -0,0 +1,84 @@
+from levelup.prompts import get_resume_analysis_prompt, get_section_analysis_prompt
+from levelup.skills import SkillMatcher, get_skill_matcher, normalize_missing_skills
+
+CV = """Backend engineer. Python, C++ and Node.js services on AWS and k8s.
+Owned go-to-market tooling backed by SQL Server. PCI-DSS audits. JavaScript."""
+
+
+def test_matcher_finds_whole_word_skills_in_order() -> None:
+    found = get_skill_matcher().find(CV)
+
+    assert found == [
+        "Python",
+        "C++",
+        "Node.js",
+        "AWS",
+        "Kubernetes",
+        "Microsoft SQL Server",
+        "PCI DSS",
+        "JavaScript",
+    ]
+
+
+def test_matcher_handles_overlapping_aliases() -> None:
+    matcher = SkillMatcher({"he": (), "she": (), "hers": (), "his": ()})
+
+    assert matcher.find("ushers his she") == ["his", "she"]
+    assert matcher.find("she hers") == ["she", "hers"]
+
+
+def test_ambiguous_aliases_need_context() -> None:
+    matcher = get_skill_matcher()
+
+    assert matcher.find("Holds an active TS/SCI clearance.") == []
+    assert matcher.find("Added 500 ml of buffer to each node of the rig.") == []
+    assert matcher.find("A spark of curiosity; I am mongo-fluent.") == []
+    assert matcher.find("Frontend in Vue and TS, API in Node with Mongo.") == [
+        "Vue.js",
+        "TypeScript",
+        "Node.js",
+        "MongoDB",
+    ]
+    assert matcher.find("Shipped ML models; managed IAM roles on AWS.") == [
+        "Machine Learning",
+        "Identity and Access Management",
+        "AWS",
+    ]
+    assert matcher.canonical("ML") == "Machine Learning"
+
+
+def test_canonical_spelling() -> None:
+    matcher = get_skill_matcher()
+
+    assert matcher.canonical(" kubernetes ") == "Kubernetes"
+    assert matcher.canonical("Kafka (Streams)") == "Apache Kafka"
+    assert matcher.canonical("Underwater basket weaving") is None
+
+
+def test_normalize_missing_skills() -> None:
+    result = {
+        "missing_skills": [
+            {"skill": "k8s", "priority": "Critical"},
+            {"skill": "terraform", "priority": "Important"},
+            {"skill": "Terraform", "priority": "Nice to have"},
+            {"skill": "Domain-driven design", "priority": "Important"},
+        ]
+    }
+
+    fixes = normalize_missing_skills(result, ["Kubernetes"])
+
+    assert result["missing_skills"] == [
+        {"skill": "Terraform", "priority": "Important"},
+        {"skill": "Domain-driven design", "priority": "Important"},
+    ]
+    assert len(fixes) == 4
+
+
+def test_present_skills_hint_only_in_missing_skills_section() -> None:
+    hint = "never list these as missing): Python, AWS."
+
+    assert hint in get_resume_analysis_prompt(CV, "English", None, ["Python", "AWS"])
+    assert hint not in get_resume_analysis_prompt(CV, "English")
+    assert hint not in get_section_analysis_prompt(
+        CV, "English", ("competency_scores",), None, ["Python", "AWS"]
+    )
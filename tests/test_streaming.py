@@ -0,0 +1,91 @@
+import asyncio
+import io
+import json
+from typing import Iterator
+
+from fastapi import Request, Response, UploadFile
+from pytest_mock import MockerFixture
+
+from levelup.api.routes import analyze as analyze_route
+from levelup.streaming import MemberParser, analyze_stream
+
+ANALYSIS = {
+    "language": "English",
+    "strategic_insights": 'Braces { and [ and "quotes", commas, \\ slashes',
+    "domain_scores": [{"domain": "Data", "score": 80}],
+    "overall_summary": {"overall_score": 75, "key_strengths": ["SQL"]},
+}
+RESPONSE = "```json\n" + json.dumps(ANALYSIS, indent=2) + "\n```\nThanks!"
+
+
+def _chunks(text: str, size: int) -> Iterator[str]:
+    return (text[i : i + size] for i in range(0, len(text), size))
+
+
+def test_members_are_parsed_as_soon_as_they_complete() -> None:
+    for size in (1, 7, len(RESPONSE)):
+        parser = MemberParser()
+        members = [m for chunk in _chunks(RESPONSE, size) for m in parser.feed(chunk)]
+        assert dict(members) == ANALYSIS
+        assert [name for name, _ in members] == list(ANALYSIS)
+        assert parser.done
+
+    parser = MemberParser()
+    head = RESPONSE.index('"domain_scores"')
+    assert [name for name, _ in parser.feed(RESPONSE[:head])] == [
+        "language",
+        "strategic_insights",
+    ]
+    assert [name for name, _ in parser.feed(RESPONSE[head:-40])] == ["domain_scores"]
+
+
+def test_analyze_stream_yields_progress_sections_and_result() -> None:
+    events = list(
+        analyze_stream(
+            "Python developer", "English", stream=lambda _: _chunks(RESPONSE, 20)
+        )
+    )
+    names = [event.event for event in events]
+    assert names[0] == "prompted" and names[-1] == "result"
+    assert [e.data["name"] for e in events if e.event == "section"] == list(ANALYSIS)
+    received = [e.data["received"] for e in events if e.event == "tokens"]
+    assert received == sorted(received) and len(received) > 1
+    assert events[-1].data["overall_summary"] == ANALYSIS["overall_summary"]
+
+    def broken(_: str) -> Iterator[str]:
+        yield RESPONSE[:50]
+        raise RuntimeError("connection reset")
+
+    events = list(analyze_stream("Python developer", "English", stream=broken))
+    assert events[-1].event == "error"
+    assert "connection reset" in events[-1].data["detail"]
+    truncated = analyze_stream(
+        "Python developer", "English", stream=lambda _: iter([RESPONSE[:80]])
+    )
+    assert list(truncated)[-1].event == "error"
+
+
+def test_stream_route_sends_server_sent_events(mocker: MockerFixture) -> None:
+    mocker.patch.object(analyze_route.config, "ANALYSIS_STORE_ENABLED", False)
+    mocker.patch.object(analyze_route, "extract_text", return_value="Python developer")
+    model = mocker.patch("levelup.llm.get_model").return_value
+    model.generate_content.return_value = [
+        mocker.Mock(text=chunk) for chunk in _chunks(RESPONSE, 30)
+    ]
+    request = Request({"type": "http", "headers": [], "client": ("10.0.0.1", 1)})
+    upload = UploadFile(io.BytesIO(b"%PDF"), filename="cv.pdf")
+    response = analyze_route.analyze_cv_stream(
+        request, Response(), None, upload, "English", None, "sse"
+    )
+    assert response.media_type == "text/event-stream"
+
+    async def body() -> str:
+        return "".join([chunk async for chunk in response.body_iterator])  # type: ignore[misc]
+
+    messages = asyncio.run(body()).strip().split("\n\n")
+    events = [m.split("\n")[0].removeprefix("event: ") for m in messages]
+    assert events[:2] == ["extracted", "prompted"]
+    assert events[-1] == "result"
+    assert events.count("section") == len(ANALYSIS)
+    assert json.loads(messages[-1].split("data: ", 1)[1]) == ANALYSIS
+    model.generate_content.assert_called_once_with(mocker.ANY, stream=True)
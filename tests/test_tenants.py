@@ -0,0 +1,133 @@
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from alembic import command as alembic_command
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from pytest_mock import MockerFixture
+from sqlalchemy import create_engine, event, inspect
+
+from levelup import config
+from levelup.database import manage
+from levelup.database.manage import (
+    TenantResult,
+    provision_tenants,
+    tenant_schema_name,
+)
+
+MIGRATION = """
+def upgrade():
+    op.create_table(
+        "note",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("body", sa.Text, nullable=False),
+    )
+"""
+
+
+def test_tenant_schema_name_validates_slug() -> None:
+    assert tenant_schema_name("acme_corp") == "dispatch_organization_acme_corp"
+    for slug in ("", "Acme", "acme-corp", "x; drop schema", "a" * 60):
+        with pytest.raises(ValueError):
+            tenant_schema_name(slug)
+
+
+def test_provision_tenants_skips_current_and_bounds_connections(
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(manage, "get_head_revision", return_value="abc123")
+    mocker.patch.object(
+        manage,
+        "get_tenant_revisions",
+        return_value={
+            "dispatch_organization_done": "abc123",
+            "dispatch_organization_old": "000000",
+        },
+    )
+    lock = threading.Lock()
+    active = peak = 0
+
+    def fake_init(engine: object, slug: str, script_location: str) -> TenantResult:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        if slug == "broken":
+            raise RuntimeError("permission denied")
+        status = "migrated" if slug == "old" else "created"
+        return TenantResult(slug, tenant_schema_name(slug), status, "abc123", 0.02)
+
+    init_schema = mocker.patch.object(manage, "init_schema", side_effect=fake_init)
+    slugs = ["done", "old", "broken"] + [f"org{i}" for i in range(8)] + ["old"]
+
+    results = provision_tenants(mocker.MagicMock(), slugs, max_connections=3)
+
+    assert [r.slug for r in results] == ["done", "old", "broken"] + [
+        f"org{i}" for i in range(8)
+    ]
+    assert init_schema.call_count == 10
+    assert peak <= 3
+    by_slug = {r.slug: r for r in results}
+    assert by_slug["done"].status == "skipped"
+    assert by_slug["old"].status == "migrated"
+    assert by_slug["broken"].status == "failed"
+    assert by_slug["broken"].error == "permission denied"
+    assert by_slug["broken"].seconds > 0
+
+
+def test_provision_tenants_rejects_invalid_slug_before_work(
+    mocker: MockerFixture,
+) -> None:
+    engine = mocker.MagicMock()
+
+    with pytest.raises(ValueError):
+        provision_tenants(engine, ["good", "Bad Slug"])
+    engine.connect.assert_not_called()
+
+
+def test_tenant_migrations_run_in_the_tenant_schema(tmp_path: Path) -> None:
+    # The shipped environment and template, with a migration generated from it.
+    location = tmp_path / "tenant"
+    shutil.copytree(
+        config.ALEMBIC_TENANT_REVISION_PATH,
+        location,
+        ignore=shutil.ignore_patterns("__pycache__"),
+    )
+    alembic_cfg = AlembicConfig(config.ALEMBIC_INI_PATH)
+    alembic_cfg.set_main_option("script_location", str(location))
+    script = alembic_command.revision(alembic_cfg, "add notes", rev_id="0001")
+    assert not isinstance(script, list) and script is not None
+    migration = Path(script.path)
+    source = migration.read_text()
+    migration.write_text(source.replace("\ndef upgrade():\n    pass\n", MIGRATION))
+
+    # SQLite stands in for PostgreSQL: an attached database is a schema.
+    schema = tenant_schema_name("acme")
+    engine = create_engine(f"sqlite:///{tmp_path / 'core.db'}")
+
+    @event.listens_for(engine, "connect")
+    def attach(dbapi_connection: Any, _: Any) -> None:
+        dbapi_connection.execute(
+            f"ATTACH DATABASE '{tmp_path / 'acme.db'}' AS {schema}"
+        )
+
+    with engine.begin() as connection:
+        manage._upgrade_schema(connection, schema, str(location), "0001")
+
+    with engine.connect() as connection:
+        assert set(inspect(connection).get_table_names(schema=schema)) == {
+            "alembic_version",
+            "note",
+        }
+        assert inspect(connection).get_table_names() == []
+        context = MigrationContext.configure(
+            connection, opts={"version_table_schema": schema}
+        )
+        assert context.get_current_revision() == "0001"
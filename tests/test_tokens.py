@@ -0,0 +1,79 @@
+from pytest_mock import MockerFixture
+
+from levelup import tokens
+from levelup.llm import record_response_usage
+from levelup.sections import analyze
+from levelup.segmenter import segment
+
+RESUME = "\n".join(
+    [
+        "Jane Doe",
+        "jane@example.com",
+        "Experience",
+        *[f"Built data pipeline number {i} with Python and Spark" for i in range(40)],
+        "Skills:",
+        "Python, SQL, Spark",
+        "Hobbies",
+        *[f"Hiking trail {i} in the mountains near the lake" for i in range(40)],
+        "References",
+        "Available on request from previous managers",
+    ]
+)
+
+
+def test_segment_and_estimate() -> None:
+    sections = segment(RESUME)
+    assert [s.name for s in sections] == [
+        "header",
+        "experience",
+        "skills",
+        "interests",
+        "references",
+    ]
+    assert "\n".join(s.text for s in sections) == RESUME
+    assert tokens.estimate_tokens("Hello, world!") == 4
+    assert tokens.estimate_tokens("internationalization") == 4
+
+
+def test_trim_drops_low_priority_sections_first() -> None:
+    full = tokens.estimate_tokens(RESUME)
+    result = tokens.trim_to_budget(RESUME, full - 20)
+
+    assert result.trimmed == ["references", "interests"]
+    assert result.tokens <= full - 20
+    assert "Available on request" not in result.text
+    assert "Hobbies" in result.text and "Built data pipeline number 39" in result.text
+
+    small = tokens.trim_to_budget(RESUME, 100)
+    assert small.tokens <= 100
+    assert small.text.startswith("Jane Doe\njane@example.com\nExperience")
+    assert "Skills:" in small.text
+
+
+def test_fit_to_budget_counts_the_prompt(mocker: MockerFixture) -> None:
+    untouched = tokens.fit_to_budget(RESUME, "English", max_tokens=100000)
+    assert untouched.text == RESUME and untouched.trimmed == []
+
+    overhead = tokens.estimate_tokens(
+        tokens.get_resume_analysis_prompt("", "English", None, ["Python", "SQL"])
+    )
+    fitted = tokens.fit_to_budget(RESUME, "English", max_tokens=overhead + 300)
+    assert fitted.trimmed and fitted.tokens <= 300
+
+    mocker.patch.object(tokens.config, "PROMPT_MAX_INPUT_TOKENS", 0)
+    assert tokens.fit_to_budget(RESUME, "English").text == RESUME
+
+
+def test_usage_is_tracked_across_section_threads() -> None:
+    def generate(prompt: str) -> str:
+        record_response_usage(prompt, "{}", None)
+        return "{}"
+
+    with tokens.track_usage() as usage:
+        analyze(RESUME, "English", concurrent=True, generate=generate)
+
+    assert usage.calls == 5 and usage.estimated
+    assert usage.input_tokens > 5 * tokens.estimate_tokens(RESUME)
+    assert usage.trim is not None and usage.trim.trimmed == []
+    assert usage.summary().startswith("Tokens: ~")
+    assert tokens.current_usage() is None
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy import create_engine, text
+
+from levelup import config, tracing
+from levelup.sections import SECTION_GROUPS, analyze
+from levelup.tracing import FileExporter, TraceMiddleware, Tracer, span, trace_queries
+
+ANSWER = '```json\n{"overall_summary": {"overall_score": 70}}\n```'
+
+
+def test_head_and_tail_sampling() -> None:
+    kept: list[dict[str, Any]] = []
+    tracer = Tracer(kept.append, sample_rate=0.5, slow_ms=30, rng=lambda: 0.9)
+
+    with tracer.trace("fast"):
+        pass
+    with tracer.trace("slow"):
+        time.sleep(0.04)
+    with pytest.raises(RuntimeError), tracer.trace("failed"):
+        with span("inner"):
+            raise RuntimeError("boom")
+    with tracer.trace("handled"):
+        tracing.mark_error("job failed")
+    with Tracer(kept.append, sample_rate=0.5, rng=lambda: 0.1).trace("lucky"):
+        pass
+
+    decisions = {trace["name"]: trace["decision"] for trace in kept}
+    assert decisions == {
+        "slow": "slow",
+        "failed": "error",
+        "handled": "error",
+        "lucky": "head",
+    }
+    failed = next(trace for trace in kept if trace["name"] == "failed")
+    assert failed["error"] == "RuntimeError: boom"
+    assert failed["spans"][0]["attributes"]["error"] == "RuntimeError: boom"
+
+    # Without tail sampling, traces lost at the head record nothing.
+    head_only = Tracer(kept.append, sample_rate=0.5, keep_errors=False, rng=lambda: 0.9)
+    with head_only.trace("skipped") as trace:
+        assert trace is None and tracing.current_trace() is None
+
+
+def test_analysis_spans_nest_across_threads(mocker: MockerFixture) -> None:
+    model = mocker.Mock()
+    model.generate_content.return_value = SimpleNamespace(
+        text=ANSWER,
+        usage_metadata=SimpleNamespace(
+            prompt_token_count=900, candidates_token_count=80
+        ),
+    )
+    mocker.patch("levelup.llm.get_model", return_value=model)
+    kept: list[dict[str, Any]] = []
+
+    with Tracer(kept.append, sample_rate=1.0).trace("analysis"):
+        with span("request") as outer:
+            analyze("cv", "English", concurrent=True)
+
+    spans = kept[0]["spans"]
+    llm = [s for s in spans if s["name"] == "llm_generate"]
+    assert len(llm) == len(SECTION_GROUPS)
+    assert llm[0]["attributes"]["llm.input_tokens"] == 900
+    assert llm[0]["attributes"]["llm.output_tokens"] == 80
+    assert {s["name"] for s in spans} >= {
+        "prompt_build",
+        "llm_queue",
+        "json_extraction",
+    }
+    parents = {s["parent_id"] for s in spans if s["name"] == "json_extraction"}
+    assert outer is not None and parents == {outer.span_id}
+
+
+def test_queries_are_spans_and_traces_go_to_file(tmp_path: Path) -> None:
+    engine = create_engine("sqlite://")
+    trace_queries(engine)
+    exporter = FileExporter(tmp_path / "traces" / "traces.ndjson")
+    tracer = Tracer(exporter, sample_rate=1.0)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))  # outside any trace
+        with tracer.trace("query"):
+            conn.execute(text("SELECT 2"))
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT * FROM missing"))
+
+    exporter.flush()
+    (line,) = exporter.path.read_text().splitlines()
+    trace = json.loads(line)
+    statements = [s["attributes"]["db.statement"] for s in trace["spans"]]
+    assert statements == ["SELECT 2", "SELECT * FROM missing"]
+    assert "error" in trace["spans"][1]["attributes"]
+    assert trace["error"] is not None and trace["decision"] == "head"
+
+
+def test_file_exporter_writes_in_the_background(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    exporter = FileExporter(tmp_path / "traces.ndjson", max_queued=2)
+    written = threading.Event()
+    write = mocker.patch.object(
+        exporter, "_write", side_effect=lambda traces: written.wait(5)
+    )
+
+    for i in range(4):
+        exporter({"trace_id": str(i)})  # returns while the first write blocks
+    written.set()
+    exporter.flush()
+
+    exported = [t["trace_id"] for call in write.call_args_list for t in call.args[0]]
+    assert exported[0] == "0" and 2 <= len(exported) <= 3
+
+
+def test_middleware_traces_requests(monkeypatch: pytest.MonkeyPatch) -> None:
+    kept: list[dict[str, Any]] = []
+    monkeypatch.setattr(config, "TRACING_ENABLED", True)
+    monkeypatch.setattr(tracing, "_tracer", Tracer(kept.append, sample_rate=0.0))
+
+    async def app(scope: Any, receive: Any, send: Any) -> None:
+        with span("handler"):
+            pass
+        status = 503 if scope["path"] == "/down" else 200
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def request(path: str) -> None:
+        async def send(message: Any) -> None:
+            pass
+
+        scope = {"type": "http", "method": "GET", "path": path}
+        await TraceMiddleware(app)(scope, None, send)  # type: ignore[arg-type]
+
+    asyncio.run(request("/up"))
+    asyncio.run(request("/down"))
+
+    (trace,) = kept
+    assert trace["name"] == "GET /down" and trace["error"] == "HTTP 503"
+    assert trace["attributes"]["http.status_code"] == 503
+    assert [s["name"] for s in trace["spans"]] == ["handler"]
@@ -0,0 +1,141 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import Engine, create_engine
+
+from levelup.database.routing import ReplicaSet, RoutingSession, read_only
+from levelup.models import Analysis
+from levelup.store import AnalysisStore
+from levelup.transfer import (
+    _CopyReader,
+    export_ndjson,
+    import_records,
+    open_text,
+    read_records,
+)
+
+REPORT = {"overall_summary": {"overall_score": 72}, "domain_scores": []}
+
+
+def _engine(path: Path) -> Engine:
+    engine = create_engine(f"sqlite:///{path / 'analyses.db'}").execution_options(
+        schema_translate_map={"dispatch_core": None}
+    )
+    Analysis.__table__.create(engine)  # type: ignore[attr-defined]
+    return engine
+
+
+def _stored(analysis_id: str, day: int) -> dict:
+    return {
+        "id": analysis_id,
+        "created_at": datetime(2026, 1, day, tzinfo=timezone.utc).isoformat(),
+        "language": "English",
+        "role": "Backend Developer",
+        "text_sha256": "ab" * 32,
+        "result": REPORT,
+    }
+
+
+def test_imports_reports_store_records_and_ndjson_once(tmp_path: Path) -> None:
+    engine = _engine(tmp_path)
+    (tmp_path / "report.json").write_text(json.dumps(REPORT, indent=2))
+    store = tmp_path / "store"
+    store.mkdir()
+    (store / "a1.json").write_text(json.dumps(_stored("a1", 1)))
+    with gzip.open(tmp_path / "old.ndjson.gz", "wt", encoding="utf-8") as f:
+        f.write(json.dumps(_stored("b2", 2)) + "\n\n")
+        f.write(json.dumps(_stored("a1", 1)) + "\n")
+        f.write('{"not": "an analysis", "result": 3}\n')
+    paths = [tmp_path / "report.json", store, tmp_path / "old.ndjson.gz"]
+
+    errors: list[str] = []
+    first = import_records(engine, read_records(paths, errors), batch_size=2)
+    again = import_records(engine, read_records(paths), batch_size=2)
+
+    assert (first.read, first.inserted) == (4, 3)
+    assert (again.read, again.inserted) == (4, 0)
+    assert len(errors) == 1 and "old.ndjson.gz:4" in errors[0]
+
+
+def test_export_round_trips_in_creation_order(tmp_path: Path) -> None:
+    engine = _engine(tmp_path)
+    source = tmp_path / "source.ndjson"
+    source.write_text(
+        "".join(
+            json.dumps(_stored(i, d)) + "\n" for i, d in [("late", 9), ("early", 1)]
+        )
+    )
+    import_records(engine, read_records([source]), 1)
+
+    path = tmp_path / "export.ndjson.gz"
+    with open_text(path, "wt") as out:
+        assert export_ndjson(engine, out, batch_size=1) == 2
+    lines = gzip.decompress(path.read_bytes()).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["early", "late"]
+
+    since = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    out = io.StringIO()
+    assert export_ndjson(engine, out, since) == 1
+    exported = json.loads(out.getvalue())
+    assert exported == _stored("late", 9)
+
+    (tmp_path / "copy").mkdir()
+    copy = _engine(tmp_path / "copy")
+    assert import_records(copy, read_records([path])).inserted == 2
+
+
+def test_export_includes_the_analysis_store(tmp_path: Path) -> None:
+    engine = _engine(tmp_path)
+    store = AnalysisStore(tmp_path / "store")
+    saved = store.save(REPORT, "Backend developer resume", "English")
+    record = store.get(saved)
+    assert record is not None
+    source = tmp_path / "source.ndjson"
+    source.write_text(json.dumps(_stored("db-only", 1)) + "\n")
+    import_records(engine, read_records([source, store.analyses_dir]))
+
+    out = io.StringIO()
+    assert export_ndjson(engine, out, store=store) == 2
+    ids = [json.loads(line)["id"] for line in out.getvalue().splitlines()]
+    assert ids == ["db-only", saved]
+
+    out = io.StringIO()
+    since = datetime.fromisoformat(record["created_at"])
+    assert export_ndjson(None, out, since=since, store=store) == 1
+    assert json.loads(out.getvalue())["text_sha256"] == record["text_sha256"]
+
+
+def test_export_reads_a_replica_through_a_session(tmp_path: Path) -> None:
+    primary = _engine(tmp_path)
+    (tmp_path / "replica").mkdir()
+    replica = _engine(tmp_path / "replica")
+    source = tmp_path / "source.ndjson"
+    source.write_text(json.dumps(_stored("replicated", 1)) + "\n")
+    import_records(replica, read_records([source]))
+
+    out = io.StringIO()
+    with RoutingSession(bind=primary, replicas=ReplicaSet([replica])) as session:
+        with read_only(session):
+            assert export_ndjson(session, out) == 1
+    assert json.loads(out.getvalue())["id"] == "replicated"
+
+
+def test_copy_reader_streams_valid_csv_in_batches() -> None:
+    records = [
+        {**_stored(f"id{i}", 1), "result": {"text": 'quote " and,\nnewline'}}
+        for i in range(5)
+    ]
+    for record in records:
+        record["created_at"] = datetime.fromisoformat(record["created_at"])
+    reader = _CopyReader(iter(records), batch_size=2)
+
+    chunks = iter(lambda: reader.read(8192), "")
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+
+    assert reader.rows == 5
+    assert [row[0] for row in rows] == [f"id{i}" for i in range(5)]
+    assert json.loads(rows[0][5]) == {"text": 'quote " and,\nnewline'}